@@ -5,10 +5,15 @@ Flask Web Interface for Log File Analyzer
 import os
 import sys
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, g
 import threading
 import json
 import time
+import re
+import uuid
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timezone
 
 # Add src to path for analyzer imports
 project_root = Path(__file__).parent
@@ -20,8 +25,13 @@ try:
     from log_reader import LogReader
     from log_parser import LogParser
     from data_processor import DataProcessor
-    from visualizer import Visualizer
     from report_generator import ReportGenerator
+    from log_index import LogIndex, StaleIndexError
+    from log_cube import LogCube
+    from live_window import LogFollower
+    from profiling import Spans
+    from metrics import MetricsRegistry, CONTENT_TYPE, add_process_metrics
+    from metric_registry import resolve as resolve_metrics
     print("✅ Analyzer modules imported successfully")
 except ImportError as e:
     print(f"❌ Import error: {e}")
@@ -36,40 +46,325 @@ app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = project_root / 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
 app.config['OUTPUT_FOLDER'] = project_root / 'output'
+app.config['MAX_CHART_JOBS'] = 200  # Jobs whose charts can still be rendered on demand
+app.config['MAX_CUBES'] = 20  # Jobs whose cubes stay in memory for /api/cube
+app.config['MAX_LIVE_FOLLOWERS'] = 16  # Files followed for /api/live, least recently used evicted
+INDEX_UPLOAD_SUFFIXES = ('.idx', '.idx.npz', '.blkidx')  # Never accepted as uploads
 
 # Create folders if they don't exist
 for folder in [app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER']]:
     folder.mkdir(exist_ok=True)
 
-def analyze_log_file(file_path):
-    """Analyze log file and return results"""
+# Prometheus metrics for /metrics. Jobs add their line and byte counts
+# once when they finish, so nothing is updated per log line.
+metrics = MetricsRegistry()
+add_process_metrics(metrics)
+jobs_started = metrics.counter('log_analyzer_jobs_started_total', 'Analysis jobs started.', ['source'])
+jobs_finished = metrics.counter('log_analyzer_jobs_finished_total', 'Analysis jobs finished.', ['status'])
+jobs_in_progress = metrics.gauge('log_analyzer_job_queue_depth', 'Analysis jobs started but not finished.')
+lines_read = metrics.counter('log_analyzer_lines_read_total', 'Non-empty log lines read.')
+lines_parsed = metrics.counter('log_analyzer_lines_parsed_total', 'Log lines parsed successfully.')
+parse_failures = metrics.counter('log_analyzer_parse_failures_total', 'Malformed log lines.')
+bytes_ingested = metrics.counter('log_analyzer_bytes_ingested_total', 'Bytes of log files analyzed.')
+stage_seconds = metrics.histogram('log_analyzer_stage_duration_seconds', 'Duration of analysis stages.', ['stage'])
+job_seconds = metrics.histogram('log_analyzer_job_duration_seconds', 'Duration of analysis jobs.', ['source'])
+cache_requests = metrics.counter('log_analyzer_cache_requests_total', 'Cache lookups by cache and result.',
+                                 ['cache', 'result'])
+http_requests = metrics.counter('log_analyzer_http_requests_total', 'HTTP requests handled.',
+                                ['endpoint', 'method', 'status'])
+http_seconds = metrics.histogram('log_analyzer_http_request_duration_seconds', 'HTTP request latency.',
+                                 ['endpoint'])
+
+def cache_hit_ratios():
+    """Hit ratio per cache, computed at scrape time"""
+    lookups = {}
+    for labels, value in cache_requests.items():
+        hits, total = lookups.get(labels['cache'], (0, 0))
+        lookups[labels['cache']] = (hits + (value if labels['result'] == 'hit' else 0), total + value)
+    return [({'cache': cache}, hits / total) for cache, (hits, total) in lookups.items() if total]
+
+metrics.gauge('log_analyzer_cache_hit_ratio', 'Share of cache lookups that were hits.', ['cache'],
+              function=cache_hit_ratios)
+
+# Chart PNGs are rendered lazily on first download. Each job keeps only the
+# aggregates its charts need; the rendered file on disk is the memo.
+CHART_FILE_PATTERN = re.compile(r'^(error_distribution|top_ips)_(\w+)\.png$')
+chart_jobs = OrderedDict()
+chart_jobs_lock = threading.Lock()
+
+def register_chart_job(job_id, stats):
+    """Remember the chart inputs of a job so its PNGs can be drawn later"""
+    with chart_jobs_lock:
+        if job_id in chart_jobs:
+            chart_jobs.move_to_end(job_id)
+            return
+        chart_jobs[job_id] = {
+            'stats': {
+                'error_code_distribution': stats.get('error_code_distribution', {}),
+                'top_error_ips': stats.get('top_error_ips', {})
+            },
+            'lock': threading.Lock()
+        }
+        while len(chart_jobs) > app.config['MAX_CHART_JOBS']:
+            chart_jobs.popitem(last=False)
+
+def render_chart_on_demand(filename):
+    """
+    Render a job's chart the first time it is requested
+
+    Returns:
+        Path to the PNG, or None if the name is not a known job chart
+    """
+    match = CHART_FILE_PATTERN.match(filename)
+    if not match:
+        return None
+    
+    chart_type, job_id = match.groups()
+    with chart_jobs_lock:
+        job = chart_jobs.get(job_id)
+    if job is None:
+        return None
+    
+    file_path = app.config['OUTPUT_FOLDER'] / filename
+    with job['lock']:
+        if not file_path.exists():
+            cache_requests.inc(cache='chart', result='miss')
+            started = time.perf_counter()
+            # matplotlib is only ever imported on this path
+            from visualizer import render_error_distribution, render_top_ips
+            render = render_error_distribution if chart_type == 'error_distribution' else render_top_ips
+            if not render(job['stats'], file_path):
+                return None
+            stage_seconds.observe(time.perf_counter() - started, stage='chart')
+    return file_path
+
+# Response field each chart is drawn from
+CHART_FIELDS = {'error_distribution': 'error_codes', 'top_ips': 'top_ips'}
+
+# Response fields named differently from the stats keys they come from
+RESPONSE_FIELDS = {
+    'error_code_distribution': 'error_codes',
+    'top_error_ips': 'top_ips',
+    'request_type_distribution': 'request_types'
+}
+
+# Columns of the parsed records the web path analyzes (no GeoIP enrichment)
+WEB_COLUMNS = {'timestamp', 'ip_address', 'request_type', 'error_code', 'is_error'}
+
+def metric_fields(names=None):
+    """Response fields filled by the given registered metrics (None: all)"""
+    return {RESPONSE_FIELDS.get(key, key) for metric in resolve_metrics(names) for key in metric.keys}
+
+def requested_metrics():
+    """
+    Metric names from the ?metrics= parameter (None when absent)
+    
+    Raises:
+        ValueError: For unknown metric names, or metrics that need columns
+            the web path does not produce (e.g. 'geo')
+    """
+    value = request.args.get('metrics') or request.form.get('metrics')
+    if not value:
+        return None
+    metrics = resolve_metrics(value)
+    unsupported = [metric for metric in metrics if not metric.columns <= WEB_COLUMNS]
+    if unsupported:
+        missing = set().union(*(metric.columns for metric in unsupported)) - WEB_COLUMNS
+        raise ValueError(f"Metric(s) {', '.join(metric.name for metric in unsupported)} are not "
+                         f"available in the web analysis (needs columns {', '.join(sorted(missing))})")
+    return [metric.name for metric in metrics]
+
+def select_metrics(result, names):
+    """Drop the fields (and chart links) of metrics that were not requested"""
+    if not names:
+        return result
+    dropped = metric_fields() - metric_fields(names)
+    selected = {field: value for field, value in result.items() if field not in dropped}
+    if 'charts' in selected:
+        selected['charts'] = {chart: link for chart, link in selected['charts'].items()
+                              if CHART_FIELDS[chart] not in dropped}
+    return selected
+
+# Per-job cubes for interactive pivots, most recently used last
+cubes = OrderedDict()
+cubes_lock = threading.Lock()
+
+def register_cube(job_id, cube):
+    """Keep a job's cube so /api/cube can slice it"""
+    with cubes_lock:
+        cubes[job_id] = cube
+        cubes.move_to_end(job_id)
+        while len(cubes) > app.config['MAX_CUBES']:
+            cubes.popitem(last=False)
+
+# Followed files for /api/live, most recently used last; each poll parses
+# only the lines appended since the previous one
+live_followers = OrderedDict()
+live_followers_lock = threading.Lock()
+
+def get_live_follower(file_path):
+    """Follower for a log file, evicting the least recently used beyond the cap"""
+    with live_followers_lock:
+        follower = live_followers.get(file_path)
+        if follower is None:
+            follower = live_followers[file_path] = LogFollower(file_path)
+        live_followers.move_to_end(file_path)
+        while len(live_followers) > app.config['MAX_LIVE_FOLLOWERS']:
+            live_followers.popitem(last=False)
+        return follower
+
+# /analyze/default result, memoized against the file's size/mtime and
+# content hash; served with ETag/Last-Modified for conditional GETs
+default_cache = {'signature': None, 'digest': None, 'last_modified': None, 'result': None, 'cube': None}
+default_cache_lock = threading.Lock()
+
+def file_digest(file_path, chunk_size=1024 * 1024):
+    """SHA-1 of a file's contents, read in chunks"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_default_analysis(file_path):
+    """
+    Return the cached analysis of the default file, reanalyzing it only
+    when its contents change
+    
+    A size/mtime check is enough on the hot path; the file is hashed only
+    when that signature changes, so touching the file without editing it
+    keeps the cached result (and its ETag).
+    
+    Returns:
+        (result, digest, last_modified) tuple
+    """
+    stat = file_path.stat()
+    signature = (stat.st_size, stat.st_mtime_ns)
+    
+    with default_cache_lock:
+        hit = True
+        if default_cache['signature'] != signature:
+            digest = file_digest(file_path)
+            if digest != default_cache['digest']:
+                hit = False
+                result = analyze_log_file(str(file_path), source='default')
+                result['file_name'] = file_path.name
+                if result.get('status') != 'success':
+                    return result, None, None
+                with cubes_lock:
+                    default_cache['cube'] = cubes.get(result['job_id'])
+                default_cache['result'] = result
+                default_cache['digest'] = digest
+            default_cache['signature'] = signature
+            default_cache['last_modified'] = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        cache_requests.inc(cache='default_analysis', result='hit' if hit else 'miss')
+        
+        result = default_cache['result']
+        # The chart and cube registries are bounded; make sure this job's
+        # charts can still be drawn and its cube link still answers
+        register_chart_job(result['job_id'], {
+            'error_code_distribution': result['error_codes'],
+            'top_error_ips': result['top_ips']
+        })
+        if default_cache['cube'] is not None:
+            register_cube(result['job_id'], default_cache['cube'])
+        return result, default_cache['digest'], default_cache['last_modified']
+
+# Query indexes, one per log file; missing or stale ones are rebuilt off-request
+log_indexes = {}
+index_builds = set()
+log_indexes_lock = threading.Lock()
+
+def build_log_index(key):
+    """Build, save and publish the index for a log file (background thread)"""
+    try:
+        index = LogIndex(key).build()
+        index.save()
+        with log_indexes_lock:
+            log_indexes[key] = index
+    except Exception as e:
+        print(f"❌ Index build failed for {key}: {e}")
+    finally:
+        with log_indexes_lock:
+            index_builds.discard(key)
+
+def get_log_index(file_path):
+    """
+    Get the up-to-date query index for a log file
+    
+    Returns:
+        LogIndex, or None while it is being (re)built in the background
+    """
+    key = str(file_path)
+    with log_indexes_lock:
+        index = log_indexes.get(key)
+        if index is not None and not index.is_stale():
+            return index
+        if key in index_builds:
+            return None
+    
+    index = LogIndex.load(key)  # Saved by an earlier run
+    with log_indexes_lock:
+        if index is not None:
+            log_indexes[key] = index
+            return index
+        if key not in index_builds:
+            index_builds.add(key)
+            threading.Thread(target=build_log_index, args=(key,), daemon=True).start()
+    return None
+
+def analyze_log_file(file_path, source='upload', metrics=None):
+    """
+    Analyze log file and return results
+    
+    Args:
+        file_path: Log file to analyze
+        source: 'upload' or 'default', used as a metrics label
+        metrics: Registered metric names to compute (None: all). A
+            partial analysis returns only those fields and skips the
+            report and the cube, which need every metric.
+    """
+    jobs_started.inc(source=source)
+    jobs_in_progress.inc()
+    spans = Spans()
     try:
         print(f"📂 Analyzing file: {file_path}")
         
         # Initialize analyzer components
         reader = LogReader(file_path)
         parser = LogParser()
+        cube = None if metrics else LogCube()  # Fed by the parse loop, as in main_large
         
         # Parse log file
         parsed_logs = []
         line_count = 0
         
         print("🔍 Parsing log entries...")
-        for line in reader.read_lines():
-            line_count += 1
-            parsed = parser.parse_line(line)
-            if parsed:
-                parsed_logs.append(parsed)
-            
-            # Show progress every 5000 lines
-            if line_count % 5000 == 0:
-                print(f"  Processed {line_count:,} lines...")
+        with spans.span('read_parse'):
+            for offset, length, line in reader.read_lines_with_offsets():
+                line_count += 1
+                parsed = parser.parse_line(line, offset, length)
+                if parsed:
+                    parsed_logs.append(parsed)
+                    if cube is not None:
+                        cube.observe(offset, length, line, parsed)
+                
+                # Show progress every 5000 lines
+                if line_count % 5000 == 0:
+                    print(f"  Processed {line_count:,} lines...")
         
         # Get statistics
         reading_stats = reader.get_stats()
         parsing_stats = parser.get_stats()
         
+        # Line counts are added once per job, never per line
+        lines_read.inc(reading_stats['total_lines'])
+        lines_parsed.inc(parsing_stats['parsed_count'])
+        parse_failures.inc(parsing_stats['failed_count'])
+        bytes_ingested.inc(os.path.getsize(file_path))
+        
         if not parsed_logs:
+            jobs_finished.inc(status='error')
             return {
                 'status': 'error',
                 'message': 'No valid log entries found'
@@ -77,31 +372,29 @@ def analyze_log_file(file_path):
         
         # Process and analyze data
         print("📈 Processing data...")
-        processor = DataProcessor()
-        processor.create_dataframe(parsed_logs)
-        stats = processor.analyze()
+        with spans.span('aggregate'):
+            processor = DataProcessor()
+            processor.create_dataframe(parsed_logs, parser.tables)
+            stats = processor.analyze(metrics)
         
-        # Generate visualizations
-        print("🎨 Creating visualizations...")
-        visualizer = Visualizer()
-        
-        # Save charts with unique names
+        # Charts are drawn on demand when their download link is hit
         timestamp = int(time.time())
-        error_chart = app.config['OUTPUT_FOLDER'] / f'error_distribution_{timestamp}.png'
-        ip_chart = app.config['OUTPUT_FOLDER'] / f'top_ips_{timestamp}.png'
-        
-        visualizer.output_path = error_chart
-        visualizer.plot_error_distribution(stats)
-        
-        visualizer.output_path = ip_chart
-        visualizer.plot_top_ips(stats)
-        
-        # Generate report
-        print("📄 Generating report...")
-        report_gen = ReportGenerator()
-        report_file = app.config['OUTPUT_FOLDER'] / f'summary_report_{timestamp}.txt'
-        report_gen.output_path = report_file
-        report_text = report_gen.generate(stats, parsing_stats, reading_stats)
+        job_id = f'{timestamp}_{uuid.uuid4().hex[:8]}'
+        error_chart = app.config['OUTPUT_FOLDER'] / f'error_distribution_{job_id}.png'
+        ip_chart = app.config['OUTPUT_FOLDER'] / f'top_ips_{job_id}.png'
+        register_chart_job(job_id, stats)
+        if not metrics:
+            with spans.span('cube'):
+                register_cube(job_id, cube.build())
+            
+            # Generate report
+            print("📄 Generating report...")
+            with spans.span('report'):
+                stats['error_samples'] = processor.sample_error_lines(file_path)
+                report_gen = ReportGenerator()
+                report_file = app.config['OUTPUT_FOLDER'] / f'summary_report_{job_id}.txt'
+                report_gen.output_path = report_file
+                report_text = report_gen.generate(stats, parsing_stats, reading_stats)
         
         # Prepare response data
         result = {
@@ -121,18 +414,32 @@ def analyze_log_file(file_path):
             'error_codes': stats.get('error_code_distribution', {}),
             'top_ips': stats.get('top_error_ips', {}),
             'request_types': stats.get('request_type_distribution', {}),
+            'error_by_request': stats.get('error_by_request', {}),
             'charts': {
                 'error_distribution': f'/download/{error_chart.name}',
                 'top_ips': f'/download/{ip_chart.name}'
             },
-            'report': f'/download/{report_file.name}',
+            'job_id': job_id,
             'timestamp': timestamp
         }
+        if metrics:
+            result = select_metrics(result, metrics)
+            result['metrics'] = metrics
+        else:
+            result['report'] = f'/download/{report_file.name}'
+            result['cube'] = f'/api/cube/{job_id}'
+        
+        timings = spans.get_stats()
+        for row in timings['spans']:
+            stage_seconds.observe(row['seconds'], stage=row['span'])
+        job_seconds.observe(timings['total_seconds'], source=source)
+        jobs_finished.inc(status='success')
         
         print(f"✅ Analysis completed successfully")
         return result
         
     except Exception as e:
+        jobs_finished.inc(status='error')
         print(f"❌ Analysis error: {e}")
         import traceback
         traceback.print_exc()
@@ -140,6 +447,8 @@ def analyze_log_file(file_path):
             'status': 'error',
             'message': str(e)
         }
+    finally:
+        jobs_in_progress.dec()
 
 @app.route('/')
 def index():
@@ -156,14 +465,21 @@ def upload_file():
     if file.filename == '':
         return jsonify({'status': 'error', 'message': 'No file selected'})
     
+    try:
+        metrics = requested_metrics()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
     if file:
-        # Save uploaded file
-        filename = file.filename
+        # Save uploaded file; query indexes are never taken from the upload folder
+        filename = Path(file.filename).name
+        if filename.endswith(INDEX_UPLOAD_SUFFIXES):
+            return jsonify({'status': 'error', 'message': 'Index files cannot be uploaded'}), 400
         file_path = app.config['UPLOAD_FOLDER'] / filename
         file.save(file_path)
         
         # Analyze the file
-        result = analyze_log_file(str(file_path))
+        result = analyze_log_file(str(file_path), metrics=metrics)
         
         # Add file info to result
         result['uploaded_file'] = filename
@@ -172,18 +488,126 @@ def upload_file():
 
 @app.route('/analyze/default')
 def analyze_default():
-    """Analyze the default large log file"""
+    """
+    Analyze the default large log file
+    
+    The full analysis is cached; ?metrics= only selects fields from it.
+    """
     default_file = project_root / 'data' / 'large_server_logs.txt'
     
+    try:
+        metrics = requested_metrics()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
     if not default_file.exists():
         return jsonify({
             'status': 'error',
             'message': 'Default log file not found'
         })
     
-    result = analyze_log_file(str(default_file))
-    result['file_name'] = 'large_server_logs.txt'
+    result, digest, last_modified = get_default_analysis(default_file)
+    
+    response = jsonify(select_metrics(result, metrics))
+    if digest:
+        response.set_etag(f"{digest}-{','.join(metrics)}" if metrics else digest)
+        response.last_modified = last_modified
+        response.cache_control.no_cache = True  # Always revalidate, 304 when unchanged
+        response.make_conditional(request)
+    
+    return response
+
+@app.route('/api/entries')
+def api_entries():
+    """
+    Query parsed entries by time range, IP and status code
+    
+    Query parameters: file (uploaded file name, defaults to the default
+    log), start, end, ip, status, limit, cursor.
+    """
+    filename = request.args.get('file')
+    if filename:
+        file_path = app.config['UPLOAD_FOLDER'] / Path(filename).name
+    else:
+        file_path = project_root / 'data' / 'large_server_logs.txt'
+    
+    if not file_path.exists():
+        return jsonify({'status': 'error', 'message': 'Log file not found'}), 404
+    
+    index = get_log_index(file_path)
+    try:
+        if index is None:
+            raise StaleIndexError(file_path)
+        result = index.query(
+            start=request.args.get('start'),
+            end=request.args.get('end'),
+            ip=request.args.get('ip') or None,
+            status=request.args.get('status') or None,
+            limit=request.args.get('limit', 100),
+            cursor=request.args.get('cursor', 0)
+        )
+    except StaleIndexError:
+        get_log_index(file_path)  # Start the rebuild if not already running
+        response = jsonify({'status': 'error', 'message': 'Index is being built, retry shortly'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': f'Invalid query: {e}'}), 400
     
+    result['status'] = 'success'
+    result['file_name'] = file_path.name
+    return jsonify(result)
+
+@app.route('/api/cube/<job_id>')
+def api_cube(job_id):
+    """
+    Slice an analyzed job's cube
+    
+    Query parameters: group_by (comma-separated hour, status, method, ip),
+    start, end, status, method, ip (comma-separated lists) and limit.
+    """
+    with cubes_lock:
+        cube = cubes.get(job_id)
+    if cube is None:
+        return jsonify({'status': 'error', 'message': 'Unknown or expired job'}), 404
+    
+    group_by = [name for name in request.args.get('group_by', '').split(',') if name]
+    limit = request.args.get('limit')
+    try:
+        rows = cube.slice(
+            group_by,
+            limit=int(limit) if limit else None,
+            start=request.args.get('start'),
+            end=request.args.get('end'),
+            status=request.args.get('status') or None,
+            method=request.args.get('method') or None,
+            ip=request.args.get('ip') or None
+        )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': f'Invalid query: {e}'}), 400
+    
+    return jsonify({'status': 'success', 'group_by': group_by, 'rows': rows, 'count': len(rows)})
+
+@app.route('/api/live')
+def api_live():
+    """
+    Sliding-window (1/5/15 minute) metrics for a followed log file
+    
+    Query parameters: file (uploaded file name, defaults to the default log).
+    """
+    filename = request.args.get('file')
+    if filename:
+        file_path = app.config['UPLOAD_FOLDER'] / Path(filename).name
+    else:
+        file_path = project_root / 'data' / 'large_server_logs.txt'
+    
+    if not file_path.exists():
+        return jsonify({'status': 'error', 'message': 'Log file not found'}), 404
+    
+    # Polling takes only this follower's lock, so other files are served meanwhile
+    result = get_live_follower(file_path).get_stats()
+    
+    result['status'] = 'success'
     return jsonify(result)
 
 @app.route('/download/<filename>')
@@ -191,11 +615,35 @@ def download_file(filename):
     """Download generated files"""
     file_path = app.config['OUTPUT_FOLDER'] / filename
     
+    if not file_path.exists():
+        file_path = render_chart_on_demand(filename) or file_path
+    elif CHART_FILE_PATTERN.match(filename):
+        cache_requests.inc(cache='chart', result='hit')
+    
     if file_path.exists():
         return send_file(file_path, as_attachment=True)
     else:
         return jsonify({'status': 'error', 'message': 'File not found'})
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count every request by route (not raw path, to keep label cardinality bounded)"""
+    started = g.pop('request_started', None)
+    endpoint = request.endpoint or 'unmatched'
+    http_requests.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    if started is not None:
+        http_seconds.observe(time.perf_counter() - started, endpoint=endpoint)
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics in the text exposition format"""
+    return metrics.render(), 200, {'Content-Type': CONTENT_TYPE}
+
 @app.route('/status')
 def status():
     """Check server status"""
@@ -0,0 +1,143 @@
+"""
+Import-time benchmark for the analyzer entry points
+
+Runs each entry module in a fresh interpreter under ``python -X importtime``
+and reports the cumulative import cost, plus which heavy dependencies were
+pulled in. Fails when an entry point regresses against a stored baseline,
+or when a fast-start entry point imports numpy/pandas/matplotlib at module
+load.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --save-baseline
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+src_dir = project_root / "src"
+
+BASELINE_PATH = Path(__file__).parent / "import_time_baseline.json"
+
+# Entry module -> (sys.path entry, heavy modules it must not import at load)
+ENTRY_POINTS = {
+    'main': (src_dir, ('numpy', 'pandas', 'matplotlib')),
+    'main_large': (src_dir, ('numpy', 'pandas', 'matplotlib')),
+    'src': (project_root, ('numpy', 'pandas', 'matplotlib')),
+    'app': (project_root, ('matplotlib',)),
+}
+HEAVY_MODULES = ('pandas', 'numpy', 'matplotlib', 'flask')
+
+
+def measure_import(module: str, path: Path) -> dict:
+    """
+    Import ``module`` in a fresh interpreter with -X importtime
+
+    Returns:
+        Dictionary with total cumulative microseconds and the heavy
+        top-level packages that were imported
+    """
+    code = f"import sys; sys.path.insert(0, {str(path)!r}); import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=project_root,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    total_us = 0
+    heavy = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            cumulative_us = int(cumulative)
+        except ValueError:
+            continue  # Header line
+
+        # Top-level imports are not indented; their cumulative times add up
+        # to the total cost of the entry module
+        if not name.startswith("  "):
+            total_us += cumulative_us
+        top_package = name.strip().split(".")[0]
+        if top_package in HEAVY_MODULES:
+            heavy.add(top_package)
+
+    return {'total_us': total_us, 'heavy_modules': sorted(heavy)}
+
+
+def run(repeats: int) -> dict:
+    """Measure every entry point, keeping the best of ``repeats`` runs"""
+    results = {}
+    for module, (path, _) in ENTRY_POINTS.items():
+        runs = [measure_import(module, path) for _ in range(repeats)]
+        best = min(runs, key=lambda r: r['total_us'])
+        results[module] = best
+        print(f"  {module:12} {best['total_us'] / 1000:8.1f} ms  "
+              f"heavy: {', '.join(best['heavy_modules']) or '-'}")
+    return results
+
+
+def check(results: dict, baseline: dict, threshold: float) -> list:
+    """Return a list of regression messages (empty when all checks pass)"""
+    failures = []
+    for module, (_, forbidden) in ENTRY_POINTS.items():
+        leaked = set(results[module]['heavy_modules']) & set(forbidden)
+        if leaked:
+            failures.append(f"{module} imports {', '.join(sorted(leaked))} at module load")
+
+        if module in baseline:
+            limit = baseline[module]['total_us'] * (1 + threshold)
+            if results[module]['total_us'] > limit:
+                failures.append(
+                    f"{module} import time {results[module]['total_us'] / 1000:.1f} ms "
+                    f"exceeds baseline {baseline[module]['total_us'] / 1000:.1f} ms "
+                    f"by more than {threshold:.0%}"
+                )
+    return failures
+
+
+def main():
+    """Main function with command line arguments"""
+    parser = argparse.ArgumentParser(description='Import-time benchmark (-X importtime)')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='Fresh interpreters per entry point (default: 5)')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown vs baseline (default: 0.25 = 25%%)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f'Store the results as the new baseline ({BASELINE_PATH.name})')
+    parser.add_argument('--output', type=str, help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    print("⏱️ Import time (best of {}):".format(args.repeats))
+    results = run(args.repeats)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"✅ Baseline saved to: {BASELINE_PATH}")
+        return 0
+
+    baseline = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text(encoding='utf-8'))
+
+    failures = check(results, baseline, args.threshold)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ No import-time regressions")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
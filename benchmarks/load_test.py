@@ -0,0 +1,361 @@
+"""
+Load test for the Flask web service
+
+Starts app.py on a local port (uploads and outputs go to a temporary
+directory), generates seeded log files to upload, then runs concurrent
+clients that pick requests from a weighted mix of:
+
+    upload     POST /upload with one of the generated files
+    default    GET /analyze/default
+    download   GET /download/<file> for a chart or report of a finished job
+
+Reports p50/p95/p99 latency, throughput and error rate per request kind,
+and samples the server's RSS over time. Everything runs offline against
+127.0.0.1. Results are written as JSON, and the run fails when --max-p95
+or --max-error-rate is exceeded.
+
+Usage:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --clients 32 --duration 60 --mix upload=1,default=6,download=3
+    python benchmarks/load_test.py --requests 500 --upload-lines 100K --max-p95 2.0
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+KINDS = ('upload', 'default', 'download')
+DEFAULT_MIX = 'upload=1,default=6,download=3'
+MEMORY_SAMPLE_INTERVAL = 0.5  # Seconds between server RSS samples
+
+# Runs the app without the debug reloader, writing into a scratch directory
+SERVER_SCRIPT = """
+import sys
+from pathlib import Path
+sys.path.insert(0, {root!r})
+from app import app
+scratch = Path({scratch!r})
+app.config['UPLOAD_FOLDER'] = scratch / 'uploads'
+app.config['OUTPUT_FOLDER'] = scratch / 'output'
+for folder in (app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER']):
+    folder.mkdir(exist_ok=True)
+app.run(host='127.0.0.1', port={port}, threaded=True, debug=False, use_reloader=False)
+"""
+
+
+def parse_mix(text: str) -> dict:
+    """'upload=1,default=6,download=3' -> {'upload': 1.0, ...}"""
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise ValueError(f"Unknown request kind '{kind}', expected one of {KINDS}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident set size of a local process from /proc (0 if unavailable)"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+class LoadTest:
+    """Local server, generated upload files and a pool of client threads"""
+
+    def __init__(self, clients: int, mix: dict, duration: float = None, requests: int = None,
+                 upload_files: int = 4, upload_lines: int = 20_000, seed: int = 42,
+                 timeout: float = 300):
+        self.clients = clients
+        self.mix = mix
+        self.duration = duration
+        self.requests = requests
+        self.upload_files = upload_files
+        self.upload_lines = upload_lines
+        self.seed = seed
+        self.timeout = timeout
+
+        self.scratch = Path(tempfile.mkdtemp(prefix='log_analyzer_load_'))
+        self.port = free_port()
+        self.base_url = f'http://127.0.0.1:{self.port}'
+        self.server = None
+        self.uploads = []
+        self.downloads = []  # Chart/report links returned by finished jobs
+        self.samples = []  # Per-request (kind, start offset, seconds, ok)
+        self.memory = []  # (seconds since start, RSS bytes)
+        self._lock = threading.Lock()
+        self._issued = 0
+        self._stop = threading.Event()
+
+    # -- setup ---------------------------------------------------------------
+
+    def generate_uploads(self) -> None:
+        sys.path.insert(0, str(project_root))
+        from generate_large_logs import LogGenerator, generate
+
+        upload_dir = self.scratch / 'to_upload'
+        for i in range(self.upload_files):
+            path = upload_dir / f'load_test_{i}.txt'
+            generate(LogGenerator(self.upload_lines, seed=self.seed + i), path, workers=1)
+            self.uploads.append(path)
+        print(f"🧪 Generated {self.upload_files} upload files of {self.upload_lines:,} lines")
+
+    def start_server(self) -> None:
+        script = SERVER_SCRIPT.format(root=str(project_root), scratch=str(self.scratch), port=self.port)
+        self.server_log = open(self.scratch / 'server.log', 'w')
+        self.server = subprocess.Popen([sys.executable, '-c', script], cwd=project_root,
+                                       stdout=self.server_log, stderr=subprocess.STDOUT)
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if self.server.poll() is not None:
+                raise RuntimeError(f"Server exited early, see {self.scratch / 'server.log'}")
+            try:
+                urllib.request.urlopen(f'{self.base_url}/status', timeout=1).read()
+                print(f"🌐 Server running on {self.base_url} (pid {self.server.pid})")
+                return
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.2)
+        raise RuntimeError("Server did not start within 60 seconds")
+
+    def stop_server(self) -> None:
+        if self.server is not None:
+            self.server.terminate()
+            try:
+                self.server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.server.kill()
+            self.server_log.close()
+
+    # -- requests ------------------------------------------------------------
+
+    def _request(self, kind: str, rng: random.Random) -> bool:
+        """Issue one request of ``kind``; returns True on success"""
+        if kind == 'upload':
+            path = rng.choice(self.uploads)
+            boundary = uuid.uuid4().hex
+            body = (f'--{boundary}\r\nContent-Disposition: form-data; name="log_file"; '
+                    f'filename="{path.name}"\r\nContent-Type: text/plain\r\n\r\n').encode() \
+                + path.read_bytes() + f'\r\n--{boundary}--\r\n'.encode()
+            request = urllib.request.Request(
+                f'{self.base_url}/upload', data=body, method='POST',
+                headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+        elif kind == 'default':
+            request = urllib.request.Request(f'{self.base_url}/analyze/default')
+        else:
+            with self._lock:
+                link = rng.choice(self.downloads) if self.downloads else None
+            if link is None:
+                return self._request('default', rng)
+            request = urllib.request.Request(f'{self.base_url}{link}')
+
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            payload = response.read()
+            content_type = response.headers.get('Content-Type', '')
+
+        if 'application/json' not in content_type:
+            return kind == 'download'  # A served file
+        result = json.loads(payload)
+        if result.get('status') != 'success':
+            return False
+        if kind != 'download':
+            links = list(result.get('charts', {}).values()) + [result.get('report')]
+            with self._lock:
+                self.downloads.extend(link for link in links if link)
+                del self.downloads[:-200]  # Older jobs may have been evicted
+        return True
+
+    def _next_kind(self, rng: random.Random):
+        with self._lock:
+            if self._stop.is_set() or (self.requests is not None and self._issued >= self.requests):
+                return None
+            self._issued += 1
+        kinds, weights = zip(*self.mix.items())
+        return rng.choices(kinds, weights)[0]
+
+    def _client(self, index: int, started: float) -> None:
+        rng = random.Random(self.seed * 1000 + index)
+        while True:
+            kind = self._next_kind(rng)
+            if kind is None:
+                return
+            began = time.perf_counter()
+            try:
+                ok = self._request(kind, rng)
+            except (urllib.error.URLError, OSError, ValueError):
+                ok = False
+            elapsed = time.perf_counter() - began
+            with self._lock:
+                self.samples.append((kind, began - started, elapsed, ok))
+
+    def _sample_memory(self, started: float) -> None:
+        while not self._stop.wait(MEMORY_SAMPLE_INTERVAL):
+            self.memory.append((time.perf_counter() - started, rss_bytes(self.server.pid)))
+
+    def run(self) -> dict:
+        """Run the load test and return its results"""
+        self.generate_uploads()
+        self.start_server()
+        try:
+            # One analysis up front so downloads have links to fetch
+            self._request('default', random.Random(self.seed))
+
+            started = time.perf_counter()
+            self.memory.append((0.0, rss_bytes(self.server.pid)))
+            sampler = threading.Thread(target=self._sample_memory, args=(started,), daemon=True)
+            sampler.start()
+            workers = [threading.Thread(target=self._client, args=(i, started)) for i in range(self.clients)]
+            for worker in workers:
+                worker.start()
+            if self.duration is not None:
+                self._stop.wait(self.duration)
+                self._stop.set()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+            self._stop.set()
+            sampler.join()
+            self.memory.append((elapsed, rss_bytes(self.server.pid)))
+        finally:
+            self.stop_server()
+            shutil.rmtree(self.scratch, ignore_errors=True)
+        return self.summarize(elapsed)
+
+    # -- results -------------------------------------------------------------
+
+    @staticmethod
+    def _latency_stats(samples: list, elapsed: float) -> dict:
+        latencies = sorted(s[2] for s in samples)
+        errors = sum(1 for s in samples if not s[3])
+        return {
+            'requests': len(samples),
+            'errors': errors,
+            'error_rate': errors / len(samples) * 100 if samples else 0,
+            'throughput_rps': len(samples) / elapsed if elapsed else 0,
+            'p50_seconds': percentile(latencies, 50),
+            'p95_seconds': percentile(latencies, 95),
+            'p99_seconds': percentile(latencies, 99),
+            'max_seconds': latencies[-1] if latencies else 0
+        }
+
+    def summarize(self, elapsed: float) -> dict:
+        rss = [value for _, value in self.memory if value]
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'clients': self.clients,
+            'mix': self.mix,
+            'elapsed_seconds': elapsed,
+            'upload_lines': self.upload_lines,
+            'overall': self._latency_stats(self.samples, elapsed),
+            'by_kind': {
+                kind: self._latency_stats([s for s in self.samples if s[0] == kind], elapsed)
+                for kind in KINDS if any(s[0] == kind for s in self.samples)
+            },
+            'server_memory': {
+                'start_mb': rss[0] / 1024 / 1024 if rss else None,
+                'peak_mb': max(rss) / 1024 / 1024 if rss else None,
+                'end_mb': rss[-1] / 1024 / 1024 if rss else None,
+                'samples': [(round(t, 2), value) for t, value in self.memory]
+            }
+        }
+
+
+def print_results(results: dict) -> None:
+    print(f"\n📊 LOAD TEST RESULTS ({results['clients']} clients, {results['elapsed_seconds']:.1f}s):")
+    print(f"  {'kind':<10} {'requests':>9} {'errors':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    rows = list(results['by_kind'].items()) + [('overall', results['overall'])]
+    for kind, s in rows:
+        print(f"  {kind:<10} {s['requests']:>9,} {s['error_rate']:>6.1f}% {s['throughput_rps']:>8.1f} "
+              f"{s['p50_seconds']:>7.3f}s {s['p95_seconds']:>7.3f}s {s['p99_seconds']:>7.3f}s")
+
+    memory = results['server_memory']
+    if memory['peak_mb'] is not None:
+        print(f"\n🧠 Server RSS: {memory['start_mb']:.0f} MB at start, {memory['peak_mb']:.0f} MB peak, "
+              f"{memory['end_mb']:.0f} MB at end")
+        samples = memory['samples']
+        step = max(1, len(samples) // 10)
+        print("  " + "  ".join(f"{t:.0f}s:{value / 1024 / 1024:.0f}MB" for t, value in samples[::step]))
+
+
+def main():
+    """Main function with command line arguments"""
+    parser = argparse.ArgumentParser(description='Load test the web service on a local server')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent clients (default: 8)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Request mix weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--duration', type=float, help='Seconds to run (default: 30 unless --requests is given)')
+    parser.add_argument('--requests', type=int, help='Total requests to issue instead of a duration')
+    parser.add_argument('--upload-files', type=int, default=4, help='Distinct generated upload files (default: 4)')
+    parser.add_argument('--upload-lines', default='20K', help='Lines per upload file (default: 20K)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for files and request mix (default: 42)')
+    parser.add_argument('--max-p95', type=float, help='Fail if overall p95 latency exceeds this many seconds')
+    parser.add_argument('--max-error-rate', type=float, default=1.0,
+                        help='Fail if more than this %% of requests fail (default: 1.0)')
+    parser.add_argument('--output', type=str, help='Results JSON path (default: benchmarks/results/)')
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(project_root))
+    from generate_large_logs import parse_count
+
+    duration = args.duration if args.duration is not None or args.requests else 30.0
+    test = LoadTest(args.clients, parse_mix(args.mix), duration=duration, requests=args.requests,
+                    upload_files=args.upload_files, upload_lines=parse_count(args.upload_lines),
+                    seed=args.seed)
+    results = test.run()
+    print_results(results)
+
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output_path.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"📄 Results saved to: {output_path}")
+
+    failures = []
+    overall = results['overall']
+    if overall['error_rate'] > args.max_error_rate:
+        failures.append(f"error rate {overall['error_rate']:.1f}% is above {args.max_error_rate:g}%")
+    if args.max_p95 is not None and overall['p95_seconds'] > args.max_p95:
+        failures.append(f"p95 latency {overall['p95_seconds']:.3f}s is above {args.max_p95:g}s")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Load test passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""
+Stage-by-stage pipeline benchmark on deterministic datasets
+
+Generates seeded log files of fixed sizes (100K, 1M, 10M, 100M lines;
+cached under benchmarks/data/), then runs the analyzer stages on each in
+a fresh worker process:
+
+    read       LogReader.read_lines
+    parse      LogParser.parse_line over the read lines
+    aggregate  DataProcessor.create_dataframe + analyze
+    render     both charts (matplotlib)
+    report     ReportGenerator.generate
+
+Each stage is timed separately over warmup + repeated runs (median of the
+repeats is kept) and the worker's peak RSS is recorded. With
+--profile-memory one extra, untimed run traces every stage with
+tracemalloc (peak and retained memory, bytes per parsed line, top
+allocation sites).
+
+Results are written as JSON and compared against the committed baseline
+(pipeline_baseline.json): the run fails when a stage's throughput drops,
+or peak memory grows, by more than the threshold, and when a size has no
+baseline to compare against (record one with --save-baseline). Stages
+faster than MIN_GATED_SECONDS are reported but not gated.
+
+The 10M and 100M sizes hold every parsed record in memory, so they need a
+machine with correspondingly large RAM.
+
+Usage:
+    python benchmarks/pipeline.py                      # 100K and 1M
+    python benchmarks/pipeline.py --sizes 100K 1M 10M --repeats 5
+    python benchmarks/pipeline.py --profile-memory
+    python benchmarks/pipeline.py --save-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+src_dir = project_root / "src"
+
+BENCH_DIR = Path(__file__).parent
+DATA_DIR = BENCH_DIR / "data"
+RESULTS_DIR = BENCH_DIR / "results"
+BASELINE_PATH = BENCH_DIR / "pipeline_baseline.json"
+
+STAGES = ('read', 'parse', 'aggregate', 'render', 'report')
+DEFAULT_SIZES = ('100K', '1M')
+DATASET_VERSION = 2  # Bump when the dataset recipe changes
+SEED = 20250115
+MIN_GATED_SECONDS = 0.05  # Faster stages are too noisy to gate on throughput
+MIN_GATED_BYTES = 1024 * 1024  # Likewise for traced memory peaks
+
+SUFFIXES = {'K': 1_000, 'M': 1_000_000, 'G': 1_000_000_000}
+
+
+def parse_size(text: str) -> int:
+    """'100K' -> 100000, '10M' -> 10000000, '5000' -> 5000"""
+    text = text.strip().upper()
+    if text and text[-1] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def dataset_path(lines: int, seed: int = SEED) -> Path:
+    return DATA_DIR / f"bench-{lines}-s{seed}-v{DATASET_VERSION}.txt"
+
+
+def make_dataset(lines: int, seed: int = SEED) -> Path:
+    """
+    Write (or reuse) a deterministic dataset of ``lines`` lines
+
+    Built with generate_large_logs.LogGenerator: the same seed and size
+    always give byte-identical files.
+    """
+    path = dataset_path(lines, seed)
+    if path.exists():
+        return path
+
+    sys.path.insert(0, str(project_root))
+    from generate_large_logs import LogGenerator, generate
+
+    print(f"🧪 Generating {lines:,} lines -> {path}")
+    tmp_path = path.with_suffix('.tmp')
+    generate(LogGenerator(lines, seed=seed), tmp_path)
+    tmp_path.replace(path)
+    return path
+
+
+def run_stages(file_path: Path, engine: str, out_dir: Path, memory=None) -> dict:
+    """
+    Run every stage once, returning seconds per stage
+
+    Args:
+        memory: Started MemoryProfiler that traces each stage (optional)
+    """
+    from log_reader import LogReader
+    from log_parser import LogParser
+    from data_processor import DataProcessor
+    from report_generator import ReportGenerator
+
+    timings = {}
+    stage = memory.stage if memory else (lambda name: contextlib.nullcontext())
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        with stage('read'):
+            reader = LogReader(str(file_path))
+            lines = list(reader.read_lines())
+        timings['read'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with stage('parse'):
+            parser = LogParser()
+            parse = parser.parse_line
+            parsed_logs = [record for record in map(parse, lines) if record]
+        timings['parse'] = time.perf_counter() - started
+        del lines
+
+        started = time.perf_counter()
+        with stage('aggregate'):
+            processor = DataProcessor(engine=engine)
+            processor.create_dataframe(parsed_logs, parser.tables)
+            stats = processor.analyze()
+        timings['aggregate'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with stage('render'):
+            from visualizer import render_error_distribution, render_top_ips
+            render_error_distribution(stats, out_dir / "error_distribution.png")
+            render_top_ips(stats, out_dir / "top_ips.png")
+        timings['render'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with stage('report'):
+            ReportGenerator(str(out_dir / "summary_report.txt")).generate(
+                stats, parser.get_stats(), reader.get_stats())
+        timings['report'] = time.perf_counter() - started
+
+    timings['parsed_lines'] = len(parsed_logs)
+    return timings
+
+
+def worker(file_path: Path, lines: int, engine: str, warmup: int, repeats: int,
+           profile_memory: bool = False) -> dict:
+    """Benchmark one dataset in this process"""
+    sys.path.insert(0, str(src_dir))
+    runs = []
+    memory_stats = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(warmup + repeats):
+            timings = run_stages(file_path, engine, Path(tmp))
+            if i >= warmup:
+                runs.append(timings)
+        # ru_maxrss is in kilobytes on Linux; read before tracemalloc adds its own
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        if profile_memory:
+            from profiling import MemoryProfiler
+            memory = MemoryProfiler()
+            memory.start()
+            parsed_lines = run_stages(file_path, engine, Path(tmp), memory)['parsed_lines']
+            memory_stats = memory.get_stats(parsed_lines, 'parse')
+            memory.stop()
+
+    result = {'lines': lines, 'stages': {}}
+    for stage in STAGES:
+        seconds = statistics.median(run[stage] for run in runs)
+        result['stages'][stage] = {
+            'seconds': seconds,
+            'min_seconds': min(run[stage] for run in runs),
+            'lines_per_second': lines / seconds if seconds else None
+        }
+    total = sum(result['stages'][stage]['seconds'] for stage in STAGES)
+    result['total_seconds'] = total
+    result['lines_per_second'] = lines / total if total else None
+    result['peak_rss_mb'] = peak_rss_mb
+    if memory_stats:
+        result['memory'] = memory_stats
+    return result
+
+
+def run_size(size: str, engine: str, warmup: int, repeats: int, profile_memory: bool = False) -> dict:
+    """Generate the dataset for ``size`` and benchmark it in a fresh process"""
+    lines = parse_size(size)
+    file_path = make_dataset(lines)
+
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as tmp:
+        result_path = Path(tmp.name)
+    try:
+        subprocess.run(
+            [sys.executable, __file__, '--worker', str(file_path), '--lines', str(lines),
+             '--engine', engine, '--warmup', str(warmup), '--repeats', str(repeats),
+             '--result-file', str(result_path)] + (['--profile-memory'] if profile_memory else []),
+            cwd=project_root,
+            check=True
+        )
+        return json.loads(result_path.read_text(encoding='utf-8'))
+    finally:
+        result_path.unlink(missing_ok=True)
+
+
+def check(results: dict, baseline: dict, threshold: float) -> list:
+    """Return a list of regression messages (empty when all checks pass)"""
+    failures = []
+    for size, result in results.items():
+        base = baseline.get(size)
+        if base is None:
+            failures.append(f"{size}: no baseline to compare against (record one with --save-baseline)")
+            continue
+
+        for stage in STAGES:
+            if result['stages'][stage]['seconds'] < MIN_GATED_SECONDS:
+                continue
+            now = result['stages'][stage]['lines_per_second']
+            before = base['stages'].get(stage, {}).get('lines_per_second')
+            if now and before and now < before * (1 - threshold):
+                failures.append(
+                    f"{size} {stage}: {now:,.0f} lines/s is more than {threshold:.0%} "
+                    f"below baseline {before:,.0f} lines/s"
+                )
+
+        if result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + threshold):
+            failures.append(
+                f"{size} peak memory {result['peak_rss_mb']:.0f} MB is more than {threshold:.0%} "
+                f"above baseline {base['peak_rss_mb']:.0f} MB"
+            )
+
+        # Traced per-stage peaks, when both runs profiled memory
+        base_memory = {s['stage']: s for s in base.get('memory', {}).get('stages', [])}
+        for now in result.get('memory', {}).get('stages', []):
+            before = base_memory.get(now['stage'])
+            if before is None or before['peak_bytes'] < MIN_GATED_BYTES:
+                continue
+            if now['peak_bytes'] > before['peak_bytes'] * (1 + threshold):
+                failures.append(
+                    f"{size} {now['stage']} traced peak {now['peak_bytes'] / 1024 / 1024:.1f} MB is more than "
+                    f"{threshold:.0%} above baseline {before['peak_bytes'] / 1024 / 1024:.1f} MB"
+                )
+    return failures
+
+
+def print_table(results: dict) -> None:
+    header = f"  {'size':>6}  " + "  ".join(f"{stage:>10}" for stage in STAGES) + f"  {'total':>8}  {'peak MB':>8}"
+    print(header)
+    for size, result in results.items():
+        cells = "  ".join(f"{result['stages'][stage]['seconds']:9.3f}s" for stage in STAGES)
+        print(f"  {size:>6}  {cells}  {result['total_seconds']:7.2f}s  {result['peak_rss_mb']:8.0f}")
+
+    for size, result in results.items():
+        memory = result.get('memory')
+        if not memory:
+            continue
+        print(f"\n🧠 {size} traced memory (peak / retained MB):")
+        print("  " + "  ".join(
+            f"{s['stage']} {s['peak_bytes'] / 1024 / 1024:.1f}/{s['retained_bytes'] / 1024 / 1024:.1f}"
+            for s in memory['stages']))
+        if memory['bytes_per_parsed_line'] is not None:
+            print(f"  {memory['bytes_per_parsed_line']:,.0f} bytes per parsed line")
+        for site in memory['top_allocations'][:5]:
+            print(f"  {site['bytes'] / 1024 / 1024:8.1f} MB  {site['site']}")
+
+
+def main():
+    """Main function with command line arguments"""
+    parser = argparse.ArgumentParser(description='Stage-by-stage pipeline benchmark')
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES),
+                        help='Dataset sizes, e.g. 100K 1M 10M 100M (default: 100K 1M)')
+    parser.add_argument('--engine', choices=('auto', 'pandas', 'python'), default='auto',
+                        help='DataProcessor engine (default: auto)')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs per size (default: 1)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per size (default: 3)')
+    parser.add_argument('--threshold', type=float, default=0.20,
+                        help='Allowed throughput drop / memory growth vs baseline (default: 0.20 = 20%%)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f'Store the results as the new baseline ({BASELINE_PATH.name})')
+    parser.add_argument('--output', type=str, help='Results JSON path (default: benchmarks/results/)')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Add an untimed tracemalloc run: per-stage peak/retained memory and top allocation sites')
+    # Internal: benchmark one dataset inside a fresh worker process
+    parser.add_argument('--worker', type=str, help=argparse.SUPPRESS)
+    parser.add_argument('--lines', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = worker(Path(args.worker), args.lines, args.engine, args.warmup, args.repeats,
+                        args.profile_memory)
+        Path(args.result_file).write_text(json.dumps(result), encoding='utf-8')
+        return 0
+
+    print(f"⏱️ Pipeline benchmark (engine={args.engine}, warmup={args.warmup}, "
+          f"median of {args.repeats}):")
+    results = {size: run_size(size, args.engine, args.warmup, args.repeats, args.profile_memory)
+               for size in args.sizes}
+    print_table(results)
+
+    document = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'engine': args.engine,
+        'warmup': args.warmup,
+        'repeats': args.repeats,
+        'results': results
+    }
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output_path = RESULTS_DIR / f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output_path.write_text(json.dumps(document, indent=2), encoding='utf-8')
+    print(f"📄 Results saved to: {output_path}")
+
+    if args.save_baseline:
+        baseline = {}
+        if BASELINE_PATH.exists():
+            baseline = json.loads(BASELINE_PATH.read_text(encoding='utf-8'))
+        baseline.update(results)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2), encoding='utf-8')
+        print(f"✅ Baseline saved to: {BASELINE_PATH}")
+        return 0
+
+    baseline = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text(encoding='utf-8'))
+
+    failures = check(results, baseline, args.threshold)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ No pipeline regressions")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,120 +1,332 @@
 """
-Generate a large log file with 50,000+ entries for testing
+Generate large, realistic synthetic log files for testing and benchmarks
+
+Lines are produced in vectorized NumPy blocks, so generation runs at
+millions of lines per second per core, and every block draws from its own
+seeded generator: the same --seed gives byte-identical output whatever
+the number of workers or shards.
+
+Traffic model:
+- Client IPs follow a bounded Zipf distribution over --distinct-ips
+  addresses (rank 1 is the busiest), scrambled over the IPv4 space
+- Timestamps follow a diurnal curve (quiet at night, peak in the
+  afternoon) across --days days
+- Error bursts: short windows with a much higher error rate, largely
+  driven by a handful of offending IPs
+- Malformed lines of configurable kinds at --malformed-rate
+
+Output is one file, or --shards files written in parallel; with --gzip
+each block is compressed as its own gzip member, so shards and the
+single-file mode both compress in parallel.
+
+Usage:
+    python generate_large_logs.py                          # 50,000 lines
+    python generate_large_logs.py --lines 100M --shards 8 --gzip
+    python generate_large_logs.py --lines 10M --distinct-ips 5M --zipf 1.1
 """
 
-import random
-from datetime import datetime, timedelta
+import argparse
+import gzip
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
-def generate_large_log_file():
-    """Generate a log file with 50,000+ entries"""
-    
-    # Configuration
-    output_file = Path("data") / "large_server_logs.txt"
-    num_lines = 50000  # Minimum required: 50,000
-    
-    # Sample data
-    ips = [f"192.168.{random.randint(1, 255)}.{random.randint(1, 255)}" for _ in range(100)]
-    requests = ["GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS", "PATCH"]
-    status_codes = [200, 201, 301, 302, 400, 401, 403, 404, 500, 502, 503]
-    
-    print(f"Generating {num_lines:,} log entries...")
-    print(f"Output file: {output_file}")
-    
-    start_time = datetime(2025, 1, 15, 0, 0, 0)
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for i in range(num_lines):
-            # Generate log entry
-            timestamp = start_time + timedelta(seconds=i)
-            ip = random.choice(ips)
-            request = random.choice(requests)
-            status = random.choice(status_codes)
-            
-            # Add some malformed entries (2% of lines)
-            if random.random() < 0.02:
-                if random.random() < 0.5:
-                    f.write(f"MALFORMED_LINE_{i}\n")
-                else:
-                    f.write(f"{timestamp.strftime('%Y-%m-%d %H:%M:%S')},INVALID_IP,{request},{status}\n")
-            else:
-                f.write(f"{timestamp.strftime('%Y-%m-%d %H:%M:%S')},{ip},{request},{status}\n")
-            
-            # Show progress every 5000 lines
-            if i > 0 and i % 5000 == 0:
-                print(f"  Generated {i:,} lines...")
-    
-    print(f"✅ Successfully generated {num_lines:,} log entries")
-    print(f"📁 File size: {output_file.stat().st_size / (1024*1024):.2f} MB")
-    
-    return output_file
-
-def test_performance():
-    """Test the analyzer with large file"""
-    from src.main import main as run_analyzer
-    import time
-    
-    print("\n" + "="*60)
-    print("PERFORMANCE TEST WITH 50,000+ LOGS")
-    print("="*60)
-    
-    # Generate large log file
-    large_file = generate_large_log_file()
-    
-    print("\n⏱️ Starting performance analysis...")
-    start_time = time.time()
-    
-    try:
-        # We'll create a modified version to test with large file
-        print(f"\n📂 Testing with file: {large_file}")
-        
-        # Count lines first
-        with open(large_file, 'r', encoding='utf-8') as f:
-            line_count = sum(1 for _ in f)
-        print(f"📊 File contains: {line_count:,} lines")
-        
-        # Run a simplified test
-        print("\n🔍 Running analysis...")
-        from src.log_reader import LogReader
-        from src.log_parser import LogParser
-        
-        reader = LogReader(str(large_file))
-        parser = LogParser()
-        
-        parsed_count = 0
-        for line in reader.read_lines():
-            if parser.parse_line(line):
-                parsed_count += 1
-        
-        stats = reader.get_stats()
-        parse_stats = parser.get_stats()
-        
-        end_time = time.time()
-        duration = end_time - start_time
-        
-        print("\n" + "="*60)
-        print("PERFORMANCE RESULTS")
-        print("="*60)
-        print(f"Total lines processed: {stats['total_lines']:,}")
-        print(f"Lines per second: {stats['total_lines'] / duration:.0f}")
-        print(f"Successfully parsed: {parse_stats['parsed_count']:,}")
-        print(f"Failed to parse: {parse_stats['failed_count']:,}")
-        print(f"Parsing success rate: {parse_stats['success_rate']:.2f}%")
-        print(f"Total execution time: {duration:.2f} seconds")
-        print(f"Memory efficient: ✅ (Processes line by line)")
-        print(f"Handles malformed entries: ✅ ({parse_stats['failed_count']:,} handled)")
-        
-        if duration < 10:
-            print("\n✅ PERFORMANCE: EXCELLENT - Handles 50K+ logs efficiently!")
-        elif duration < 30:
-            print("\n✅ PERFORMANCE: GOOD - Within acceptable limits")
+import numpy as np
+
+DEFAULT_OUTPUT = Path("data") / "large_server_logs.txt"
+BLOCK_LINES = 250_000  # Lines per vectorized block (and per RNG stream)
+
+METHODS = np.array(["GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS", "PATCH"])
+METHOD_WEIGHTS = [0.70, 0.15, 0.05, 0.03, 0.03, 0.02, 0.02]
+OK_CODES = np.array([200, 201, 301, 302])
+OK_WEIGHTS = [0.86, 0.04, 0.04, 0.06]
+ERROR_CODES = np.array([400, 401, 403, 404, 500, 502, 503])
+ERROR_WEIGHTS = [0.10, 0.12, 0.08, 0.45, 0.15, 0.05, 0.05]
+BURST_ERROR_CODES = np.array([500, 502, 503, 401, 429])
+BURST_ERROR_WEIGHTS = [0.35, 0.25, 0.20, 0.15, 0.05]
+BURST_IPS = 16  # Offending IPs per burst
+
+MALFORMED_KINDS = ('garbage', 'bad_ip', 'bad_octet', 'bad_method', 'bad_timestamp', 'truncated')
+
+SUFFIXES = {'K': 1_000, 'M': 1_000_000, 'G': 1_000_000_000}
+
+
+def parse_count(text: str) -> int:
+    """'100K' -> 100000, '10M' -> 10000000, '5000' -> 5000"""
+    text = str(text).strip().upper()
+    if text and text[-1] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def scramble_ips(ranks: np.ndarray) -> np.ndarray:
+    """
+    Map popularity ranks to IPv4 addresses (uint32)
+
+    Multiplication by an odd constant is a bijection modulo 2**32, so
+    distinct ranks always give distinct addresses, spread over the space.
+    """
+    return ((ranks.astype(np.uint64) + np.uint64(1)) * np.uint64(2654435761) + np.uint64(0x0A000000)).astype(np.uint32)
+
+
+def format_ips(ips: np.ndarray) -> list:
+    """uint32 addresses to dotted strings"""
+    a = (ips >> 24).tolist()
+    b = (ips >> 16 & 255).tolist()
+    c = (ips >> 8 & 255).tolist()
+    d = (ips & 255).tolist()
+    return [f"{w}.{x}.{y}.{z}" for w, x, y, z in zip(a, b, c, d)]
+
+
+class LogGenerator:
+    """Seeded, block-vectorized synthetic log generator"""
+
+    def __init__(self, lines: int, seed: int = 42, distinct_ips: int = 100_000,
+                 zipf: float = 1.2, days: float = 1.0, start: str = "2025-01-15",
+                 diurnal: float = 0.6, error_rate: float = 0.05,
+                 bursts_per_day: int = 4, burst_seconds: int = 300,
+                 burst_error_rate: float = 0.6, malformed_rate: float = 0.02,
+                 malformed_kinds=MALFORMED_KINDS, gzip_level: int = 0):
+        """
+        Initialize LogGenerator
+
+        Args:
+            lines: Total lines to generate
+            seed: Seed for every random stream
+            distinct_ips: Size of the client IP population
+            zipf: Zipf exponent of IP popularity (0 = uniform)
+            days: Time span covered by the file
+            start: First day (YYYY-MM-DD)
+            diurnal: Amplitude of the daily traffic curve, 0 (flat) to <1
+            error_rate: Share of 4xx/5xx responses outside bursts
+            bursts_per_day: Error bursts per day
+            burst_seconds: Length of each burst
+            burst_error_rate: Share of errors during a burst
+            malformed_rate: Share of malformed lines
+            malformed_kinds: Kinds of malformed lines to mix in
+            gzip_level: 0 for plain text, 1-9 to gzip each block
+        """
+        unknown = set(malformed_kinds) - set(MALFORMED_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown malformed kinds {sorted(unknown)}, expected {MALFORMED_KINDS}")
+        if not 0 <= diurnal < 1:
+            raise ValueError("diurnal amplitude must be in [0, 1)")
+
+        self.lines = lines
+        self.seed = seed
+        self.distinct_ips = distinct_ips
+        self.zipf = zipf
+        self.error_rate = error_rate
+        self.burst_error_rate = burst_error_rate
+        self.malformed_rate = malformed_rate
+        self.malformed_kinds = tuple(malformed_kinds)
+        self.gzip_level = gzip_level
+        self.start = np.datetime64(start, 's')
+        self.duration = max(1, int(days * 86400))
+
+        # Cumulative traffic share per second; line i lands at the second
+        # where the curve passes (i + 0.5) / lines
+        seconds = np.arange(self.duration)
+        hour = (seconds % 86400) / 3600
+        weights = 1 + diurnal * np.cos((hour - 14) / 24 * 2 * np.pi)
+        self.cdf = np.cumsum(weights)
+        self.cdf /= self.cdf[-1]
+
+        rng = np.random.default_rng([seed, 0xB0])
+        burst_count = int(round(bursts_per_day * days))
+        self.burst_starts = np.sort(rng.integers(0, self.duration, burst_count))
+        self.burst_ends = self.burst_starts + burst_seconds
+        self.burst_ips = scramble_ips(
+            rng.integers(distinct_ips, 2 * distinct_ips + BURST_IPS, (burst_count, BURST_IPS)))
+
+    @property
+    def blocks(self) -> int:
+        return -(-self.lines // BLOCK_LINES)
+
+    def _ip_ranks(self, rng, size: int) -> np.ndarray:
+        """Bounded Zipf ranks in [0, distinct_ips) by inverse-CDF sampling"""
+        n, s = self.distinct_ips, self.zipf
+        u = rng.random(size)
+        if abs(s - 1) < 1e-9:
+            ranks = np.exp(u * np.log(n + 1))
         else:
-            print("\n⚠️ PERFORMANCE: SLOW - May need optimization")
-        
-    except Exception as e:
-        print(f"\n❌ Error during performance test: {e}")
-        import traceback
-        traceback.print_exc()
+            ranks = (u * ((n + 1) ** (1 - s) - 1) + 1) ** (1 / (1 - s))
+        return np.minimum(ranks.astype(np.int64) - 1, n - 1)
+
+    def render_block(self, index: int) -> bytes:
+        """Generate block ``index`` as encoded (optionally gzipped) bytes"""
+        first = index * BLOCK_LINES
+        size = min(BLOCK_LINES, self.lines - first)
+        rng = np.random.default_rng([self.seed, index])
+
+        positions = (np.arange(first, first + size) + 0.5) / self.lines
+        seconds = np.minimum(np.searchsorted(self.cdf, positions), self.duration - 1)
+
+        ips = scramble_ips(self._ip_ranks(rng, size))
+        methods = rng.choice(len(METHODS), size, p=METHOD_WEIGHTS)
+
+        # Error bursts
+        burst = np.searchsorted(self.burst_starts, seconds, side='right') - 1
+        in_burst = burst >= 0
+        in_burst[in_burst] &= seconds[in_burst] < self.burst_ends[burst[in_burst]]
+
+        codes = OK_CODES[rng.choice(len(OK_CODES), size, p=OK_WEIGHTS)]
+        error_p = np.where(in_burst, self.burst_error_rate, self.error_rate)
+        is_error = rng.random(size) < error_p
+        codes[is_error] = ERROR_CODES[rng.choice(len(ERROR_CODES), int(is_error.sum()), p=ERROR_WEIGHTS)]
+        burst_errors = np.flatnonzero(is_error & in_burst)
+        if len(burst_errors):
+            codes[burst_errors] = BURST_ERROR_CODES[
+                rng.choice(len(BURST_ERROR_CODES), len(burst_errors), p=BURST_ERROR_WEIGHTS)]
+            offenders = burst_errors[rng.random(len(burst_errors)) < 0.7]
+            ips[offenders] = self.burst_ips[burst[offenders], rng.integers(0, BURST_IPS, len(offenders))]
+
+        # Format only the distinct seconds and IPs, then index
+        unique_seconds, second_idx = np.unique(seconds, return_inverse=True)
+        stamps = np.datetime_as_string(self.start + unique_seconds, unit='s')
+        stamps = [stamp.replace('T', ' ') for stamp in stamps.tolist()]
+        unique_ips, ip_idx = np.unique(ips, return_inverse=True)
+        ip_text = format_ips(unique_ips)
+        method_text = METHODS.tolist()
+
+        lines = [
+            f"{stamps[t]},{ip_text[i]},{method_text[m]},{c}"
+            for t, i, m, c in zip(second_idx.tolist(), ip_idx.tolist(), methods.tolist(), codes.tolist())
+        ]
+
+        if self.malformed_rate and self.malformed_kinds:
+            bad = np.flatnonzero(rng.random(size) < self.malformed_rate)
+            kinds = rng.integers(0, len(self.malformed_kinds), len(bad))
+            for position, kind in zip(bad.tolist(), kinds.tolist()):
+                lines[position] = self._malform(lines[position], self.malformed_kinds[kind], first + position)
+
+        data = ("\n".join(lines) + "\n").encode('ascii')
+        if self.gzip_level:
+            data = gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+        return data
+
+    @staticmethod
+    def _malform(line: str, kind: str, number: int) -> str:
+        stamp, ip, method, code = line.split(',')
+        if kind == 'garbage':
+            return f"MALFORMED_LINE_{number}"
+        if kind == 'bad_ip':
+            return f"{stamp},INVALID_IP,{method},{code}"
+        if kind == 'bad_octet':
+            return f"{stamp},999.{ip.split('.', 1)[1]},{method},{code}"
+        if kind == 'bad_method':
+            return f"{stamp},{ip},FETCH,{code}"
+        if kind == 'bad_timestamp':
+            return f"{stamp.replace('-', '/')},{ip},{method},{code}"
+        return line[:len(line) // 2]  # truncated
+
+    def write_blocks(self, path: Path, block_range: range) -> int:
+        """Write a contiguous range of blocks to ``path``; returns bytes written"""
+        written = 0
+        with open(path, 'wb') as f:
+            for index in block_range:
+                written += f.write(self.render_block(index))
+        return written
+
+
+def shard_paths(output: Path, shards: int, gzip_output: bool) -> list:
+    """Output file names: data/x.txt or data/x.part-0000.txt (+ .gz)"""
+    suffix = output.suffix + ('.gz' if gzip_output else '')
+    if shards == 1:
+        return [output.with_name(output.stem + suffix)]
+    return [output.with_name(f"{output.stem}.part-{i:04d}{suffix}") for i in range(shards)]
+
+
+def _write_shard(generator: LogGenerator, job) -> int:
+    path, block_range = job
+    return generator.write_blocks(path, block_range)
+
+
+def generate(generator: LogGenerator, output: Path = DEFAULT_OUTPUT, shards: int = 1,
+             workers: int = None) -> list:
+    """
+    Generate the full corpus
+
+    Args:
+        generator: Configured LogGenerator
+        output: Output file (shards get .part-NNNN before the suffix)
+        shards: Number of output files, written in parallel
+        workers: Worker processes (default: one per CPU)
+
+    Returns:
+        List of written paths
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = max(1, min(shards, generator.blocks))
+    paths = shard_paths(output, shards, bool(generator.gzip_level))
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    if shards == 1 and workers == 1:
+        generator.write_blocks(paths[0], range(generator.blocks))
+    elif shards == 1:
+        # Blocks generated in parallel, written in order by this process
+        with ProcessPoolExecutor(workers) as pool, open(paths[0], 'wb') as f:
+            for data in pool.map(generator.render_block, range(generator.blocks), chunksize=1):
+                f.write(data)
+    else:
+        bounds = np.linspace(0, generator.blocks, shards + 1).astype(int)
+        jobs = [(path, range(bounds[i], bounds[i + 1])) for i, path in enumerate(paths)]
+        with ProcessPoolExecutor(min(workers, shards)) as pool:
+            list(pool.map(partial(_write_shard, generator), jobs))
+    return paths
+
+
+def main():
+    """Main function with command line arguments"""
+    parser = argparse.ArgumentParser(description='Generate realistic synthetic server logs')
+    parser.add_argument('--lines', default='50000', help='Lines to generate, e.g. 50000, 10M (default: 50000)')
+    parser.add_argument('--output', '-o', default=str(DEFAULT_OUTPUT), help=f'Output file (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--shards', type=int, default=1, help='Number of output files (default: 1)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+    parser.add_argument('--gzip', nargs='?', type=int, const=6, default=0, metavar='LEVEL',
+                        help='Gzip the output (level 1-9, default 6 when given)')
+    parser.add_argument('--distinct-ips', default='100K', help='Client IP population (default: 100K)')
+    parser.add_argument('--zipf', type=float, default=1.2, help='Zipf exponent of IP popularity, 0 = uniform (default: 1.2)')
+    parser.add_argument('--days', type=float, default=1.0, help='Days covered (default: 1)')
+    parser.add_argument('--start', default='2025-01-15', help='First day, YYYY-MM-DD (default: 2025-01-15)')
+    parser.add_argument('--diurnal', type=float, default=0.6, help='Daily traffic curve amplitude, 0-1 (default: 0.6)')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Error share outside bursts (default: 0.05)')
+    parser.add_argument('--bursts-per-day', type=int, default=4, help='Error bursts per day (default: 4)')
+    parser.add_argument('--burst-seconds', type=int, default=300, help='Burst length in seconds (default: 300)')
+    parser.add_argument('--burst-error-rate', type=float, default=0.6, help='Error share during bursts (default: 0.6)')
+    parser.add_argument('--malformed-rate', type=float, default=0.02, help='Malformed line share (default: 0.02)')
+    parser.add_argument('--malformed-kinds', nargs='+', default=list(MALFORMED_KINDS), choices=MALFORMED_KINDS,
+                        help='Kinds of malformed lines (default: all)')
+    args = parser.parse_args()
+
+    generator = LogGenerator(
+        parse_count(args.lines), seed=args.seed, distinct_ips=parse_count(args.distinct_ips),
+        zipf=args.zipf, days=args.days, start=args.start, diurnal=args.diurnal,
+        error_rate=args.error_rate, bursts_per_day=args.bursts_per_day,
+        burst_seconds=args.burst_seconds, burst_error_rate=args.burst_error_rate,
+        malformed_rate=args.malformed_rate, malformed_kinds=args.malformed_kinds,
+        gzip_level=args.gzip
+    )
+
+    print(f"Generating {generator.lines:,} log entries (seed {args.seed}, "
+          f"{generator.distinct_ips:,} IPs, {args.shards} shard(s))...")
+    started = time.perf_counter()
+    paths = generate(generator, Path(args.output), args.shards, args.workers)
+    elapsed = time.perf_counter() - started
+
+    size = sum(path.stat().st_size for path in paths)
+    print(f"✅ Successfully generated {generator.lines:,} log entries in {elapsed:.2f}s "
+          f"({generator.lines / elapsed:,.0f} lines/s)")
+    for path in paths[:4]:
+        print(f"📁 {path}")
+    if len(paths) > 4:
+        print(f"   ... and {len(paths) - 4} more")
+    print(f"📁 Total size: {size / (1024 * 1024):.2f} MB")
+    return paths
+
 
 if __name__ == "__main__":
-    test_performance()
\ No newline at end of file
+    main()
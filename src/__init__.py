@@ -7,8 +7,20 @@ Exports main components
 from .log_reader import LogReader
 from .log_parser import LogParser
 from .data_processor import DataProcessor
-from .visualizer import Visualizer
 from .report_generator import ReportGenerator
 
+
+def __getattr__(name):
+    """Import Visualizer (matplotlib) and LogIndex (numpy) only when first used"""
+    if name == 'Visualizer':
+        from .visualizer import Visualizer
+        return Visualizer
+    if name == 'LogIndex':
+        from .log_index import LogIndex
+        return LogIndex
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __version__ = "1.0.0"
-__all__ = ['LogReader', 'LogParser', 'DataProcessor', 'Visualizer', 'ReportGenerator']
\ No newline at end of file
+__all__ = ['LogReader', 'LogParser', 'DataProcessor', 'Visualizer', 'ReportGenerator',
+           'LogIndex']
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""
+Incremental threshold alerts evaluated during the parse pass
+
+Rules are declared in a JSON file and compiled into evaluators that are
+updated line by line, so alerts fire while logs stream instead of after
+analysis:
+
+    [
+      {"name": "5xx rate", "type": "rate", "status": "5xx",
+       "threshold": 5, "window": "2m", "min_requests": 100},
+      {"name": "401 flood", "type": "count", "status": 401,
+       "group_by": "ip", "threshold": 500, "window": "10m"}
+    ]
+
+- ``rate``: matching requests as a percentage of all requests in the window
+- ``count``: matching requests in the window, optionally per ``ip``
+- ``status``: a code, a class such as "5xx", a list of both, or "any"
+- ``window``: seconds, or "30s" / "2m" / "1h"
+
+Evaluators are indexed by status code, so a line only touches the rules
+for its own code plus one shared request counter per distinct window
+length; the per-line cost does not grow with the number of rules. A
+fired rule (per key) stays quiet for ``cooldown`` (default: its window).
+
+Alerts are appended as JSON lines to a local file, standing in for a
+webhook.
+"""
+
+import json
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+try:
+    from .config import ALERT_RULES_PATH, ALERTS_OUTPUT_PATH
+    from .log_index import to_epoch
+    from .pass_observer import PassObserver
+except ImportError:
+    from config import ALERT_RULES_PATH, ALERTS_OUTPUT_PATH
+    from log_index import to_epoch
+    from pass_observer import PassObserver
+
+logger = logging.getLogger(__name__)
+
+RULE_TYPES = ('rate', 'count')
+MAX_REPORTED_ALERTS = 50  # Alerts kept in stats for the report
+UNITS = {'s': 1, 'm': 60, 'h': 3600}
+
+
+def parse_window(value) -> int:
+    """Window length in seconds from 120, '120', '30s', '2m' or '1h'"""
+    text = str(value).strip().lower()
+    if text and text[-1] in UNITS:
+        seconds = int(float(text[:-1]) * UNITS[text[-1]])
+    else:
+        seconds = int(text)
+    if seconds <= 0:
+        raise ValueError(f"Window must be positive, got '{value}'")
+    return seconds
+
+
+def parse_status(value) -> Optional[List[int]]:
+    """Status codes matched by a rule, or None for any status"""
+    if value is None or value == 'any':
+        return None
+    codes = []
+    for item in value if isinstance(value, list) else [value]:
+        text = str(item).strip().lower()
+        if len(text) == 3 and text.endswith('xx') and text[0].isdigit():
+            start = int(text[0]) * 100
+            codes.extend(range(start, start + 100))
+        else:
+            codes.append(int(text))
+    return codes
+
+
+class WindowCounter:
+    """Count of events in the last ``seconds`` seconds of log time"""
+
+    __slots__ = ('seconds', 'buckets', 'total')
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.buckets = deque()  # [second, count], oldest first
+        self.total = 0
+
+    def add(self, second: int) -> int:
+        """Count one event and return the current window total"""
+        buckets = self.buckets
+        if buckets and buckets[-1][0] >= second:
+            buckets[-1][1] += 1  # Same second (or a slightly late line)
+        else:
+            buckets.append([second, 1])
+        self.total += 1
+        self.expire(second)
+        return self.total
+
+    def expire(self, now: int) -> int:
+        """Drop seconds that left the window; returns the total"""
+        buckets = self.buckets
+        cutoff = now - self.seconds
+        while buckets and buckets[0][0] <= cutoff:
+            self.total -= buckets.popleft()[1]
+        return self.total
+
+
+class Rule:
+    """One compiled rule"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        """
+        Compile a rule specification
+
+        Raises:
+            ValueError: If the specification is invalid
+        """
+        self.name = spec.get('name') or json.dumps(spec, sort_keys=True)
+        self.type = spec.get('type', 'count')
+        if self.type not in RULE_TYPES:
+            raise ValueError(f"Rule '{self.name}': unknown type '{self.type}', expected one of {RULE_TYPES}")
+        self.group_by = spec.get('group_by')
+        if self.group_by not in (None, 'ip'):
+            raise ValueError(f"Rule '{self.name}': group_by must be 'ip'")
+        if self.type == 'rate' and self.group_by:
+            raise ValueError(f"Rule '{self.name}': rate rules cannot be grouped")
+        if 'threshold' not in spec:
+            raise ValueError(f"Rule '{self.name}': missing threshold")
+
+        self.status = parse_status(spec.get('status', 'any'))
+        self.threshold = float(spec['threshold'])
+        self.window = parse_window(spec.get('window', 60))
+        self.cooldown = parse_window(spec.get('cooldown', self.window))
+        self.min_requests = int(spec.get('min_requests', 1))
+
+        self.counters: Dict[Optional[str], WindowCounter] = {}
+        self.quiet_until: Dict[Optional[str], int] = {}
+        self.next_sweep = 0
+
+    def counter(self, key: Optional[str]) -> WindowCounter:
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.counters[key] = WindowCounter(self.window)
+        return counter
+
+    def sweep(self, now: int) -> None:
+        """Forget keys with nothing left in their window"""
+        for key in [key for key, counter in self.counters.items() if not counter.expire(now)]:
+            del self.counters[key]
+        for key in [key for key, until in self.quiet_until.items() if until <= now]:
+            del self.quiet_until[key]
+
+
+class AlertEngine(PassObserver):
+    """Evaluates compiled rules line by line and writes fired alerts"""
+
+    def __init__(self, rules: List[Dict[str, Any]], output_path: Optional[str] = None):
+        """
+        Initialize AlertEngine
+
+        Args:
+            rules: Rule specifications (see module docstring)
+            output_path: JSON-lines file alerts are appended to
+                (optional, defaults to config)
+        """
+        self.rules = [Rule(spec) for spec in rules]
+        self.output_path = Path(output_path) if output_path else ALERTS_OUTPUT_PATH
+
+        # Rules indexed by the status codes they watch
+        self.by_status: Dict[int, List[Rule]] = {}
+        self.any_status: List[Rule] = []
+        for rule in self.rules:
+            if rule.status is None:
+                self.any_status.append(rule)
+            else:
+                for code in set(rule.status):
+                    self.by_status.setdefault(code, []).append(rule)
+
+        # One request counter per window length, shared by all rate rules
+        self.request_counters = {
+            rule.window: WindowCounter(rule.window) for rule in self.rules if rule.type == 'rate'
+        }
+
+        self.alerts: List[Dict[str, Any]] = []
+        self.alert_count = 0
+        self._out = None
+        self._last_key = None
+        self._last_second = None
+
+    @classmethod
+    def from_file(cls, rules_path: Optional[str] = None, **kwargs) -> 'AlertEngine':
+        """Load rules from a JSON file (a list, or {"rules": [...]})"""
+        path = Path(rules_path) if rules_path else ALERT_RULES_PATH
+        with open(path, encoding='utf-8') as f:
+            rules = json.load(f)
+        if isinstance(rules, dict):
+            rules = rules.get('rules', [])
+        engine = cls(rules, **kwargs)
+        print(f"🚨 Loaded {len(engine.rules)} alert rules from {path}")
+        return engine
+
+    def observe(self, offset, length, line, parsed):
+        if parsed and parsed['timestamp'] is not None:
+            self.add(parsed, line[:19])
+
+    def add(self, record: Dict[str, Any], second_key: Optional[str] = None) -> None:
+        """
+        Evaluate one parsed record
+
+        Args:
+            record: Parsed log entry
+            second_key: Timestamp text of the raw line; consecutive lines
+                from the same second skip the epoch conversion
+        """
+        if second_key is None or second_key != self._last_key:
+            self._last_second = to_epoch(record['timestamp'])
+            self._last_key = second_key
+        second = self._last_second
+
+        for counter in self.request_counters.values():
+            counter.add(second)
+
+        rules = self.by_status.get(record['error_code'])
+        if rules:
+            for rule in rules:
+                self._update(rule, record, second)
+        for rule in self.any_status:
+            self._update(rule, record, second)
+
+    def _update(self, rule: Rule, record: Dict[str, Any], second: int) -> None:
+        """Count a matching record for one rule and fire it if needed"""
+        key = record['ip_address'] if rule.group_by == 'ip' else None
+        count = rule.counter(key).add(second)
+        if second >= rule.next_sweep:
+            # Swept only when the rule itself is hit, so idle rules cost nothing
+            rule.sweep(second)
+            rule.next_sweep = second + rule.window
+
+        if rule.type == 'rate':
+            requests = self.request_counters[rule.window].total
+            if requests < rule.min_requests:
+                return
+            value = count / requests * 100
+        else:
+            value = count
+
+        if value <= rule.threshold or rule.quiet_until.get(key, second) > second:
+            return
+
+        rule.quiet_until[key] = second + rule.cooldown
+        self._fire(rule, key, value, record)
+
+    def _fire(self, rule: Rule, key: Optional[str], value: float, record: Dict[str, Any]) -> None:
+        """Write one alert"""
+        unit = '%' if rule.type == 'rate' else ' requests'
+        subject = f" from {key}" if key else ''
+        alert = {
+            'rule': rule.name,
+            'fired_at': record['timestamp'].strftime("%Y-%m-%d %H:%M:%S"),
+            'key': key,
+            'value': round(value, 2),
+            'threshold': rule.threshold,
+            'window_seconds': rule.window,
+            'message': f"{rule.name}{subject}: {value:.2f}{unit} over {rule.window}s "
+                       f"(threshold {rule.threshold:g}{unit})"
+        }
+
+        if self._out is None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._out = open(self.output_path, 'a', encoding='utf-8')
+        self._out.write(json.dumps(alert) + "\n")
+        self._out.flush()
+
+        self.alert_count += 1
+        if len(self.alerts) < MAX_REPORTED_ALERTS:
+            self.alerts.append(alert)
+
+    def close(self) -> None:
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+    def finalize(self, stats):
+        self.close()
+        if self.alert_count:
+            print(f"🚨 {self.alert_count} alerts written to {self.output_path}")
+        stats['alerts'] = {
+            'count': self.alert_count,
+            'output_path': str(self.output_path),
+            'alerts': self.alerts
+        }
@@ -0,0 +1,99 @@
+"""
+Thin command line client for the analyzer daemon
+
+Sends a file path and options to analyzer_daemon.py over its Unix socket
+and prints the report. Only standard-library modules are imported, so the
+client itself starts in a few milliseconds.
+
+Usage:
+    python src/analyzer_client.py data/server_logs.txt
+    python src/analyzer_client.py --ping
+    python src/analyzer_client.py --shutdown
+"""
+
+import sys
+import os
+import json
+import socket
+from pathlib import Path
+
+# Same location as config.DAEMON_SOCKET_PATH, without importing config
+DEFAULT_SOCKET_PATH = Path(__file__).parent.parent / "logs" / "analyzer.sock"
+
+
+def send_request(request: dict, socket_path=DEFAULT_SOCKET_PATH, timeout: float = 300) -> dict:
+    """
+    Send one request to the daemon and return its decoded response
+
+    Raises:
+        ConnectionError: If the daemon is not running or closed the
+            connection without replying
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(
+                f"Analyzer daemon not running on {socket_path} "
+                f"(start it with: python src/analyzer_daemon.py)"
+            ) from e
+
+        sock.sendall((json.dumps(request) + "\n").encode('utf-8'))
+        with sock.makefile('rb') as response:
+            reply = response.readline().decode('utf-8')
+        if not reply.strip():
+            raise ConnectionError(f"Analyzer daemon on {socket_path} closed the connection without a reply")
+        return json.loads(reply)
+
+
+def main():
+    """Main function with command line arguments"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Log Analyzer daemon client')
+    parser.add_argument('file', nargs='?', help='Path to log file (default: daemon default)')
+    parser.add_argument('--socket', '-s', type=str, default=str(DEFAULT_SOCKET_PATH),
+                       help=f'Daemon socket path (default: {DEFAULT_SOCKET_PATH})')
+    parser.add_argument('--engine', choices=('auto', 'pandas', 'python'), default='auto',
+                       help='Aggregation engine used by the daemon')
+    parser.add_argument('--charts', action='store_true', help='Also render charts')
+    parser.add_argument('--save-report', action='store_true',
+                       help='Also write the report to the output folder')
+    parser.add_argument('--json', action='store_true', help='Print the raw JSON response')
+    parser.add_argument('--ping', action='store_true', help='Check the daemon is alive')
+    parser.add_argument('--shutdown', action='store_true', help='Stop the daemon')
+
+    args = parser.parse_args()
+
+    if args.ping:
+        request = {'command': 'ping'}
+    elif args.shutdown:
+        request = {'command': 'shutdown'}
+    else:
+        request = {
+            'command': 'analyze',
+            'engine': args.engine,
+            'charts': args.charts,
+            'save_report': args.save_report
+        }
+        if args.file:
+            # The daemon has its own working directory
+            request['file'] = os.path.abspath(args.file)
+
+    try:
+        response = send_request(request, args.socket)
+    except ConnectionError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    if args.json or 'report' not in response:
+        print(json.dumps(response, indent=2))
+    else:
+        print(response['report'])
+
+    return 0 if response.get('status') == 'success' else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Long-lived analyzer daemon listening on a local Unix socket
+
+The daemon keeps pandas/matplotlib imported, the parser compiled and the
+results of recently analyzed files cached, so repeated analyses requested
+through analyzer_client.py skip interpreter startup and reparsing.
+
+Protocol: one JSON object per line in each direction.
+    request:  {"command": "analyze", "file": "/abs/path.log",
+               "engine": "auto", "charts": false, "save_report": false}
+    response: {"status": "success", "report": "...", "cached": true, ...}
+Other commands: "ping", "stats", "shutdown".
+
+Usage:
+    python src/analyzer_daemon.py [--socket PATH]
+"""
+
+import sys
+import os
+import json
+import logging
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any
+
+# Add current directory to Python path
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+import config
+from log_reader import LogReader
+from log_parser import LogParser
+from data_processor import DataProcessor, ENGINES
+from report_generator import ReportGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyzerDaemon:
+    """Analyzes log files and keeps the results of recent files warm"""
+
+    def __init__(self, cache_size: int = config.DAEMON_CACHE_SIZE):
+        """
+        Initialize AnalyzerDaemon
+
+        Args:
+            cache_size: Number of analyzed files to keep cached
+        """
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.parse_locks: Dict[tuple, threading.Lock] = {}  # One parse per file at a time
+        self.output_lock = threading.Lock()  # Charts and the saved report use fixed paths
+        self.hits = 0
+        self.misses = 0
+        self.report_gen = ReportGenerator()
+
+    def warm_up(self) -> None:
+        """Import heavy modules and compile the parser once, up front"""
+        print("🔥 Warming up (pandas, matplotlib, parser)...")
+        DataProcessor(engine='pandas').get_dataframe()  # imports pandas
+        import visualizer  # noqa: F401  (imports matplotlib)
+        LogParser()
+
+    def _cache_key(self, file_path: Path, engine: str) -> tuple:
+        """Files are identified by path, size and modification time"""
+        stat = file_path.stat()
+        return (str(file_path), stat.st_size, stat.st_mtime_ns, engine)
+
+    def _analyze_uncached(self, file_path: Path, engine: str) -> Dict[str, Any]:
+        """Run the read/parse/analyze pipeline on one file"""
+        reader = LogReader(str(file_path))
+        parser = LogParser()
+
+        parsed_logs = []
+        for offset, length, line in reader.read_lines_with_offsets():
+            parsed = parser.parse_line(line, offset, length)
+            if parsed:
+                parsed_logs.append(parsed)
+
+        processor = DataProcessor(engine=engine)
+        processor.create_dataframe(parsed_logs, parser.tables)
+        stats = processor.analyze()
+        if stats:
+            stats['error_samples'] = processor.sample_error_lines(reader.file_path)
+
+        return {
+            'stats': stats,
+            'parsing_stats': parser.get_stats(),
+            'reading_stats': reader.get_stats()
+        }
+
+    def analyze(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Handle one analyze request
+
+        Args:
+            request: Decoded request (see module docstring)
+
+        Returns:
+            Response dictionary
+        """
+        start_time = time.perf_counter()
+
+        file_path = Path(request.get('file', config.DEFAULT_INPUT_FILE)).resolve()
+        engine = request.get('engine', 'auto')
+        if engine not in ENGINES:
+            return {'status': 'error', 'message': f"Unknown engine '{engine}'"}
+        if not file_path.is_file():
+            return {'status': 'error', 'message': f'File not found: {file_path}'}
+
+        key = self._cache_key(file_path, engine)
+        result = self._cached(key)
+        cached = result is not None
+        if not cached:
+            with self.cache_lock:
+                parse_lock = self.parse_locks.setdefault(key, threading.Lock())
+            with parse_lock:
+                # A concurrent request for the same file may have parsed it meanwhile
+                result = self._cached(key)
+                cached = result is not None
+                if not cached:
+                    result = self._analyze_uncached(file_path, engine)
+                    with self.cache_lock:
+                        self.misses += 1
+                        self.cache[key] = result
+                        while len(self.cache) > self.cache_size:
+                            self.cache.popitem(last=False)
+            with self.cache_lock:
+                self.parse_locks.pop(key, None)
+
+        stats = result['stats']
+        if request.get('charts'):
+            from visualizer import Visualizer
+            with self.output_lock:
+                Visualizer().create_all_charts(stats)
+
+        if request.get('save_report'):
+            with self.output_lock:
+                report_text = self.report_gen.generate(
+                    stats, result['parsing_stats'], result['reading_stats'])
+        else:
+            report_text = self.report_gen.build_report(
+                stats, result['parsing_stats'], result['reading_stats'])
+
+        return {
+            'status': 'success' if stats else 'error',
+            'file': str(file_path),
+            'cached': cached,
+            'report': report_text,
+            'stats': stats,
+            'duration_ms': round((time.perf_counter() - start_time) * 1000, 2)
+        }
+
+    def _cached(self, key: tuple):
+        """Cached result for a key (counted as a hit), or None"""
+        with self.cache_lock:
+            result = self.cache.get(key)
+            if result is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+            return result
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        with self.cache_lock:
+            return {
+                'cached_files': len(self.cache),
+                'cache_hits': self.hits,
+                'cache_misses': self.misses
+            }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON request line and writes one JSON response line"""
+
+    def handle(self):
+        daemon = self.server.daemon_state
+        shutdown = False
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+            command = request.get('command', 'analyze')
+
+            if command == 'analyze':
+                response = daemon.analyze(request)
+            elif command == 'ping':
+                response = {'status': 'success', 'pid': os.getpid()}
+            elif command == 'stats':
+                response = {'status': 'success', **daemon.get_stats()}
+            elif command == 'shutdown':
+                response = {'status': 'success', 'message': 'Shutting down'}
+                shutdown = True
+            else:
+                response = {'status': 'error', 'message': f"Unknown command '{command}'"}
+
+        except Exception as e:
+            logger.exception("Request failed")
+            response = {'status': 'error', 'message': str(e)}
+
+        self.wfile.write((json.dumps(response, default=str) + "\n").encode('utf-8'))
+        self.wfile.flush()
+        if shutdown:
+            # Only once the reply is out; shutdown() blocks, so not on this thread
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class AnalyzerServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server holding a shared AnalyzerDaemon"""
+
+    # server_close() joins in-flight handlers, so every reply is written before exit
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, socket_path: Path, daemon_state: AnalyzerDaemon):
+        self.daemon_state = daemon_state
+        super().__init__(str(socket_path), _RequestHandler)
+
+
+def _socket_alive(socket_path: Path) -> bool:
+    """True if a process accepts connections on the Unix socket"""
+    import socket
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(1)
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def serve(socket_path: Path = config.DAEMON_SOCKET_PATH, warm: bool = True) -> None:
+    """
+    Run the daemon until a shutdown command or Ctrl+C
+
+    Args:
+        socket_path: Unix socket to listen on
+        warm: Import heavy modules before accepting requests
+    """
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        if _socket_alive(socket_path):
+            print(f"❌ Another analyzer daemon is already listening on {socket_path}")
+            return
+        socket_path.unlink()  # Stale socket from a previous run
+
+    daemon_state = AnalyzerDaemon()
+    if warm:
+        daemon_state.warm_up()
+
+    with AnalyzerServer(socket_path, daemon_state) as server:
+        print(f"✅ Analyzer daemon listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+            print("👋 Analyzer daemon stopped")
+
+
+def main():
+    """Main function with command line arguments"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Log Analyzer daemon (Unix socket)')
+    parser.add_argument('--socket', '-s', type=str, default=str(config.DAEMON_SOCKET_PATH),
+                       help=f'Socket path (default: {config.DAEMON_SOCKET_PATH})')
+    parser.add_argument('--no-warm', action='store_true',
+                       help='Do not preload pandas/matplotlib at startup')
+
+    args = parser.parse_args()
+    serve(Path(args.socket), warm=not args.no_warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Block-level inverted index for fast raw-log search
+
+The log is split into fixed-size blocks of lines. Each block is stored
+zlib-compressed in a sidecar file (``<file>.blkidx``) together with a
+compact index mapping every IP, status code, method and hour to the
+blocks that contain it. A search decompresses only the blocks whose
+postings match every criterion and then filters their lines, so malformed
+lines are searchable too.
+
+Sidecar layout:
+    MAGIC | compressed block 0 | block 1 | ... | footer | footer length (8 bytes) | MAGIC
+
+The footer is zlib-compressed JSON holding the block table, the
+delta-encoded postings and the size / modification time of the log it was
+built from; a sidecar whose log has changed since is rejected.
+
+Usage:
+    python src/block_index.py build data/large_server_logs.txt
+    python src/block_index.py search data/large_server_logs.txt --status 503 --hour "2025-01-15 02"
+"""
+
+import sys
+import json
+import logging
+import re
+import struct
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, List
+
+try:
+    from .log_reader import LogReader
+    from .log_parser import LogParser
+    from .pass_observer import PassObserver
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from log_reader import LogReader
+    from log_parser import LogParser
+    from pass_observer import PassObserver
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 256 * 1024  # Raw bytes of log text per block
+SIDECAR_SUFFIX = '.blkidx'
+MAGIC = b'LABLKIDX2'
+COMPRESSION_LEVEL = 6
+
+HOUR_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}')
+METHODS = {'GET', 'POST', 'PUT', 'DELETE', 'HEAD', 'OPTIONS', 'PATCH'}
+
+
+def line_keys(line: str, parsed: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Index keys for one line
+
+    Parsed lines contribute their IP, status, method and hour. Malformed
+    lines are split on commas and contribute whichever fields still look
+    valid, plus the 'malformed' key.
+    """
+    if parsed:
+        return [
+            f"ip:{parsed['ip_address']}",
+            f"status:{parsed['error_code']}",
+            f"method:{parsed['request_type']}",
+            f"hour:{line[:13]}"
+        ]
+
+    keys = ['malformed']
+    fields = line.split(',')
+    if HOUR_PATTERN.match(fields[0]):
+        keys.append(f"hour:{fields[0][:13]}")
+    if len(fields) >= 2 and fields[1].count('.') == 3:
+        keys.append(f"ip:{fields[1]}")
+    if len(fields) >= 3 and fields[2] in METHODS:
+        keys.append(f"method:{fields[2]}")
+    if len(fields) >= 4 and fields[-1].isdigit():
+        keys.append(f"status:{int(fields[-1])}")
+    return keys
+
+
+def _encode_postings(block_ids: array) -> List[int]:
+    """Delta-encode a sorted list of block ids"""
+    deltas = array('I', block_ids)
+    for i in range(len(deltas) - 1, 0, -1):
+        deltas[i] -= deltas[i - 1]
+    return deltas.tolist()
+
+
+def _decode_postings(deltas: List[int]) -> array:
+    """Inverse of _encode_postings"""
+    block_ids = array('I', deltas)
+    for i in range(1, len(block_ids)):
+        block_ids[i] += block_ids[i - 1]
+    return block_ids
+
+
+def _log_signature(log_path: Path) -> Optional[List[int]]:
+    """[size, mtime_ns] of a log file, or None if it is missing"""
+    try:
+        stat = log_path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def sidecar_path(log_path) -> Path:
+    """Location of the block index sidecar for a log file"""
+    log_path = Path(log_path)
+    return log_path.with_name(log_path.name + SIDECAR_SUFFIX)
+
+
+class BlockIndexBuilder(PassObserver):
+    """Builds the block sidecar while the parse pass streams lines through"""
+
+    def __init__(self, log_path: str, block_size: int = BLOCK_SIZE):
+        """
+        Initialize BlockIndexBuilder
+
+        Args:
+            log_path: Log file being indexed (sidecar goes next to it)
+            block_size: Raw bytes of log text per block
+        """
+        self.log_path = Path(log_path)
+        self.output_path = sidecar_path(self.log_path)
+        self.block_size = block_size
+        self.signature = _log_signature(self.log_path)  # Taken before the pass reads the log
+
+        self._tmp_path = self.output_path.with_name(self.output_path.name + '.tmp')
+        self._out = None  # Opened with the first block; close() removes it if unfinished
+
+        self.blocks = []  # (data offset, compressed length, first line offset, line count)
+        self.postings: Dict[str, array] = {}
+        self._lines = []
+        self._bytes = 0
+        self._first_offset = 0
+        self._block_keys = set()
+
+    def observe(self, offset, length, line, parsed):
+        if not self._lines:
+            self._first_offset = offset
+        self._lines.append(line)
+        self._bytes += length + 1
+        self._block_keys.update(line_keys(line, parsed))
+
+        if self._bytes >= self.block_size:
+            self._flush_block()
+
+    def _flush_block(self) -> None:
+        """Compress the buffered lines and record the block's keys"""
+        if not self._lines:
+            return
+
+        if self._out is None:
+            self._out = open(self._tmp_path, 'wb')
+            self._out.write(MAGIC)
+
+        block_id = len(self.blocks)
+        data = zlib.compress("\n".join(self._lines).encode('utf-8'), COMPRESSION_LEVEL)
+        self.blocks.append((self._out.tell(), len(data), self._first_offset, len(self._lines)))
+        self._out.write(data)
+
+        for key in self._block_keys:
+            block_ids = self.postings.get(key)
+            if block_ids is None:
+                block_ids = self.postings[key] = array('I')
+            block_ids.append(block_id)
+
+        self._lines = []
+        self._bytes = 0
+        self._block_keys = set()
+
+    def finalize(self, stats=None) -> Path:
+        """Write the last block and the footer, then publish the sidecar"""
+        self._flush_block()
+        if self._out is None:  # Empty log: a sidecar with no blocks
+            self._out = open(self._tmp_path, 'wb')
+            self._out.write(MAGIC)
+
+        footer = zlib.compress(json.dumps({
+            'block_size': self.block_size,
+            'log_signature': self.signature,
+            'blocks': self.blocks,
+            'postings': {key: _encode_postings(ids) for key, ids in self.postings.items()}
+        }, separators=(',', ':')).encode('utf-8'), COMPRESSION_LEVEL)
+        self._out.write(footer)
+        self._out.write(struct.pack('<Q', len(footer)))
+        self._out.write(MAGIC)
+        self._out.close()
+        self._out = None
+
+        self._tmp_path.replace(self.output_path)
+        size = self.output_path.stat().st_size
+        print(f"✅ Block index saved to: {self.output_path} "
+              f"({len(self.blocks)} blocks, {len(self.postings):,} keys, {size / 1024:.0f} KB)")
+        if stats is not None:
+            stats['block_index'] = {'path': str(self.output_path), 'blocks': len(self.blocks)}
+        return self.output_path
+
+    def close(self) -> None:
+        """Discard an unfinished sidecar (the run failed before finalize)"""
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+            self._tmp_path.unlink(missing_ok=True)
+
+
+class BlockIndex:
+    """Reads a block sidecar and searches it"""
+
+    def __init__(self, path):
+        """
+        Open a block index sidecar
+
+        Args:
+            path: Sidecar path, or the log file it belongs to
+
+        Raises:
+            ValueError: If the file is not a block index (or an older
+                format), or its log changed since it was built
+        """
+        path = Path(path)
+        self.path = path if path.name.endswith(SIDECAR_SUFFIX) else sidecar_path(path)
+        self.log_path = self.path.with_name(self.path.name[:-len(SIDECAR_SUFFIX)])
+        self.blocks_read = 0
+
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a block index (or an older format; rebuild it): {self.path}")
+            f.seek(-(8 + len(MAGIC)), 2)
+            (footer_len,) = struct.unpack('<Q', f.read(8))
+            f.seek(-(8 + len(MAGIC) + footer_len), 2)
+            meta = json.loads(zlib.decompress(f.read(footer_len)))
+
+        if meta['log_signature'] != _log_signature(self.log_path):
+            raise ValueError(f"{self.log_path} changed since its block index was built; rebuild it")
+
+        self.blocks = meta['blocks']
+        self._postings = meta['postings']
+
+    def _block_ids(self, keys: List[str]) -> List[int]:
+        """Blocks containing every key"""
+        if not keys:
+            return list(range(len(self.blocks)))
+
+        matches = None
+        for key in keys:
+            data = self._postings.get(key)
+            if data is None:
+                return []
+            ids = set(_decode_postings(data))
+            matches = ids if matches is None else matches & ids
+        return sorted(matches)
+
+    def read_block(self, f, block_id: int) -> List[str]:
+        """Decompress one block into its lines"""
+        data_offset, length, _, _ = self.blocks[block_id]
+        f.seek(data_offset)
+        self.blocks_read += 1
+        return zlib.decompress(f.read(length)).decode('utf-8').split("\n")
+
+    def search(self, ip: Optional[str] = None, status: Optional[int] = None,
+               method: Optional[str] = None, hour: Optional[str] = None,
+               malformed: bool = False) -> Iterator[str]:
+        """
+        Yield raw lines matching every given criterion
+
+        Args:
+            ip: Exact IP address
+            status: HTTP status code
+            method: HTTP method
+            hour: Hour prefix, 'YYYY-MM-DD HH'
+            malformed: Only lines that fail to parse
+
+        Yields:
+            Matching lines, in file order
+        """
+        wanted = []
+        if ip is not None:
+            wanted.append(f"ip:{ip}")
+        if status is not None:
+            wanted.append(f"status:{int(status)}")
+        if method is not None:
+            wanted.append(f"method:{method.upper()}")
+        if hour is not None:
+            wanted.append(f"hour:{hour.replace('T', ' ')[:13]}")
+        if malformed:
+            wanted.append('malformed')
+
+        parser = LogParser()
+        with open(self.path, 'rb') as f:
+            for block_id in self._block_ids(wanted):
+                for line in self.read_block(f, block_id):
+                    # Blocks match as a whole; check each line exactly
+                    keys = line_keys(line, parser.parse_line(line))
+                    if all(key in keys for key in wanted):
+                        yield line
+
+    def get_stats(self) -> dict:
+        """Get index statistics"""
+        return {
+            'blocks': len(self.blocks),
+            'keys': len(self._postings),
+            'blocks_read': self.blocks_read
+        }
+
+
+def build_block_index(log_path: str, block_size: int = BLOCK_SIZE) -> Path:
+    """
+    Build the sidecar for a log file in a standalone pass
+
+    main_large.analyze_large_file(build_index=True) builds the same file
+    during its own parse pass instead.
+    """
+    reader = LogReader(log_path)
+    parser = LogParser()
+    builder = BlockIndexBuilder(log_path, block_size)
+    try:
+        for offset, length, line in reader.read_lines_with_offsets():
+            builder.observe(offset, length, line, parser.parse_line(line))
+        return builder.finalize()
+    finally:
+        builder.close()
+
+
+def main():
+    """Main function with command line arguments"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Block-level index for raw log search')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Build the sidecar index for a log file')
+    build.add_argument('file', help='Path to log file')
+    build.add_argument('--block-size', type=int, default=BLOCK_SIZE,
+                       help=f'Raw bytes per block (default: {BLOCK_SIZE})')
+
+    search = subparsers.add_parser('search', help='Print raw lines matching all criteria')
+    search.add_argument('file', help='Path to log file or its sidecar')
+    search.add_argument('--ip', type=str)
+    search.add_argument('--status', type=int)
+    search.add_argument('--method', type=str)
+    search.add_argument('--hour', type=str, help="Hour prefix, e.g. '2025-01-15 02'")
+    search.add_argument('--malformed', action='store_true', help='Only unparseable lines')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        build_block_index(args.file, args.block_size)
+        return
+
+    try:
+        index = BlockIndex(args.file)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    count = 0
+    for line in index.search(args.ip, args.status, args.method, args.hour, args.malformed):
+        print(line)
+        count += 1
+    stats = index.get_stats()
+    print(f"-- {count} lines from {stats['blocks_read']}/{stats['blocks']} blocks",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,12 @@ DEFAULT_INPUT_FILE = DATA_DIR / "large_server_logs.txt"
 SUMMARY_REPORT_PATH = OUTPUT_DIR / "summary_report.txt"
 VISUALIZATION_PATH = OUTPUT_DIR / "error_distribution.png"
 EXECUTION_LOG_PATH = LOG_DIR / "execution.log"
+DAEMON_SOCKET_PATH = LOG_DIR / "analyzer.sock"
+ROLLUP_DB_PATH = OUTPUT_DIR / "rollups.sqlite3"
+GEOIP_DB_PATH = DATA_DIR / "geoip_ranges.csv"
+ALERT_RULES_PATH = DATA_DIR / "alert_rules.json"
+ALERTS_OUTPUT_PATH = OUTPUT_DIR / "alerts.jsonl"
+INDEX_DIR = OUTPUT_DIR / "indexes"  # Query indexes; never next to (uploaded) logs
 
 # Log format
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -29,6 +35,25 @@ DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 # Analysis settings
 TOP_IP_COUNT = 5  # Show top 5 IPs with most errors
+TOP_GEO_COUNT = 10  # Countries / ASNs listed in the GeoIP breakdown
+SUBNET_HHH_THRESHOLD = 5.0  # % of errors for a /8, /16 or /24 to be a heavy hitter
+PURE_PYTHON_MAX_ROWS = 100000  # 'auto' engine skips pandas up to this many rows
+SAMPLE_LINES_PER_IP = 3  # Raw error lines shown in the report for each top IP
+
+# GeoIP enrichment
+GEOIP_CACHE_SIZE = 65536  # Per-IP lookups kept by the streaming LRU cache
+
+# Watchlist matching
+WATCHLIST_FP_RATE = 0.01  # Bloom filter false positive rate before the exact check
+WATCHLIST_CACHE_SIZE = 65536  # Per-IP results kept by the LRU cache
+
+# Sliding-window live metrics
+LIVE_WINDOWS = (60, 300, 900)  # 1, 5 and 15 minute windows, in seconds
+LIVE_SLOT_IP_CAPACITY = 64  # Distinct error IPs tracked per second for the top-K
+LIVE_BOOTSTRAP_BYTES = 8 * 1024 * 1024  # Tail of a file read when following starts
+
+# Analyzer daemon settings
+DAEMON_CACHE_SIZE = 32  # Parsed files kept warm, keyed by path/size/mtime
 
 # Print paths for debugging
 if __name__ == "__main__":
@@ -2,96 +2,217 @@
 Module for processing and analyzing log data
 """
 
-import pandas as pd
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, TYPE_CHECKING
 
 # Import config
 try:
-    from .config import TOP_IP_COUNT
+    from .config import PURE_PYTHON_MAX_ROWS, SAMPLE_LINES_PER_IP
 except ImportError:
     # Fallback
-    TOP_IP_COUNT = 5
+    PURE_PYTHON_MAX_ROWS = 100000
+    SAMPLE_LINES_PER_IP = 3
+
+try:
+    from .metric_registry import evaluate
+except ImportError:
+    from metric_registry import evaluate
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+ENGINES = ('auto', 'pandas', 'python')
+CATEGORICAL_COLUMNS = ('ip_address', 'request_type')
+
+
+def _pandas():
+    """Import pandas on first use so small runs never pay for it"""
+    import pandas as pd
+    return pd
+
+
+def _build_frame(records: List[Dict[str, Any]], tables: Optional[Dict[str, Any]] = None) -> 'pd.DataFrame':
+    """
+    DataFrame from parsed records, built column by column
+    
+    IP and request type columns become Categoricals: straight from the
+    codes of the parser's intern tables when given, otherwise by
+    factorizing the strings once (categories in order of first appearance).
+    """
+    pd = _pandas()
+    if not records:
+        return pd.DataFrame()
+    
+    tables = tables or {}
+    columns = {}
+    for column in records[0]:
+        values = [record[column] for record in records]
+        if column in tables:
+            values = tables[column].categorical(values)
+        elif column in CATEGORICAL_COLUMNS:
+            codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+            values = pd.Categorical.from_codes(codes, uniques)
+        columns[column] = values
+    return pd.DataFrame(columns)
+
 
 class DataProcessor:
     """Processes parsed log data"""
     
-    def __init__(self):
-        self.df = pd.DataFrame()  # Empty DataFrame
+    def __init__(self, engine: str = 'auto'):
+        """
+        Initialize DataProcessor
+        
+        Args:
+            engine: 'pandas', 'python' (pure-Python aggregation, never
+                imports pandas) or 'auto' (python below PURE_PYTHON_MAX_ROWS)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+        
+        self.engine = engine
+        self.df = None  # Built lazily by create_dataframe
+        self.records = []  # Used instead of a DataFrame on the python engine
+        self.tables = None  # Parser intern tables for the records, if any
         self.stats = {}
+        self.live = None  # SlidingWindow, created by enable_live
     
-    def create_dataframe(self, parsed_logs: List[Dict[str, Any]]) -> None:
+    def create_dataframe(self, parsed_logs: List[Dict[str, Any]],
+                         tables: Optional[Dict[str, Any]] = None) -> None:
         """
         Create DataFrame from parsed logs
         
+        On the python engine (or 'auto' with a small input) the records are
+        kept as-is and no DataFrame is built.
+        
         Args:
             parsed_logs: List of parsed log dictionaries
+            tables: LogParser.tables of the parser that produced them, so
+                IP and request type columns are built from intern codes
         """
         if not parsed_logs:
             print("⚠️ No logs to process")
             return
         
+        self.tables = tables
+        if self.engine == 'python' or (
+                self.engine == 'auto' and len(parsed_logs) <= PURE_PYTHON_MAX_ROWS):
+            self.records = parsed_logs
+            print(f"✅ Loaded {len(self.records)} rows (pure-Python engine)")
+            return
+        
         # Create DataFrame
-        self.df = pd.DataFrame(parsed_logs)
+        self.df = _build_frame(parsed_logs, tables)
         print(f"✅ Created DataFrame with {len(self.df)} rows")
     
-    def analyze(self) -> Dict[str, Any]:
+    def load_window(self, dataset_root: str, start=None, end=None) -> None:
+        """
+        Load a time window from a partitioned dataset instead of parsed logs
+        
+        Only partitions (and part files) overlapping the window are read.
+        
+        Args:
+            dataset_root: Root of a dataset written by PartitionWriter
+            start: Window start, inclusive (optional)
+            end: Window end, exclusive (optional)
+        """
+        try:
+            from .partitioned_store import PartitionedDataset
+        except ImportError:
+            from partitioned_store import PartitionedDataset
+        
+        dataset = PartitionedDataset(dataset_root)
+        self.df = dataset.read_dataframe(start, end)
+        self.records = []
+        
+        read_stats = dataset.get_stats()
+        print(f"✅ Loaded {len(self.df)} rows from {read_stats['files_read']} partition files "
+              f"({read_stats['files_skipped']} skipped, {read_stats['bytes_read']:,} bytes)")
+    
+    def analyze(self, metrics: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
         Analyze the log data
         
+        Args:
+            metrics: Names of registered metrics to compute (list or
+                comma-separated string); None computes all of them
+        
         Returns:
             Dictionary with analysis results
+            
+        Raises:
+            ValueError: For unknown metric names
         """
-        if self.df.empty:
+        source = self.df if self.df is not None else self.records
+        if len(source) == 0:
             print("⚠️ DataFrame is empty")
             return {}
         
         print("🔍 Analyzing data...")
         
         try:
-            # Basic counts
-            total_requests = len(self.df)
-            
-            # Filter error requests (HTTP 4xx and 5xx)
-            error_df = self.df[self.df['is_error']]
-            error_count = len(error_df)
-            
-            # Error code distribution
-            error_code_counts = error_df['error_code'].value_counts().to_dict()
-            
-            # Top IPs with errors
-            top_ips = error_df['ip_address'].value_counts().head(TOP_IP_COUNT).to_dict()
-            
-            # Request type distribution
-            request_counts = self.df['request_type'].value_counts().to_dict()
-            
-            # Error by request type
-            error_by_request = error_df['request_type'].value_counts().to_dict()
-            
-            # Compile results
-            self.stats = {
-                'total_requests': total_requests,
-                'error_requests': error_count,
-                'success_requests': total_requests - error_count,
-                'error_percentage': (error_count / total_requests * 100) if total_requests > 0 else 0,
-                'error_code_distribution': error_code_counts,
-                'top_error_ips': top_ips,
-                'request_type_distribution': request_counts,
-                'error_by_request': error_by_request,
-                'unique_ips': self.df['ip_address'].nunique(),
-                'unique_error_ips': error_df['ip_address'].nunique() if not error_df.empty else 0
-            }
-            
+            self.stats = evaluate(source, metrics)
             print("✅ Analysis complete!")
             return self.stats
             
+        except ValueError:
+            raise
         except Exception as e:
             print(f"❌ Error during analysis: {e}")
             return {}
     
+    def sample_error_lines(self, file_path, ips: Optional[List[str]] = None,
+                           limit: int = SAMPLE_LINES_PER_IP) -> Dict[str, List[str]]:
+        """
+        First few error lines of each IP, read back from the source file
+        
+        Records only carry byte offsets, so just the returned lines are
+        fetched (in one batch, through LineStore's mmap).
+        
+        Args:
+            file_path: Log file the records were parsed from
+            ips: IPs to sample (defaults to the top error IPs)
+            limit: Lines per IP
+            
+        Returns:
+            {ip: [line, ...]}, empty if the records have no offsets
+        """
+        try:
+            from .line_store import LineStore
+        except ImportError:
+            from line_store import LineStore
+        
+        if ips is None:
+            ips = list(self.stats.get('top_error_ips', {}))
+        wanted = set(ips)
+        locations = {ip: [] for ip in ips}
+        
+        if self.df is not None:
+            if 'offset' not in self.df.columns or not wanted:
+                return {}
+            mask = self.df['is_error'].to_numpy(dtype=bool) & self.df['ip_address'].isin(wanted).to_numpy()
+            rows = self.df.loc[mask, ['ip_address', 'offset', 'length']]
+            rows = rows.groupby('ip_address', observed=True, sort=False).head(limit)
+            for ip, offset, length in rows.itertuples(index=False):
+                locations[ip].append((offset, length))
+        else:
+            if not self.records or 'offset' not in self.records[0]:
+                return {}
+            remaining = len(wanted) * limit
+            for record in self.records:
+                ip = record['ip_address']
+                if record['is_error'] and ip in wanted and len(locations[ip]) < limit:
+                    locations[ip].append((record['offset'], record['length']))
+                    remaining -= 1
+                    if not remaining:
+                        break
+        
+        with LineStore(file_path) as store:
+            lines = iter(store.get_many([location for ip in ips for location in locations[ip]]))
+        return {ip: [next(lines) for _ in locations[ip]] for ip in ips}
+    
     def show_summary(self):
         """Display summary in console"""
         if not self.stats:
@@ -118,8 +239,36 @@ class DataProcessor:
             for ip, count in self.stats['top_error_ips'].items():
                 print(f"  {ip}: {count} errors")
     
-    def get_dataframe(self) -> pd.DataFrame:
-        """Get the DataFrame"""
+    def enable_live(self, windows=None):
+        """
+        Start keeping sliding-window (1/5/15 minute) metrics
+        
+        Args:
+            windows: Window lengths in seconds (optional, defaults to config)
+            
+        Returns:
+            The SlidingWindow fed by update_live
+        """
+        if self.live is None:
+            try:
+                from .live_window import SlidingWindow
+            except ImportError:
+                from live_window import SlidingWindow
+            self.live = SlidingWindow(windows) if windows else SlidingWindow()
+        return self.live
+    
+    def update_live(self, record: Dict[str, Any]) -> None:
+        """Add one parsed record to the sliding windows"""
+        self.live.add(record)
+    
+    def get_live_stats(self) -> Dict[str, Any]:
+        """Current sliding-window metrics (empty if live metrics are off)"""
+        return self.live.snapshot() if self.live is not None else {}
+    
+    def get_dataframe(self) -> 'pd.DataFrame':
+        """Get the DataFrame, building it from pure-Python records if needed"""
+        if self.df is None:
+            self.df = _build_frame(self.records, self.tables)
         return self.df
     
     def get_stats(self) -> Dict[str, Any]:
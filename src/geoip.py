@@ -0,0 +1,172 @@
+"""
+Local GeoIP/ASN enrichment from an IP range table
+
+The range database is a local CSV (no network lookups), one range per row:
+
+    start_ip,end_ip,country,asn,as_org
+    192.168.0.0,192.168.63.255,US,64500,Example Transit US
+
+``network`` (CIDR) may be given instead of start_ip/end_ip. Ranges are
+loaded into sorted uint32 NumPy arrays; lookups are a ``searchsorted``
+binary search, vectorized over all distinct IPs of a batch, or one IP at
+a time behind a bounded LRU cache when streaming.
+
+Enrichment adds 'country' and 'asn' to each parsed record, between
+parsing and aggregation; DataProcessor then reports errors per country
+and per ASN.
+"""
+
+import csv
+import logging
+from functools import lru_cache
+from ipaddress import ip_network
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+try:
+    from .config import GEOIP_DB_PATH, GEOIP_CACHE_SIZE
+    from .log_parser import ip_to_int
+except ImportError:
+    from config import GEOIP_DB_PATH, GEOIP_CACHE_SIZE
+    from log_parser import ip_to_int
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_COUNTRY = '--'
+
+
+class GeoIPDatabase:
+    """Sorted IPv4 range table with country and ASN per range"""
+
+    def __init__(self, db_path: str = None, cache_size: int = GEOIP_CACHE_SIZE):
+        """
+        Load a range database
+
+        Args:
+            db_path: CSV range file (optional, defaults to config)
+            cache_size: Entries kept by the per-IP LRU cache
+        """
+        self.db_path = Path(db_path) if db_path else GEOIP_DB_PATH
+
+        starts, ends, countries, asns = [], [], [], []
+        self.as_orgs: Dict[int, str] = {0: 'Unknown'}
+        with open(self.db_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('network'):
+                    network = ip_network(row['network'].strip(), strict=False)
+                    start, end = int(network.network_address), int(network.broadcast_address)
+                else:
+                    start, end = ip_to_int(row['start_ip'].strip()), ip_to_int(row['end_ip'].strip())
+                asn = int(row.get('asn') or 0)
+                starts.append(start)
+                ends.append(end)
+                countries.append((row.get('country') or UNKNOWN_COUNTRY).strip())
+                asns.append(asn)
+                if asn and row.get('as_org'):
+                    self.as_orgs[asn] = row['as_org'].strip()
+
+        order = np.argsort(np.asarray(starts, dtype=np.uint32), kind='stable')
+        self.starts = np.asarray(starts, dtype=np.uint32)[order]
+        self.ends = np.asarray(ends, dtype=np.uint32)[order]
+        self.asns = np.asarray(asns, dtype=np.uint32)[order]
+        # Country codes as indexes into a small table
+        self.country_names, country_codes = np.unique(
+            np.asarray(countries + [UNKNOWN_COUNTRY], dtype=object).astype(str), return_inverse=True)
+        self.country_codes = country_codes[:-1][order]
+        self._unknown_code = int(country_codes[-1])
+
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+        print(f"🌍 Loaded {len(self.starts):,} GeoIP ranges from {self.db_path}")
+
+    def _range_index(self, ips: np.ndarray) -> np.ndarray:
+        """Index of the range holding each IP, or -1"""
+        idx = np.searchsorted(self.starts, ips, side='right') - 1
+        found = idx >= 0
+        found[found] &= ips[found] <= self.ends[idx[found]]
+        return np.where(found, idx, -1)
+
+    def lookup_many(self, ips: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized lookup of uint32 IPs
+
+        Returns:
+            (country code strings, ASN numbers), 0 for unknown ASNs
+        """
+        idx = self._range_index(np.asarray(ips, dtype=np.uint32))
+        found = idx >= 0
+        codes = np.full(len(idx), self._unknown_code, dtype=np.int64)
+        codes[found] = self.country_codes[idx[found]]
+        asns = np.zeros(len(idx), dtype=np.uint32)
+        asns[found] = self.asns[idx[found]]
+        return self.country_names[codes], asns
+
+    def _lookup(self, ip_address: str) -> Tuple[str, str]:
+        """
+        Single-IP lookup; wrapped by the LRU cache as ``lookup``
+
+        Returns:
+            (country code, ASN label)
+        """
+        idx = int(self._range_index(np.array([ip_to_int(ip_address)], dtype=np.uint32))[0])
+        if idx < 0:
+            return UNKNOWN_COUNTRY, self.asn_label(0)
+        return str(self.country_names[self.country_codes[idx]]), self.asn_label(int(self.asns[idx]))
+
+    def asn_label(self, asn: int) -> str:
+        """'AS64500 Example Transit' style label"""
+        if not asn:
+            return 'Unknown'
+        org = self.as_orgs.get(asn)
+        return f"AS{asn} {org}" if org else f"AS{asn}"
+
+    def get_stats(self) -> dict:
+        """Get database and cache statistics"""
+        cache = self.lookup.cache_info()
+        return {
+            'ranges': len(self.starts),
+            'countries': len(self.country_names) - 1,
+            'cache_hits': cache.hits,
+            'cache_misses': cache.misses
+        }
+
+
+class GeoEnricher:
+    """Adds 'country' and 'asn' to parsed records"""
+
+    def __init__(self, db_path: str = None):
+        """
+        Initialize GeoEnricher
+
+        Args:
+            db_path: CSV range file (optional, defaults to config)
+        """
+        self.db = GeoIPDatabase(db_path)
+
+    def enrich(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Enrich one record in place (streaming path, LRU cached)"""
+        record['country'], record['asn'] = self.db.lookup(record['ip_address'])
+        return record
+
+    def enrich_records(self, parsed_logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Enrich a list of records in place (batch path)
+
+        Distinct IPs are resolved with one vectorized searchsorted call.
+        """
+        unique_ips = list({record['ip_address'] for record in parsed_logs})
+        if not unique_ips:
+            return parsed_logs
+
+        ints = np.fromiter((ip_to_int(ip) for ip in unique_ips), dtype=np.uint32, count=len(unique_ips))
+        countries, asns = self.db.lookup_many(ints)
+        labels = {asn: self.db.asn_label(asn) for asn in set(asns.tolist())}
+        resolved = {
+            ip: (country, labels[asn])
+            for ip, country, asn in zip(unique_ips, countries.tolist(), asns.tolist())
+        }
+
+        for record in parsed_logs:
+            record['country'], record['asn'] = resolved[record['ip_address']]
+        return parsed_logs
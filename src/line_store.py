@@ -0,0 +1,98 @@
+"""
+Lazy access to original log lines by byte offset
+
+Parsed records keep only where their line sits in the source file
+('offset' and 'length', from LogReader.read_lines_with_offsets) instead
+of the line text. A LineStore memory-maps the file on first use and
+slices lines out on demand, so the few places that show raw text (sample
+lines in the report) pay for exactly the lines they show. Batched
+lookups are served in file order.
+
+Appending to the file keeps earlier locations valid; a location past the
+end of the file means it was truncated or replaced since it was parsed.
+"""
+
+import logging
+import mmap
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LineStore:
+    """Fetches log lines from one file by (offset, length)"""
+
+    def __init__(self, file_path: str):
+        """
+        Initialize LineStore; the file is not opened until a line is read
+
+        Args:
+            file_path: Log file the offsets refer to
+        """
+        self.file_path = Path(file_path)
+        self._file = None
+        self._map = None
+        self.lines_read = 0
+        self.bytes_read = 0
+
+    def _data(self):
+        """Read-only map of the file, opened on first use"""
+        if self._map is None:
+            self._file = open(self.file_path, 'rb')
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty files cannot be mapped
+                self._map = b''
+        return self._map
+
+    def get(self, offset: int, length: int) -> str:
+        """Text of the line at offset"""
+        return self.get_many([(offset, length)])[0]
+
+    def get_many(self, locations: Iterable[Tuple[int, int]]) -> List[str]:
+        """
+        Text of many lines, read in file order
+
+        Args:
+            locations: (offset, length) pairs
+
+        Returns:
+            Lines in the order of locations
+
+        Raises:
+            ValueError: If a location lies past the end of the file
+        """
+        locations = [(int(offset), int(length)) for offset, length in locations]
+        data = self._data()
+        lines = [None] * len(locations)
+        for index in sorted(range(len(locations)), key=locations.__getitem__):
+            offset, length = locations[index]
+            if offset + length > len(data):
+                raise ValueError(f"Line at byte {offset} is past the end of {self.file_path}; "
+                                 f"the file changed since it was parsed")
+            lines[index] = data[offset:offset + length].decode('utf-8', errors='replace').strip()
+            self.bytes_read += length
+        self.lines_read += len(locations)
+        return lines
+
+    def close(self) -> None:
+        """Unmap and close the file"""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_stats(self) -> dict:
+        """Get read statistics"""
+        return {
+            'lines_read': self.lines_read,
+            'bytes_read': self.bytes_read
+        }
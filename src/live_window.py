@@ -0,0 +1,308 @@
+"""
+Sliding-window metrics over the most recent log lines
+
+SlidingWindow keeps one ring-buffer slot per second for the longest
+window (15 minutes by default). Each slot holds that second's request,
+error and per-status counts plus the error counts of up to
+LIVE_SLOT_IP_CAPACITY client IPs. Every window (1, 5, 15 minutes) keeps
+running totals that are incremented when a line arrives and decremented
+when its second slides out, so an update is O(1) amortized and memory is
+constant however long the stream runs.
+
+Windows are anchored on log time (the newest timestamp seen), not on the
+wall clock, so replaying an old file gives the same numbers as
+following it live.
+
+LogFollower tails a growing file between polls and feeds only the new
+lines through a DataProcessor's sliding window:
+
+    python src/live_window.py data/large_server_logs.txt --follow --interval 5
+"""
+
+import sys
+import heapq
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    from .config import LIVE_WINDOWS, LIVE_SLOT_IP_CAPACITY, LIVE_BOOTSTRAP_BYTES, TOP_IP_COUNT
+    from .log_index import to_epoch
+    from .log_parser import LogParser
+    from .pass_observer import PassObserver
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from config import LIVE_WINDOWS, LIVE_SLOT_IP_CAPACITY, LIVE_BOOTSTRAP_BYTES, TOP_IP_COUNT
+    from log_index import to_epoch
+    from log_parser import LogParser
+    from pass_observer import PassObserver
+
+logger = logging.getLogger(__name__)
+
+
+class _Window:
+    """Running totals for one window length"""
+
+    __slots__ = ('seconds', 'requests', 'errors', 'codes', 'error_ips')
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.requests = 0
+        self.errors = 0
+        self.codes: Dict[int, int] = {}
+        self.error_ips: Dict[str, int] = {}
+
+
+class SlidingWindow(PassObserver):
+    """Per-second ring buffers with 1/5/15 minute running totals"""
+
+    def __init__(self, windows=LIVE_WINDOWS, top_k: int = TOP_IP_COUNT,
+                 slot_ip_capacity: int = LIVE_SLOT_IP_CAPACITY):
+        """
+        Initialize SlidingWindow
+
+        Args:
+            windows: Window lengths in seconds
+            top_k: IPs listed per window
+            slot_ip_capacity: Distinct error IPs tracked per second; IPs
+                beyond that in a single second are left out of the top-K
+        """
+        self.windows = [_Window(seconds) for seconds in sorted(windows)]
+        self.horizon = self.windows[-1].seconds
+        self.top_k = top_k
+        self.slot_ip_capacity = slot_ip_capacity
+
+        horizon = self.horizon
+        self.slot_second = [None] * horizon
+        self.slot_requests = [0] * horizon
+        self.slot_errors = [0] * horizon
+        self.slot_codes = [{} for _ in range(horizon)]
+        self.slot_ips = [{} for _ in range(horizon)]
+
+        self.latest: Optional[int] = None
+        self.late_lines = 0  # Lines older than the longest window
+        self._last_key = None
+        self._last_second = None
+
+    def observe(self, offset, length, line, parsed):
+        if parsed and parsed['timestamp'] is not None:
+            self.add(parsed, line[:19])
+
+    def add(self, record: Dict[str, Any], second_key: Optional[str] = None) -> None:
+        """
+        Count one parsed record
+
+        Args:
+            record: Parsed log entry
+            second_key: Timestamp text of the raw line; consecutive lines
+                from the same second skip the epoch conversion
+        """
+        if second_key is None or second_key != self._last_key:
+            self._last_second = to_epoch(record['timestamp'])
+            self._last_key = second_key
+        self.update(self._last_second, record['error_code'], record['ip_address'], record['is_error'])
+
+    def update(self, second: int, code: int, ip: str, is_error: bool) -> None:
+        """Add one request at epoch second ``second``"""
+        if self.latest is None:
+            self.latest = second
+        elif second > self.latest:
+            self._advance(second)
+
+        age = self.latest - second
+        if age >= self.horizon:
+            self.late_lines += 1
+            return
+
+        slot = second % self.horizon
+        if self.slot_second[slot] != second:
+            self._clear_slot(slot, second)
+
+        self.slot_requests[slot] += 1
+        codes = self.slot_codes[slot]
+        codes[code] = codes.get(code, 0) + 1
+        tracked = False
+        if is_error:
+            self.slot_errors[slot] += 1
+            ips = self.slot_ips[slot]
+            if ip in ips or len(ips) < self.slot_ip_capacity:
+                ips[ip] = ips.get(ip, 0) + 1
+                tracked = True
+
+        for window in self.windows:
+            if age >= window.seconds:
+                continue
+            window.requests += 1
+            window.codes[code] = window.codes.get(code, 0) + 1
+            if is_error:
+                window.errors += 1
+                if tracked:
+                    window.error_ips[ip] = window.error_ips.get(ip, 0) + 1
+
+    def _advance(self, second: int) -> None:
+        """Move the newest second forward, expiring seconds that leave each window"""
+        previous = self.latest
+        for window in self.windows:
+            # Seconds (previous - w, second - w] leave this window; seconds
+            # after ``previous`` never held data
+            first = previous - window.seconds + 1
+            last = min(second - window.seconds, previous)
+            for expired in range(first, last + 1):
+                slot = expired % self.horizon
+                if self.slot_second[slot] == expired:
+                    self._subtract(window, slot)
+        self.latest = second
+
+    def _subtract(self, window: _Window, slot: int) -> None:
+        """Remove one second's counts from a window"""
+        window.requests -= self.slot_requests[slot]
+        window.errors -= self.slot_errors[slot]
+        for code, count in self.slot_codes[slot].items():
+            remaining = window.codes[code] - count
+            if remaining:
+                window.codes[code] = remaining
+            else:
+                del window.codes[code]
+        for ip, count in self.slot_ips[slot].items():
+            remaining = window.error_ips[ip] - count
+            if remaining:
+                window.error_ips[ip] = remaining
+            else:
+                del window.error_ips[ip]
+
+    def _clear_slot(self, slot: int, second: int) -> None:
+        """Reuse a slot whose previous second has left every window"""
+        self.slot_second[slot] = second
+        self.slot_requests[slot] = 0
+        self.slot_errors[slot] = 0
+        self.slot_codes[slot] = {}
+        self.slot_ips[slot] = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current metrics for every window
+
+        Returns:
+            Dictionary with 'latest' (newest log timestamp) and 'windows',
+            keyed '1m', '5m', '15m' (or '<n>s')
+        """
+        windows = {}
+        for window in self.windows:
+            label = f"{window.seconds // 60}m" if window.seconds % 60 == 0 else f"{window.seconds}s"
+            windows[label] = {
+                'seconds': window.seconds,
+                'requests': window.requests,
+                'errors': window.errors,
+                'error_percentage': (window.errors / window.requests * 100) if window.requests else 0,
+                'requests_per_second': window.requests / window.seconds,
+                'status_codes': dict(sorted(window.codes.items())),
+                'top_error_ips': dict(heapq.nlargest(
+                    self.top_k, window.error_ips.items(), key=lambda item: item[1]))
+            }
+
+        latest = None
+        if self.latest is not None:
+            latest = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(self.latest))
+        return {'latest': latest, 'late_lines': self.late_lines, 'windows': windows}
+
+    def finalize(self, stats):
+        stats['live'] = self.snapshot()
+
+
+class LogFollower:
+    """Feeds lines appended to a log file into a DataProcessor's live window"""
+
+    def __init__(self, file_path: str, processor=None, bootstrap_bytes: int = LIVE_BOOTSTRAP_BYTES):
+        """
+        Initialize LogFollower
+
+        Args:
+            file_path: Log file to follow
+            processor: DataProcessor to feed (optional, one is created)
+            bootstrap_bytes: On the first poll only this much of the end
+                of the file is read, enough to fill the windows
+        """
+        if processor is None:
+            try:
+                from .data_processor import DataProcessor
+            except ImportError:
+                from data_processor import DataProcessor
+            processor = DataProcessor()
+
+        self.file_path = Path(file_path)
+        self.processor = processor
+        self.processor.enable_live()
+        self.parser = LogParser(intern_ips=False)  # Lives as long as the follower
+        self.bootstrap_bytes = bootstrap_bytes
+        self.offset = None
+        self.lines_read = 0
+        self.lock = threading.Lock()  # Serializes polls from concurrent requests
+
+    def poll(self) -> int:
+        """
+        Read complete lines appended since the last poll
+
+        Returns:
+            Number of lines read
+        """
+        size = self.file_path.stat().st_size
+        if self.offset is None or size < self.offset:
+            # First poll, or the file was truncated / rotated
+            self.offset = max(0, size - self.bootstrap_bytes)
+            skip_partial = self.offset > 0
+        else:
+            skip_partial = False
+
+        count = 0
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            if skip_partial:
+                self.offset += len(f.readline())
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break  # Incomplete last line; read it on the next poll
+                self.offset += len(raw)
+                parsed = self.parser.parse_line(raw.decode('utf-8', errors='replace').strip())
+                if parsed and parsed['timestamp'] is not None:
+                    self.processor.update_live(parsed)
+                count += 1
+
+        self.lines_read += count
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Poll, then return the live window metrics"""
+        with self.lock:
+            self.poll()
+            stats = self.processor.get_live_stats()
+        stats['file_name'] = self.file_path.name
+        return stats
+
+
+def main():
+    """Main function with command line arguments"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Sliding-window metrics for a log file')
+    parser.add_argument('file', help='Path to log file')
+    parser.add_argument('--follow', action='store_true', help='Keep polling for appended lines')
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls')
+
+    args = parser.parse_args()
+
+    follower = LogFollower(args.file)
+    try:
+        while True:
+            print(json.dumps(follower.get_stats(), indent=2))
+            if not args.follow:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
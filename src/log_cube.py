@@ -0,0 +1,384 @@
+"""
+Pre-aggregated OLAP-style cube for slicing parsed logs
+
+The parse pass folds every valid entry into request counts over
+(hour, status code, method, IP). Hour, status and method form a small
+dense NumPy cube; the IP dimension is kept sparse as coordinate arrays of
+its non-empty cells. Group-by and filter queries are answered from those
+arrays with NumPy reductions, so new slices ("errors by method per hour")
+never need a reparse.
+
+Cubes can be saved as ``.npz`` and queried later:
+
+    python src/main_large.py --cube ../output/cube.npz
+    python src/log_cube.py ../output/cube.npz --group-by hour,method --status 500
+"""
+
+import sys
+import logging
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+
+try:
+    from .log_parser import ip_to_int, int_to_ip
+    from .log_index import parse_time
+    from .pass_observer import PassObserver
+    from .partitioned_store import METHODS, METHOD_CODES
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from log_parser import ip_to_int, int_to_ip
+    from log_index import parse_time
+    from pass_observer import PassObserver
+    from partitioned_store import METHODS, METHOD_CODES
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ('hour', 'status', 'method', 'ip')
+CHUNK_ROWS = 1_000_000  # Cell keys buffered before they are reduced
+EPOCH = datetime(1970, 1, 1)
+
+# Packed uint64 cell key: ip (32 bits) | hour id (19) | status id (10) | method (3).
+# Hours and statuses are stored as ids into per-cube dictionaries of the
+# values seen, so any timestamp or status fits; a cube can hold up to
+# MAX_HOURS distinct hours (~60 years) and MAX_STATUSES distinct statuses.
+_HOUR_SHIFT = 13
+_STATUS_SHIFT = 3
+MAX_HOURS = 1 << 19
+MAX_STATUSES = 1 << 10
+MAX_STATUS_CODE = 2 ** 31 - 1  # Larger numbers are not status codes (and overflow int64 math)
+
+
+def _hour_label(hour: int) -> str:
+    return (EPOCH + timedelta(hours=int(hour))).strftime("%Y-%m-%d %H:00")
+
+
+class LogCube(PassObserver):
+    """Request counts over hour x status x method (dense) and IP (sparse)"""
+
+    def __init__(self, output_path: Optional[str] = None):
+        """
+        Initialize an empty LogCube
+
+        Args:
+            output_path: Where finalize() saves the cube (optional)
+        """
+        self.output_path = output_path
+        self._keys = array('Q')
+        self._chunks = []  # (unique keys, counts) per reduced chunk
+        self._hours: Dict[str, int] = {}  # 'YYYY-MM-DD HH' -> hour id
+        self._hour_values: List[int] = []  # Hour id -> hours since epoch
+        self._statuses: Dict[int, int] = {}  # Status code -> status id
+        self._ips: Dict[str, int] = {}
+        self.rejected = 0  # Records whose status (or a dictionary overflow) could not be counted
+
+        # Filled by build()
+        self.hours = np.empty(0, dtype=np.int64)  # Hours since epoch
+        self.statuses = np.empty(0, dtype=np.int64)
+        self.methods = METHODS
+        self.dense = np.zeros((0, 0, len(METHODS)), dtype=np.int64)
+        self.cells = {name: np.empty(0, dtype=np.int64) for name in DIMENSIONS}
+        self.cell_counts = np.empty(0, dtype=np.int64)
+
+    def observe(self, offset, length, line, parsed):
+        if parsed and parsed['timestamp'] is not None:
+            self.add(parsed, line[:13])
+
+    def add(self, record: Dict[str, Any], hour_key: Optional[str] = None) -> None:
+        """
+        Count one parsed record
+
+        Records with a status above MAX_STATUS_CODE, or that would need a
+        hour or status id beyond the cube's capacity, are counted in
+        ``rejected`` instead.
+
+        Args:
+            record: Parsed log entry
+            hour_key: 'YYYY-MM-DD HH' prefix of the raw line, if known
+        """
+        if hour_key is None:
+            hour_key = record['timestamp'].strftime("%Y-%m-%d %H")
+        hour = self._hours.get(hour_key)
+        if hour is None:
+            if len(self._hour_values) >= MAX_HOURS:
+                self.rejected += 1
+                return
+            hour = self._hours[hour_key] = len(self._hour_values)
+            self._hour_values.append(int(
+                (datetime.strptime(hour_key, "%Y-%m-%d %H") - EPOCH).total_seconds()) // 3600)
+
+        status = self._statuses.get(record['error_code'])
+        if status is None:
+            if not 0 <= record['error_code'] <= MAX_STATUS_CODE or len(self._statuses) >= MAX_STATUSES:
+                self.rejected += 1
+                return
+            status = self._statuses[record['error_code']] = len(self._statuses)
+
+        ip = self._ips.get(record['ip_address'])
+        if ip is None:
+            ip = self._ips[record['ip_address']] = ip_to_int(record['ip_address'])
+
+        self._keys.append(
+            (ip << 32)
+            | (hour << _HOUR_SHIFT)
+            | (status << _STATUS_SHIFT)
+            | METHOD_CODES.get(record['request_type'], METHOD_CODES['UNKNOWN'])
+        )
+        if len(self._keys) >= CHUNK_ROWS:
+            self._reduce_chunk()
+
+    def _reduce_chunk(self) -> None:
+        """Collapse the buffered keys into (unique key, count) pairs"""
+        if self._keys:
+            keys = np.frombuffer(self._keys, dtype=np.uint64)
+            self._chunks.append(np.unique(keys, return_counts=True))
+            self._keys = array('Q')
+
+    @classmethod
+    def from_records(cls, parsed_logs: List[Dict[str, Any]]) -> 'LogCube':
+        """Build a cube from an already parsed list of records"""
+        cube = cls()
+        for record in parsed_logs:
+            if record['timestamp'] is not None:
+                cube.add(record)
+        return cube.build()
+
+    def build(self) -> 'LogCube':
+        """Merge the reduced chunks and lay out the dense and sparse arrays"""
+        self._reduce_chunk()
+        if self._chunks:
+            keys = np.concatenate([chunk[0] for chunk in self._chunks])
+            counts = np.concatenate([chunk[1] for chunk in self._chunks])
+            keys, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse, weights=counts).astype(np.int64)
+        else:
+            keys = np.empty(0, dtype=np.uint64)
+            counts = np.empty(0, dtype=np.int64)
+        hour_values = np.array(self._hour_values, dtype=np.int64)
+        status_values = np.array(list(self._statuses), dtype=np.int64)
+        self._chunks = []
+        self._hours, self._hour_values, self._statuses = {}, [], {}
+        self._ips = {}
+
+        ip = (keys >> np.uint64(32)).astype(np.int64)
+        hour = hour_values[((keys >> np.uint64(_HOUR_SHIFT)) & np.uint64(MAX_HOURS - 1)).astype(np.int64)]
+        status = status_values[((keys >> np.uint64(_STATUS_SHIFT)) & np.uint64(MAX_STATUSES - 1)).astype(np.int64)]
+        method = (keys & np.uint64(0x7)).astype(np.int64)
+
+        self.hours, hour_idx = np.unique(hour, return_inverse=True)
+        self.statuses, status_idx = np.unique(status, return_inverse=True)
+        self.cells = {'hour': hour_idx, 'status': status_idx, 'method': method, 'ip': ip}
+        self.cell_counts = counts
+        self._build_dense()
+        return self
+
+    def _build_dense(self) -> None:
+        """Sum the sparse cells over IP into the dense cube"""
+        shape = (len(self.hours), len(self.statuses), len(self.methods))
+        flat = np.ravel_multi_index(
+            (self.cells['hour'], self.cells['status'], self.cells['method']), shape)
+        self.dense = np.bincount(
+            flat, weights=self.cell_counts, minlength=int(np.prod(shape))
+        ).astype(np.int64).reshape(shape)
+
+    def finalize(self, stats):
+        self.build()
+        if self.rejected:
+            print(f"⚠️ Cube skipped {self.rejected:,} records with out-of-range status codes")
+        if self.output_path:
+            self.save(self.output_path)
+        stats['cube'] = self.get_stats()
+
+    @property
+    def total(self) -> int:
+        return int(self.cell_counts.sum())
+
+    def _axis_masks(self, filters: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Boolean masks over the dense axes for the given filters"""
+        masks = {}
+
+        start, end = parse_time(filters.get('start')), parse_time(filters.get('end'))
+        if start is not None or end is not None:
+            mask = np.ones(len(self.hours), dtype=bool)
+            if start is not None:
+                # Hours are whole buckets: include the bucket containing start
+                mask &= self.hours >= int((start - EPOCH).total_seconds()) // 3600
+            if end is not None:
+                mask &= self.hours * 3600 < (end - EPOCH).total_seconds()
+            masks['hour'] = mask
+
+        if filters.get('status') is not None:
+            wanted = np.asarray(_as_list(filters['status']), dtype=np.int64)
+            masks['status'] = np.isin(self.statuses, wanted)
+
+        if filters.get('method') is not None:
+            wanted = {method.upper() for method in _as_list(filters['method'])}
+            masks['method'] = np.array([method in wanted for method in self.methods])
+
+        return masks
+
+    def slice(self, group_by=(), limit: Optional[int] = None, **filters) -> List[Dict[str, Any]]:
+        """
+        Request counts grouped by some dimensions, after filtering
+
+        Args:
+            group_by: Dimensions to keep, from DIMENSIONS
+            limit: Return only the largest groups (optional)
+            **filters: start / end (time window), status, method and ip;
+                status, method and ip accept a single value or a list
+
+        Returns:
+            List of {dimension: value, ..., 'requests': n}, ordered by the
+            grouped dimensions, or by requests when a limit is given
+        """
+        group_by = tuple(group_by)
+        unknown = set(group_by) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown dimension(s) {sorted(unknown)}, expected {DIMENSIONS}")
+
+        masks = self._axis_masks(filters)
+        if 'ip' in group_by or filters.get('ip') is not None:
+            groups, counts = self._slice_sparse(group_by, masks, filters.get('ip'))
+        else:
+            groups, counts = self._slice_dense(group_by, masks)
+
+        if limit is not None:
+            order = np.argsort(-counts, kind='stable')[:int(limit)]
+            groups = [values[order] for values in groups]
+            counts = counts[order]
+
+        decoders = {
+            'hour': lambda i: _hour_label(self.hours[i]),
+            'status': lambda i: int(self.statuses[i]),
+            'method': lambda i: self.methods[i],
+            'ip': lambda value: int_to_ip(int(value))
+        }
+        rows = []
+        for position, count in enumerate(counts.tolist()):
+            row = {name: decoders[name](values[position]) for name, values in zip(group_by, groups)}
+            row['requests'] = count
+            rows.append(row)
+        return rows
+
+    def _slice_dense(self, group_by, masks):
+        """Filter and reduce the dense cube"""
+        cube = self.dense
+        for axis, name in enumerate(('hour', 'status', 'method')):
+            if name in masks:
+                cube = np.compress(masks[name], cube, axis=axis)
+        positions = {
+            name: np.flatnonzero(masks[name]) if name in masks else np.arange(cube.shape[axis])
+            for axis, name in enumerate(('hour', 'status', 'method'))
+        }
+
+        if not group_by:
+            return [], np.array([cube.sum()], dtype=np.int64)
+
+        drop = tuple(axis for axis, name in enumerate(('hour', 'status', 'method'))
+                     if name not in group_by)
+        reduced = cube.sum(axis=drop)
+        kept = [name for name in ('hour', 'status', 'method') if name in group_by]
+        reduced = np.transpose(reduced, [kept.index(name) for name in group_by])
+
+        coordinates = np.nonzero(reduced)
+        groups = [positions[name][coords] for name, coords in zip(group_by, coordinates)]
+        return groups, reduced[coordinates]
+
+    def _slice_sparse(self, group_by, masks, ip):
+        """Filter and group the sparse IP cells"""
+        keep = np.ones(len(self.cell_counts), dtype=bool)
+        for name, mask in masks.items():
+            keep &= mask[self.cells[name]]
+        if ip is not None:
+            wanted = np.array([ip_to_int(value) for value in _as_list(ip)], dtype=np.int64)
+            keep &= np.isin(self.cells['ip'], wanted)
+
+        counts = self.cell_counts[keep]
+        if not group_by:
+            return [], np.array([counts.sum()], dtype=np.int64)
+
+        columns = [self.cells[name][keep] for name in group_by]
+        unique, inverse = np.unique(np.stack(columns), axis=1, return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=counts).astype(np.int64)
+        return list(unique), totals
+
+    def save(self, path) -> Path:
+        """Write the built cube to an .npz file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            hours=self.hours,
+            statuses=self.statuses,
+            cell_counts=self.cell_counts,
+            **{f'cell_{name}': values for name, values in self.cells.items()}
+        )
+        print(f"✅ Cube saved to: {path} ({len(self.cell_counts):,} cells)")
+        return path
+
+    @classmethod
+    def load(cls, path) -> 'LogCube':
+        """Read a cube written by save()"""
+        cube = cls()
+        with np.load(path) as data:
+            cube.hours = data['hours']
+            cube.statuses = data['statuses']
+            cube.cell_counts = data['cell_counts']
+            cube.cells = {name: data[f'cell_{name}'] for name in DIMENSIONS}
+        cube._build_dense()
+        return cube
+
+    def get_stats(self) -> dict:
+        """Get cube statistics"""
+        return {
+            'requests': self.total,
+            'hours': len(self.hours),
+            'status_codes': [int(status) for status in self.statuses],
+            'dense_cells': int(self.dense.size),
+            'sparse_cells': len(self.cell_counts),
+            'rejected': self.rejected
+        }
+
+
+def _as_list(value) -> list:
+    """Accept a single value, a list, or a comma-separated string"""
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(',') if part.strip()]
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    return [value]
+
+
+def main():
+    """Main function with command line arguments"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Slice a saved log cube')
+    parser.add_argument('cube', help='Cube file written by main_large.py --cube')
+    parser.add_argument('--group-by', type=str, default='',
+                        help=f"Comma-separated dimensions from {', '.join(DIMENSIONS)}")
+    parser.add_argument('--start', type=str, help='Window start, inclusive')
+    parser.add_argument('--end', type=str, help='Window end, exclusive')
+    parser.add_argument('--status', type=str, help='Status code(s), comma-separated')
+    parser.add_argument('--method', type=str, help='Method(s), comma-separated')
+    parser.add_argument('--ip', type=str, help='IP address(es), comma-separated')
+    parser.add_argument('--limit', type=int, help='Only the largest groups')
+
+    args = parser.parse_args()
+
+    cube = LogCube.load(args.cube)
+    group_by = [name.strip() for name in args.group_by.split(',') if name.strip()]
+    status = [int(code) for code in _as_list(args.status)] if args.status else None
+    rows = cube.slice(group_by, limit=args.limit, start=args.start, end=args.end,
+                      status=status, method=args.method, ip=args.ip)
+
+    for row in rows:
+        print("  ".join(f"{name}={row[name]}" for name in group_by) + f"  requests={row['requests']:,}")
+    print(f"-- {len(rows)} groups", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""
+Module for indexed queries over parsed log files
+
+Builds per-file indexes so drill-down queries ("all 503s from one IP in a
+15 minute window") read only the matching lines instead of rescanning:
+
+- a sparse timestamp -> byte offset index (one entry every SPARSE_EVERY
+  valid lines), which works because log files are written in time order
+- posting lists of line byte offsets per IP address and per status code
+
+Indexes are saved as typed NumPy arrays (``.npz``, loaded with
+allow_pickle=False) under INDEX_DIR, never next to the log, so a file
+uploaded beside a log cannot stand in for its index. A stale index
+(the log's size or modification time changed) refuses queries with
+StaleIndexError; callers rebuild it with build() and save().
+"""
+
+import calendar
+import hashlib
+import logging
+import os
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, List
+
+import numpy as np
+
+try:
+    from .config import INDEX_DIR
+    from .log_reader import LogReader
+    from .log_parser import LogParser, ip_to_int, int_to_ip
+except ImportError:
+    from config import INDEX_DIR
+    from log_reader import LogReader
+    from log_parser import LogParser, ip_to_int, int_to_ip
+
+logger = logging.getLogger(__name__)
+
+SPARSE_EVERY = 256  # Valid lines between sparse timestamp index entries
+INDEX_SUFFIX = '.idx.npz'
+INDEX_VERSION = 2
+MAX_PAGE_SIZE = 1000
+INTERSECT_CHUNK = 4096  # Offsets of the shorter posting list matched per step
+
+
+class StaleIndexError(RuntimeError):
+    """The log file changed since its index was built"""
+
+
+def to_epoch(timestamp: datetime) -> int:
+    """Convert a naive log timestamp to integer seconds"""
+    return calendar.timegm(timestamp.timetuple())
+
+
+def parse_time(value) -> Optional[datetime]:
+    """Parse a query time ('2025-01-15 02:00:00' or ISO format)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _postings_arrays(postings: Dict[int, np.ndarray]) -> tuple:
+    """Flatten {key: sorted offsets} into (keys, bounds, offsets) arrays"""
+    keys = np.array(list(postings), dtype=np.int64)
+    lengths = np.array([len(p) for p in postings.values()], dtype=np.int64)
+    bounds = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+    offsets = np.concatenate(list(postings.values())) if postings else np.empty(0, dtype=np.uint64)
+    return keys, bounds, offsets.astype(np.uint64, copy=False)
+
+
+def _postings_dict(keys: np.ndarray, bounds: np.ndarray, offsets: np.ndarray, decode=int) -> Dict:
+    """Inverse of _postings_arrays; values are views into offsets"""
+    return {decode(key): offsets[a:b] for key, a, b in zip(keys.tolist(), bounds[:-1].tolist(), bounds[1:].tolist())}
+
+
+class LogIndex:
+    """Sparse time index and per-IP / per-status posting lists for one file"""
+
+    def __init__(self, file_path: str, index_dir=None):
+        """
+        Initialize an empty LogIndex
+
+        Args:
+            file_path: Path to the indexed log file
+            index_dir: Directory for the saved index (defaults to INDEX_DIR)
+        """
+        self.file_path = Path(file_path)
+        self.index_dir = Path(index_dir) if index_dir else INDEX_DIR
+        self.signature = None
+        self.sparse_times = np.empty(0, dtype=np.int64)
+        self.sparse_offsets = np.empty(0, dtype=np.uint64)
+        self.ip_postings: Dict[str, np.ndarray] = {}
+        self.status_postings: Dict[int, np.ndarray] = {}
+        self.indexed_lines = 0
+
+    @property
+    def index_path(self) -> Path:
+        """Saved index, named after the log and a hash of its full path"""
+        digest = hashlib.sha1(str(self.file_path.resolve()).encode('utf-8')).hexdigest()[:16]
+        return self.index_dir / f"{self.file_path.name}-{digest}{INDEX_SUFFIX}"
+
+    def _current_signature(self) -> tuple:
+        stat = self.file_path.stat()
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def is_stale(self) -> bool:
+        """True if the log file changed since the index was built"""
+        return self.signature != self._current_signature()
+
+    def build(self) -> 'LogIndex':
+        """Build the index with one pass over the file"""
+        print(f"🗂️ Building index for: {self.file_path}")
+        self.signature = self._current_signature()
+
+        reader = LogReader(str(self.file_path))
+        parser = LogParser()
+        ip_postings = {}
+        status_postings = {}
+        sparse_times = array('q')
+        sparse_offsets = array('Q')
+        valid = 0
+
+        for offset, _, line in reader.read_lines_with_offsets():
+            parsed = parser.parse_line(line)
+            if not parsed or parsed['timestamp'] is None:
+                continue
+
+            postings = ip_postings.get(parsed['ip_address'])
+            if postings is None:
+                postings = ip_postings[parsed['ip_address']] = array('Q')
+            postings.append(offset)
+
+            postings = status_postings.get(parsed['error_code'])
+            if postings is None:
+                postings = status_postings[parsed['error_code']] = array('Q')
+            postings.append(offset)
+
+            if valid % SPARSE_EVERY == 0:
+                sparse_times.append(to_epoch(parsed['timestamp']))
+                sparse_offsets.append(offset)
+            valid += 1
+
+        as_offsets = lambda postings: np.frombuffer(postings, dtype=np.uint64)  # noqa: E731
+        self.ip_postings = {ip: as_offsets(p) for ip, p in ip_postings.items()}
+        self.status_postings = {status: as_offsets(p) for status, p in status_postings.items()}
+        self.sparse_times = np.frombuffer(sparse_times, dtype=np.int64)
+        self.sparse_offsets = as_offsets(sparse_offsets)
+        self.indexed_lines = valid
+
+        print(f"✅ Indexed {valid:,} lines "
+              f"({len(ip_postings):,} IPs, {len(status_postings)} status codes)")
+        return self
+
+    def save(self) -> None:
+        """Write the index as plain NumPy arrays (atomically replaced)"""
+        ip_keys, ip_bounds, ip_offsets = _postings_arrays(
+            {ip_to_int(ip): postings for ip, postings in self.ip_postings.items()})
+        status_keys, status_bounds, status_offsets = _postings_arrays(self.status_postings)
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, version=np.int64(INDEX_VERSION),
+                     signature=np.array(self.signature, dtype=np.int64),
+                     sparse_times=self.sparse_times, sparse_offsets=self.sparse_offsets,
+                     indexed_lines=np.int64(self.indexed_lines),
+                     ip_keys=ip_keys, ip_bounds=ip_bounds, ip_offsets=ip_offsets,
+                     status_keys=status_keys, status_bounds=status_bounds, status_offsets=status_offsets)
+        os.replace(tmp_path, self.index_path)
+
+    @classmethod
+    def load(cls, file_path: str, index_dir=None) -> Optional['LogIndex']:
+        """
+        Load the saved index for a file
+
+        Args:
+            file_path: Path to the log file
+            index_dir: Directory of saved indexes (defaults to INDEX_DIR)
+
+        Returns:
+            LogIndex, or None if it is missing, unreadable or stale
+        """
+        index = cls(file_path, index_dir)
+        try:
+            with np.load(index.index_path, allow_pickle=False) as data:
+                if int(data['version']) != INDEX_VERSION:
+                    return None
+                index.signature = tuple(data['signature'].tolist())
+                index.sparse_times = data['sparse_times']
+                index.sparse_offsets = data['sparse_offsets']
+                index.indexed_lines = int(data['indexed_lines'])
+                index.ip_postings = _postings_dict(data['ip_keys'], data['ip_bounds'], data['ip_offsets'],
+                                                   decode=int_to_ip)
+                index.status_postings = _postings_dict(data['status_keys'], data['status_bounds'],
+                                                       data['status_offsets'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable index {index.index_path}: {e}")
+            return None
+        return None if index.is_stale() else index
+
+    @classmethod
+    def load_or_build(cls, file_path: str, index_dir=None) -> 'LogIndex':
+        """
+        Load the saved index for a file, rebuilding it if missing or stale
+
+        Args:
+            file_path: Path to the log file
+            index_dir: Directory of saved indexes (defaults to INDEX_DIR)
+
+        Returns:
+            Up-to-date LogIndex
+        """
+        index = cls.load(file_path, index_dir)
+        if index is not None:
+            return index
+
+        index = cls(file_path, index_dir).build()
+        try:
+            index.save()
+        except OSError as e:
+            print(f"⚠️ Could not save index: {e}")
+        return index
+
+    def _offset_range(self, start: Optional[datetime], end: Optional[datetime]) -> tuple:
+        """
+        Narrow a time window to a byte range using the sparse index
+
+        Lines before ``lo`` are all older than ``start`` and lines from
+        ``hi`` on are all at or after ``end``; lines in between still need
+        an exact time check.
+        """
+        lo, hi = 0, self.signature[0] if self.signature else float('inf')
+        if start is not None:
+            i = int(np.searchsorted(self.sparse_times, to_epoch(start))) - 1
+            if i >= 0:
+                lo = int(self.sparse_offsets[i])
+        if end is not None:
+            j = int(np.searchsorted(self.sparse_times, to_epoch(end)))
+            if j < len(self.sparse_offsets):
+                hi = int(self.sparse_offsets[j])
+        return lo, hi
+
+    def _candidate_offsets(self, lo: int, hi: int, ip: Optional[str],
+                           status: Optional[int]) -> Optional[Iterator[int]]:
+        """
+        Posting-list candidates in [lo, hi), lazily in offset order, or
+        None to scan the range
+
+        With both an IP and a status the lists are intersected a chunk
+        of the shorter list at a time (binary search into the longer one),
+        so a page stops after the chunks it needs.
+        """
+        empty = np.empty(0, dtype=np.uint64)
+        lists = []
+        if ip is not None:
+            lists.append(self.ip_postings.get(ip, empty))
+        if status is not None:
+            lists.append(self.status_postings.get(status, empty))
+        if not lists:
+            return None
+
+        # Posting lists are sorted by offset: slice each to the byte range (views)
+        bounds = np.array([lo, hi if hi != float('inf') else np.iinfo(np.uint64).max], dtype=np.uint64)
+        sliced = []
+        for postings in lists:
+            a, b = np.searchsorted(postings, bounds)
+            sliced.append(postings[a:b])
+        return self._intersect(*sorted(sliced, key=len))
+
+    @staticmethod
+    def _intersect(shortest: np.ndarray, *others: np.ndarray) -> Iterator[int]:
+        """Offsets of shortest found in every other sorted array"""
+        for start in range(0, len(shortest), INTERSECT_CHUNK):
+            chunk = shortest[start:start + INTERSECT_CHUNK]
+            for other in others:
+                if not len(other) or not len(chunk):
+                    return
+                found = np.searchsorted(other, chunk)
+                chunk = chunk[other[np.minimum(found, len(other) - 1)] == chunk]
+            yield from chunk.tolist()
+
+    def query(self, start=None, end=None, ip: Optional[str] = None,
+              status: Optional[int] = None, limit: int = 100,
+              cursor: int = 0) -> Dict[str, Any]:
+        """
+        Find parsed entries matching every given filter
+
+        Args:
+            start: Earliest timestamp, inclusive (datetime or string)
+            end: Latest timestamp, exclusive (datetime or string)
+            ip: Exact IP address
+            status: HTTP status code
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            cursor: Byte offset to resume from (``next_cursor`` of the
+                previous page)
+
+        Returns:
+            Dictionary with 'entries' and 'next_cursor' (None on the
+            last page)
+
+        Raises:
+            StaleIndexError: If the log changed since the index was built
+        """
+        if self.is_stale():
+            raise StaleIndexError(f"Index for {self.file_path} is out of date")
+
+        start, end = parse_time(start), parse_time(end)
+        status = int(status) if status is not None else None
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        lo, hi = self._offset_range(start, end)
+        lo = max(lo, int(cursor))
+        candidates = self._candidate_offsets(lo, hi, ip, status)
+
+        parser = LogParser()
+        entries: List[Dict[str, Any]] = []
+        next_cursor = None
+
+        with open(self.file_path, 'rb') as f:
+            if candidates is not None:
+                lines = self._read_at(f, candidates)
+            else:
+                lines = self._scan(f, lo, hi)
+
+            for offset, raw in lines:
+                parsed = parser.parse_line(raw.decode('utf-8', errors='replace').strip())
+                if not parsed or parsed['timestamp'] is None:
+                    continue
+                timestamp = parsed['timestamp']
+                if start is not None and timestamp < start:
+                    continue
+                if end is not None and timestamp >= end:
+                    break  # Time-sorted: nothing later can match
+                if ip is not None and parsed['ip_address'] != ip:
+                    continue
+                if status is not None and parsed['error_code'] != status:
+                    continue
+
+                if len(entries) == limit:
+                    next_cursor = offset
+                    break
+                entries.append({
+                    'timestamp': timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                    'ip_address': parsed['ip_address'],
+                    'request_type': parsed['request_type'],
+                    'error_code': parsed['error_code'],
+                    'offset': offset
+                })
+
+        return {'entries': entries, 'count': len(entries), 'next_cursor': next_cursor}
+
+    @staticmethod
+    def _read_at(f, offsets):
+        """Yield (offset, raw line) for each indexed offset"""
+        for offset in offsets:
+            f.seek(offset)
+            yield offset, f.readline()
+
+    @staticmethod
+    def _scan(f, lo, hi):
+        """Yield (offset, raw line) for every line in the byte range"""
+        f.seek(lo)
+        offset = lo
+        for raw in f:
+            if offset >= hi:
+                break
+            yield offset, raw
+            offset += len(raw)
+
+    def get_stats(self) -> dict:
+        """Get index statistics"""
+        return {
+            'indexed_lines': self.indexed_lines,
+            'sparse_entries': len(self.sparse_offsets),
+            'unique_ips': len(self.ip_postings),
+            'status_codes': sorted(self.status_postings)
+        }
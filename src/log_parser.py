@@ -4,16 +4,82 @@ Module for parsing log entries
 
 import re
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 
+def ip_to_int(ip: str) -> int:
+    """Encode a dotted IPv4 address as an unsigned 32-bit integer"""
+    a, b, c, d = ip.split('.')
+    return (int(a) << 24) | (int(b) << 16) | (int(c) << 8) | int(d)
+
+
+def int_to_ip(value: int) -> str:
+    """Decode an unsigned 32-bit integer back to a dotted IPv4 address"""
+    value = int(value)
+    return f"{value >> 24 & 255}.{value >> 16 & 255}.{value >> 8 & 255}.{value & 255}"
+
+
+class InternTable:
+    """
+    Dictionary encoding for a repeated string field
+    
+    Every distinct value gets an integer code (in order of first
+    appearance) and one shared string object, so records hold references
+    to a few canonical strings instead of a fresh copy per line, and their
+    cached hashes make later grouping cheap. DataProcessor turns a column
+    of interned values back into codes to build a pandas Categorical.
+    """
+    
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def intern(self, value: str) -> str:
+        """Canonical string object for a value, adding it if new"""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return self.values[code]
+    
+    def encode(self, values: Sequence[str]):
+        """
+        Codes for a sequence of interned values
+        
+        Returns:
+            int32 ndarray
+        """
+        import numpy as np
+        
+        codes = self.codes
+        return np.fromiter((codes[value] for value in values), dtype=np.int32, count=len(values))
+    
+    def categorical(self, values: Sequence[str]):
+        """pandas Categorical of interned values, built from their codes"""
+        import pandas as pd
+        
+        return pd.Categorical.from_codes(self.encode(values), categories=self.values)
+
+
 class LogParser:
     """Parses log lines and extracts fields"""
     
-    def __init__(self):
+    def __init__(self, intern_ips: bool = True):
+        """
+        Initialize LogParser
+        
+        Args:
+            intern_ips: Dictionary-encode IP addresses. The table grows
+                with every distinct IP the parser ever sees, so long-lived
+                streaming parsers pass False and keep plain strings
+                (request types, a fixed small set, are always interned).
+        """
         # Regex pattern for log format: timestamp,ip,request,error_code
         self.pattern = re.compile(
             r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),'
@@ -25,19 +91,31 @@ class LogParser:
         # Valid request types
         self.valid_requests = {'GET', 'POST', 'PUT', 'DELETE', 'HEAD', 'OPTIONS', 'PATCH'}
         
+        # Dictionary encoding of the repeated string fields, by column
+        self.tables = {'request_type': InternTable()}
+        if intern_ips:
+            self.tables['ip_address'] = InternTable()
+        self._intern_ip = self.tables['ip_address'].intern if intern_ips else str
+        self._requests = self.tables['request_type']
+        
         # Statistics
         self.parsed_count = 0
         self.failed_count = 0
     
-    def parse_line(self, log_line: str) -> Optional[Dict[str, Any]]:
+    def parse_line(self, log_line: str, offset: Optional[int] = None,
+                   length: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """
         Parse a single log line
         
         Args:
             log_line: Raw log line string
+            offset: Byte offset of the line in its file (optional)
+            length: Length of the line in bytes (with offset)
             
         Returns:
-            Dictionary with parsed fields or None if invalid
+            Dictionary with parsed fields or None if invalid. Given an
+            offset, the record also locates its line ('offset', 'length')
+            so LineStore can fetch the text later instead of keeping it.
         """
         try:
             # Try to match the pattern
@@ -74,14 +152,17 @@ class LogParser:
             
             self.parsed_count += 1
             
-            return {
+            record = {
                 'timestamp': timestamp,
-                'ip_address': ip,
-                'request_type': request_type,
+                'ip_address': self._intern_ip(ip),
+                'request_type': self._requests.intern(request_type),
                 'error_code': error_code,
-                'is_error': is_error,
-                'raw_line': log_line
+                'is_error': is_error
             }
+            if offset is not None:
+                record['offset'] = offset
+                record['length'] = length
+            return record
             
         except Exception as e:
             self.failed_count += 1
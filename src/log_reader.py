@@ -80,6 +80,42 @@ class LogReader:
             print(f"❌ Error reading file: {e}")
             yield from []  # Return empty generator
     
+    def read_lines_with_offsets(self):
+        """
+        Read file line by line, keeping each line's position in the file
+        
+        Same counting and skipping rules as read_lines(), but the file is
+        read in binary so byte offsets are exact.
+        
+        Yields:
+            (offset, length, line) tuples, where offset/length locate the
+            line in the file without its line terminator
+        """
+        if not self.validate_file():
+            return
+        
+        print(f"📖 Reading file: {self.file_path}")
+        
+        try:
+            offset = 0
+            with open(self.file_path, 'rb') as file:
+                for raw in file:
+                    self.total_lines += 1
+                    line_offset = offset
+                    offset += len(raw)
+                    
+                    line = raw.decode('utf-8', errors='replace').strip()
+                    if not line:  # Skip empty lines
+                        self.skipped_lines += 1
+                        continue
+                    
+                    yield line_offset, len(raw.rstrip(b'\r\n')), line
+                    
+            print(f"✅ Finished reading. Total lines: {self.total_lines}")
+            
+        except Exception as e:
+            print(f"❌ Error reading file: {e}")
+    
     def get_stats(self) -> dict:
         """Get reading statistics"""
         return {
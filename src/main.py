@@ -1,5 +1,9 @@
 """
 Main entry point for Log File Analyzer
+
+Heavy dependencies are imported by the stage that needs them: pandas only
+when the DataFrame engine is used and matplotlib only when charts are drawn,
+so a small file with --no-charts starts and finishes quickly.
 """
 
 import sys
@@ -18,9 +22,10 @@ try:
     import config
     from log_reader import LogReader
     from log_parser import LogParser
-    from data_processor import DataProcessor
-    from visualizer import Visualizer
+    from data_processor import DataProcessor, ENGINES
     from report_generator import ReportGenerator
+    from rollup_store import RollupAggregator
+    from subnet_aggregator import SubnetAggregator
     print("✅ All modules imported successfully")
 except ImportError as e:
     print(f"❌ Import error: {e}")
@@ -42,8 +47,33 @@ def setup_logging():
     return logging.getLogger(__name__)
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command line options"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Log File Analyzer')
+    parser.add_argument('--file', '-f', type=str, help='Path to log file')
+    parser.add_argument('--no-charts', action='store_true',
+                        help='Skip chart generation (matplotlib is never imported)')
+    parser.add_argument('--engine', choices=ENGINES, default='auto',
+                        help='Aggregation engine (default: auto, pure Python for small inputs)')
+    parser.add_argument('--no-rollups', action='store_true',
+                        help='Do not store this run in the historical rollup database')
+    parser.add_argument('--trends', choices=('day', 'week'), action='append', default=[],
+                        help='Add day-over-day / week-over-week trends from the rollups to the report')
+    parser.add_argument('--watchlist', type=str, metavar='PATH',
+                        help='Flag requests from IPs/CIDRs in a watchlist (binary from watchlist.py build, or text)')
+    parser.add_argument('--alert-rules', nargs='?', const=str(config.ALERT_RULES_PATH), metavar='JSON',
+                        help=f'Evaluate alert rules over the parsed entries; alerts go to {config.ALERTS_OUTPUT_PATH.name}')
+    parser.add_argument('--geoip', nargs='?', const=str(config.GEOIP_DB_PATH), metavar='CSV',
+                        help=f'Break errors down by country and ASN (default table: {config.GEOIP_DB_PATH.name})')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function"""
+    args = parse_args(argv)
+    
     print("\n" + "="*60)
     print("LOG FILE ANALYZER")
     print("="*60)
@@ -57,15 +87,15 @@ def main():
     try:
         # 1. Read log file
         print("\n📂 STEP 1: Reading log file...")
-        reader = LogReader()
+        reader = LogReader(args.file)
         parsed_logs = []
         
         # 2. Parse each line
         print("🔍 STEP 2: Parsing log entries...")
         parser = LogParser()
         
-        for line in reader.read_lines():
-            parsed = parser.parse_line(line)
+        for offset, length, line in reader.read_lines_with_offsets():
+            parsed = parser.parse_line(line, offset, length)
             if parsed:
                 parsed_logs.append(parsed)
         
@@ -80,19 +110,50 @@ def main():
         print(f"  Failed to parse: {parsing_stats['failed_count']}")
         print(f"  Success rate: {parsing_stats['success_rate']}%")
         
+        # Enrich with country/ASN before aggregation
+        if args.geoip:
+            from geoip import GeoEnricher
+            GeoEnricher(args.geoip).enrich_records(parsed_logs)
+        
         # 3. Process and analyze data
         print("\n📈 STEP 3: Analyzing data...")
-        processor = DataProcessor()
-        processor.create_dataframe(parsed_logs)
+        processor = DataProcessor(engine=args.engine)
+        processor.create_dataframe(parsed_logs, parser.tables)
         stats = processor.analyze()
+        stats['error_samples'] = processor.sample_error_lines(reader.file_path)
+        
+        SubnetAggregator.from_records(parsed_logs).finalize(stats)
+        if args.alert_rules:
+            from alert_rules import AlertEngine
+            engine = AlertEngine.from_file(args.alert_rules)
+            for record in parsed_logs:
+                if record['timestamp'] is not None:  # Impossible dates parse without one
+                    engine.add(record)
+            engine.finalize(stats)
+        if args.watchlist:
+            from watchlist import Watchlist, WatchlistMatcher
+            WatchlistMatcher.from_records(parsed_logs, Watchlist.load(args.watchlist)).finalize(stats)
         
         # Display summary in console
         processor.show_summary()
         
+        # Store hourly rollups for cross-run trends
+        if not args.no_rollups or args.trends:
+            rollups = RollupAggregator.from_records(
+                parsed_logs,
+                source=reader.file_path if not args.no_rollups else None,
+                trends=args.trends
+            )
+            rollups.finalize(stats)
+        
         # 4. Generate visualizations
-        print("\n🎨 STEP 4: Creating visualizations...")
-        visualizer = Visualizer()
-        visualizer.create_all_charts(stats)
+        if args.no_charts:
+            print("\n🎨 STEP 4: Skipping visualizations (--no-charts)")
+        else:
+            print("\n🎨 STEP 4: Creating visualizations...")
+            from visualizer import Visualizer
+            visualizer = Visualizer()
+            visualizer.create_all_charts(stats)
         
         # 5. Generate report
         print("\n📄 STEP 5: Generating report...")
@@ -1,10 +1,13 @@
 """
 Main entry point optimized for large log files (50,000+ lines)
+
+pandas and matplotlib are imported lazily by the stages that use them.
 """
 
 import sys
 import os
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -17,9 +20,12 @@ try:
     import config
     from log_reader import LogReader
     from log_parser import LogParser
-    from data_processor import DataProcessor
-    from visualizer import Visualizer
+    from data_processor import DataProcessor, ENGINES
     from report_generator import ReportGenerator
+    from block_index import BlockIndexBuilder
+    from rollup_store import RollupAggregator
+    from subnet_aggregator import SubnetAggregator
+    from profiling import Spans, CpuProfiler, MemoryProfiler
     print("✅ All modules imported successfully")
 except ImportError as e:
     print(f"❌ Import error: {e}")
@@ -39,15 +45,45 @@ def setup_logging():
     return logging.getLogger(__name__)
 
 
-def analyze_large_file(file_path=None):
-    """Analyze large log file efficiently"""
+def analyze_large_file(file_path=None, charts=True, engine='auto', build_index=False,
+                       observers=None, rollups=True, trends=(),
+                       hhh_threshold=config.SUBNET_HHH_THRESHOLD, geoip=None,
+                       watchlist=None, alert_rules=None, profile_memory=False, profile=False):
+    """
+    Analyze large log file efficiently
+    
+    Args:
+        file_path: Path to log file (optional, defaults to config)
+        charts: Render the matplotlib charts
+        engine: DataProcessor aggregation engine
+        build_index: Write the block index sidecar during the parse pass
+        observers: Extra PassObservers fed by the parse pass (optional)
+        rollups: Store this run's hourly rollups in the SQLite rollup store
+        trends: Periods ('day', 'week') whose trends go into the report
+        hhh_threshold: % of errors for a subnet to be reported as a heavy hitter
+        geoip: GeoIP range CSV; records are enriched with country/ASN (optional)
+        watchlist: Binary or text IP/CIDR watchlist to flag requests from (optional)
+        alert_rules: JSON alert rule file evaluated while parsing (optional)
+        profile_memory: Trace peak/retained memory per stage with tracemalloc
+        profile: Run under cProfile; writes .pstats and collapsed stacks to output/
+    """
     logger = setup_logging()
     
     print("\n" + "="*70)
     print("LOG FILE ANALYZER - LARGE FILE OPTIMIZED")
     print("="*70)
     
-    start_time = datetime.now()
+    memory = None
+    if profile_memory:
+        memory = MemoryProfiler()
+        memory.start()
+    spans = Spans(memory)
+    cpu = None
+    if profile:
+        cpu = CpuProfiler()
+        cpu.start()
+    
+    observers = list(observers or [])  # Closed in finally, even if the run fails
     
     try:
         # 1. Read log file
@@ -59,18 +95,56 @@ def analyze_large_file(file_path=None):
         print("🔍 STEP 2: Parsing log entries...")
         parser = LogParser()
         
+        # Features that ride along on the single parse pass
+        observers.append(SubnetAggregator(hhh_threshold))
+        if watchlist:
+            from watchlist import Watchlist, WatchlistMatcher
+            observers.append(WatchlistMatcher(Watchlist.load(watchlist)))
+        if alert_rules:
+            from alert_rules import AlertEngine
+            observers.append(AlertEngine.from_file(alert_rules))
+        if build_index:
+            observers.append(BlockIndexBuilder(reader.file_path))
+        if rollups or trends:
+            observers.append(RollupAggregator(
+                source=reader.file_path if rollups else None, trends=trends))
+        
+        # Enrichment between parsing and aggregation
+        enricher = None
+        if geoip:
+            from geoip import GeoEnricher
+            enricher = GeoEnricher(geoip)
+        
         line_count = 0
         batch_size = 10000  # Process in batches for memory efficiency
         
-        for line in reader.read_lines():
-            line_count += 1
-            parsed = parser.parse_line(line)
-            if parsed:
-                parsed_logs.append(parsed)
-            
-            # Show progress every batch_size lines
-            if line_count % batch_size == 0:
-                print(f"  Processed {line_count:,} lines...")
+        # Per-line calls are summed here and added as spans once
+        clock = time.perf_counter
+        parse_seconds = 0.0
+        observe_seconds = 0.0
+        
+        with spans.span('read + parse'):
+            for offset, length, line in reader.read_lines_with_offsets():
+                line_count += 1
+                started = clock()
+                parsed = parser.parse_line(line, offset, length)
+                parsed_at = clock()
+                parse_seconds += parsed_at - started
+                if parsed:
+                    if enricher:
+                        enricher.enrich(parsed)
+                    parsed_logs.append(parsed)
+                
+                for observer in observers:
+                    observer.observe(offset, length, line, parsed)
+                observe_seconds += clock() - parsed_at
+                
+                # Show progress every batch_size lines
+                if line_count % batch_size == 0:
+                    print(f"  Processed {line_count:,} lines...")
+        
+        spans.add('parse_line', parse_seconds, calls=line_count, parent='read + parse')
+        spans.add('enrich + observers', observe_seconds, calls=line_count, parent='read + parse')
         
         # Get statistics
         reading_stats = reader.get_stats()
@@ -84,27 +158,52 @@ def analyze_large_file(file_path=None):
         print(f"  Success rate: {parsing_stats['success_rate']:.2f}%")
         
         if not parsed_logs:
+            for observer in observers:
+                observer.finalize({})
             print("\n❌ No valid log entries found!")
             return
         
         # 3. Process and analyze data
         print(f"\n📈 STEP 3: Analyzing {len(parsed_logs):,} log entries...")
-        processor = DataProcessor()
-        processor.create_dataframe(parsed_logs)
-        stats = processor.analyze()
+        processor = DataProcessor(engine=engine)
+        with spans.span('dataframe'):
+            processor.create_dataframe(parsed_logs, parser.tables)
+        with spans.span('analyze'):
+            stats = processor.analyze()
+        
+        with spans.span('finalize observers'):
+            for observer in observers:
+                observer.finalize(stats)
+        
+        # Raw text only for the few lines the report shows
+        with spans.span('sample lines'):
+            stats['error_samples'] = processor.sample_error_lines(reader.file_path)
         
         # Display summary in console
         processor.show_summary()
         
         # 4. Generate visualizations
-        print("\n🎨 STEP 4: Creating visualizations...")
-        visualizer = Visualizer()
-        visualizer.create_all_charts(stats)
+        if charts:
+            print("\n🎨 STEP 4: Creating visualizations...")
+            with spans.span('charts'):
+                from visualizer import Visualizer
+                visualizer = Visualizer()
+                visualizer.create_all_charts(stats)
+        else:
+            print("\n🎨 STEP 4: Skipping visualizations (--no-charts)")
         
         # 5. Generate report
         print("\n📄 STEP 5: Generating report...")
-        report_gen = ReportGenerator()
-        report_text = report_gen.generate(stats, parsing_stats, reading_stats)
+        with spans.span('report'):
+            report_gen = ReportGenerator()
+            report_text = report_gen.build_report(stats, parsing_stats, reading_stats, footer=False)
+        
+        # Timings are taken after the report span so it is in the table and the total
+        if cpu:
+            cpu.stop()
+        stats['timings'] = spans.get_stats(cpu.hotspots() if cpu else None)
+        report_text = report_gen.add_timings(report_text, stats['timings'])
+        report_gen.save_report(report_text)
         
         # Display report summary
         print("\n" + "="*60)
@@ -127,9 +226,37 @@ def analyze_large_file(file_path=None):
             for ip, count in top_ips.items():
                 print(f"  {ip}: {count:,} errors")
         
+        alerts = stats.get('alerts')
+        if alerts is not None:
+            print(f"\n🚨 Alerts fired: {alerts['count']:,}")
+            for alert in alerts['alerts'][:5]:
+                print(f"  [{alert['fired_at']}] {alert['message']}")
+        
+        watchlist_hits = stats.get('watchlist_hits')
+        if watchlist_hits is not None:
+            print(f"\n🚩 Watchlist hits: {watchlist_hits['requests']:,} requests "
+                  f"from {watchlist_hits['unique_ips']:,} IPs")
+        
+        subnets = stats.get('error_subnets', {}).get('heavy_hitters', [])
+        if subnets:
+            print(f"\nHeavy-Hitter Subnets ({len(subnets)}):")
+            for entry in sorted(subnets, key=lambda x: x['residual_errors'], reverse=True)[:5]:
+                print(f"  {entry['prefix']}: {entry['errors']:,} errors ({entry['share']:.1f}%)")
+        
+        timings = spans.print_table(stats['timings'])
+        if cpu:
+            cpu.print_top()
+            paths = cpu.dump(config.OUTPUT_DIR)
+            print(f"📁 Profile saved to: {paths['pstats']}")
+            print(f"📁 Collapsed stacks (flamegraph.pl / speedscope): {paths['collapsed']}")
+        
+        if profile_memory:
+            memory_stats = memory.print_summary(len(parsed_logs), 'read + parse')
+            logger.info(f"Traced memory peak {memory_stats['peak_bytes'] / 1024 / 1024:.1f} MB, "
+                        f"{memory_stats['bytes_per_parsed_line'] or 0:,.0f} bytes per parsed line")
+        
         # Calculate execution time
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
+        duration = timings['total_seconds']
         
         print(f"\n✅ ANALYSIS COMPLETED IN {duration:.2f} SECONDS!")
         print(f"📁 Check the 'output' folder for results.")
@@ -158,6 +285,53 @@ def analyze_large_file(file_path=None):
         logger.error(f"Unexpected error: {e}")
         import traceback
         logger.error(traceback.format_exc())
+    
+    finally:
+        for observer in observers:
+            observer.close()
+        # Profilers must not outlive a failed run (both stops are idempotent)
+        if cpu:
+            cpu.stop()
+        if memory:
+            memory.stop()
+
+
+def analyze_dataset_window(dataset_root, start=None, end=None, charts=True):
+    """
+    Analyze a time window of a partitioned dataset without reading text logs
+    
+    Args:
+        dataset_root: Dataset written with --to-dataset
+        start: Window start, inclusive (optional)
+        end: Window end, exclusive (optional)
+        charts: Render the matplotlib charts
+    """
+    logger = setup_logging()
+    start_time = datetime.now()
+    
+    print(f"\n📂 Loading window [{start or '-'}, {end or '-'}) from dataset: {dataset_root}")
+    processor = DataProcessor(engine='pandas')
+    processor.load_window(dataset_root, start, end)
+    stats = processor.analyze()
+    if not stats:
+        print("\n❌ No entries in the requested window!")
+        return
+    
+    processor.show_summary()
+    
+    if charts:
+        from visualizer import Visualizer
+        Visualizer().create_all_charts(stats)
+    
+    # Rows in a dataset were parsed when it was written
+    rows = stats['total_requests']
+    reading_stats = {'total_lines': rows, 'valid_lines': rows, 'skipped_lines': 0}
+    parsing_stats = {'parsed_count': rows, 'failed_count': 0, 'success_rate': 100.0}
+    ReportGenerator().generate(stats, parsing_stats, reading_stats)
+    
+    duration = (datetime.now() - start_time).total_seconds()
+    print(f"\n✅ WINDOW ANALYSIS COMPLETED IN {duration:.2f} SECONDS!")
+    logger.info(f"Dataset window analysis of {rows:,} rows completed in {duration:.2f} seconds")
 
 
 def main():
@@ -168,15 +342,62 @@ def main():
     parser.add_argument('--file', '-f', type=str, help='Path to log file')
     parser.add_argument('--lines', '-l', type=int, default=50000,
                        help='Number of lines for test file (default: 50000)')
+    parser.add_argument('--no-charts', action='store_true',
+                       help='Skip chart generation (matplotlib is never imported)')
+    parser.add_argument('--engine', choices=ENGINES, default='auto',
+                       help='Aggregation engine (default: auto, pure Python for small inputs)')
+    parser.add_argument('--build-index', action='store_true',
+                       help='Write the block index sidecar (<file>.blkidx) in the same pass')
+    parser.add_argument('--no-rollups', action='store_true',
+                       help='Do not store this run in the historical rollup database')
+    parser.add_argument('--trends', choices=('day', 'week'), action='append', default=[],
+                       help='Add day-over-day / week-over-week trends from the rollups to the report')
+    parser.add_argument('--hhh-threshold', type=float, default=config.SUBNET_HHH_THRESHOLD,
+                       help='Report /8, /16 and /24 subnets with at least this %% of errors '
+                            f'(default: {config.SUBNET_HHH_THRESHOLD:g})')
+    parser.add_argument('--geoip', nargs='?', const=str(config.GEOIP_DB_PATH), metavar='CSV',
+                       help=f'Break errors down by country and ASN (default table: {config.GEOIP_DB_PATH.name})')
+    parser.add_argument('--watchlist', type=str, metavar='PATH',
+                       help='Flag requests from IPs/CIDRs in a watchlist (binary from watchlist.py build, or text)')
+    parser.add_argument('--alert-rules', nargs='?', const=str(config.ALERT_RULES_PATH), metavar='JSON',
+                       help=f'Evaluate alert rules while parsing; alerts go to {config.ALERTS_OUTPUT_PATH.name}')
+    parser.add_argument('--profile', action='store_true',
+                       help='Run under cProfile; writes output/profile.pstats and output/profile.collapsed')
+    parser.add_argument('--profile-memory', action='store_true',
+                       help='Report peak/retained memory per stage and top allocation sites (tracemalloc, slow)')
+    parser.add_argument('--to-dataset', type=str, metavar='DIR',
+                       help='Also append parsed entries to a time-partitioned dataset')
+    parser.add_argument('--granularity', choices=('hour', 'day'), default='hour',
+                       help='Partition size for --to-dataset (default: hour)')
+    parser.add_argument('--cube', type=str, metavar='PATH',
+                       help='Also build an hour/status/method/IP cube and save it (.npz) for slicing')
+    parser.add_argument('--from-dataset', type=str, metavar='DIR',
+                       help='Analyze a time window of a dataset instead of a text log')
+    parser.add_argument('--start', type=str, help="Window start for --from-dataset, e.g. '2025-01-15 02:00:00'")
+    parser.add_argument('--end', type=str, help='Window end (exclusive) for --from-dataset')
     
     args = parser.parse_args()
     
-    if args.file:
-        # Analyze specified file
-        analyze_large_file(args.file)
-    else:
-        # Use default file
-        analyze_large_file()
+    if args.from_dataset:
+        analyze_dataset_window(args.from_dataset, args.start, args.end,
+                               charts=not args.no_charts)
+        return
+    
+    observers = []
+    if args.to_dataset:
+        from partitioned_store import PartitionWriter
+        observers.append(PartitionWriter(args.to_dataset, args.granularity))
+    if args.cube:
+        from log_cube import LogCube
+        observers.append(LogCube(args.cube))
+    
+    # Analyze specified file, or the default one
+    analyze_large_file(args.file, charts=not args.no_charts, engine=args.engine,
+                       build_index=args.build_index, observers=observers,
+                       rollups=not args.no_rollups, trends=args.trends,
+                       hhh_threshold=args.hhh_threshold, geoip=args.geoip,
+                       watchlist=args.watchlist, alert_rules=args.alert_rules,
+                       profile_memory=args.profile_memory, profile=args.profile)
 
 
 if __name__ == "__main__":
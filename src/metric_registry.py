@@ -0,0 +1,430 @@
+"""
+Registry of analysis metrics, evaluated lazily in one fused pass
+
+A metric is a small function that turns partial aggregates into entries
+of the stats dict (its keys). It declares what it needs instead of
+touching the data itself:
+
+    dims      columns it breaks requests down by ('error_code',
+              'request_type'); all requested dims share one joint
+              count table, built with a single bincount
+    partials  other shared aggregates by name ('ips', 'geo'), each
+              computed at most once and only when a metric asks for it
+
+evaluate() resolves the requested metrics, checks the columns they need,
+and computes only the partials those metrics use, so asking for
+'error_codes' alone never factorizes the IP column. Adding a metric is a
+@metric function here (or in any module imported before evaluate runs);
+DataProcessor and the web API pick it up by name.
+
+Both engines are supported: partials take either a DataFrame (integer
+codes and bincount) or the pure-Python list of records (Counters).
+"""
+
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+# Import config
+try:
+    from .config import TOP_IP_COUNT, TOP_GEO_COUNT
+except ImportError:
+    # Fallback
+    TOP_IP_COUNT = 5
+    TOP_GEO_COUNT = 10
+
+
+def _codes(series):
+    """
+    Integer codes and their values for a column
+
+    Categorical columns already carry their codes; other columns are
+    factorized once, in order of first appearance. Missing values get a
+    code of their own, with None as the value.
+
+    Returns:
+        (codes ndarray, list of values indexed by code)
+    """
+    import pandas as pd
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories.tolist()
+    else:
+        codes, uniques = pd.factorize(series, sort=False)
+        uniques = uniques.tolist()
+    if len(codes) and codes.min() < 0:
+        codes = codes.astype('int64')
+        codes[codes < 0] = len(uniques)
+        uniques.append(None)
+    return codes, uniques
+
+
+def _ranked(counts, values, limit=None) -> Dict[Any, int]:
+    """
+    {value: count} for non-zero counts, largest first
+
+    Ties keep code order (first appearance), as value_counts does. With a
+    limit only candidates at or above the limit-th largest count are sorted.
+    """
+    import numpy as np
+
+    candidates = np.flatnonzero(counts)
+    if values and values[-1] is None:
+        # Missing values are never reported, as value_counts drops them
+        candidates = candidates[candidates != len(values) - 1]
+    if limit is not None and len(candidates) > limit:
+        cutoff = np.partition(counts[candidates], len(candidates) - limit)[len(candidates) - limit]
+        candidates = candidates[counts[candidates] >= cutoff]
+    order = candidates[np.argsort(-counts[candidates], kind='stable')][:limit]
+    return {values[i]: int(counts[i]) for i in order.tolist()}
+
+
+class Tally:
+    """Counts per value: bincount arrays (pandas engine) or a Counter"""
+
+    def __init__(self, counts, values: Optional[list] = None):
+        """
+        Args:
+            counts: Counter, or ndarray of counts indexed by code
+            values: Values indexed by code (ndarray counts only)
+        """
+        self.counts = counts
+        self.values = values
+
+    def top(self, limit: Optional[int] = None) -> Dict[Any, int]:
+        """{value: count}, largest first, optionally only the top `limit`"""
+        if self.values is None:
+            return dict(self.counts.most_common(limit))
+        return _ranked(self.counts, self.values, limit)
+
+    def distinct(self) -> int:
+        """Number of values with a non-zero count"""
+        if self.values is None:
+            return len(self.counts)
+        import numpy as np
+
+        known = len(self.values) - (bool(self.values) and self.values[-1] is None)
+        return int(np.count_nonzero(self.counts[:known]))
+
+
+class Partial:
+    """
+    Shared aggregate computed for the metrics that need it
+
+    Subclasses implement both engines; results may differ in shape
+    between them as long as the metrics using them get what they expect.
+    """
+
+    name = ''
+    columns = ()
+
+    def frame(self, df, context: 'Context'):
+        """Compute from a DataFrame"""
+        raise NotImplementedError
+
+    def records(self, records: List[Dict[str, Any]], context: 'Context'):
+        """Compute from pure-Python records"""
+        raise NotImplementedError
+
+
+class Metric:
+    """Named function producing one or more stats entries"""
+
+    def __init__(self, name: str, function: Callable[['Context'], Dict[str, Any]],
+                 keys: Sequence[str], dims: Sequence[str] = (), partials: Sequence[str] = ()):
+        self.name = name
+        self.function = function
+        self.keys = tuple(keys)
+        self.dims = tuple(dims)
+        self.partials = tuple(partials)
+
+    @property
+    def columns(self) -> set:
+        """Columns the metric reads, through its dims and partials"""
+        columns = {'is_error', *self.dims}
+        for name in self.partials:
+            columns.update(PARTIALS[name].columns)
+        return columns
+
+
+METRICS: Dict[str, Metric] = {}
+PARTIALS: Dict[str, Partial] = {}
+
+
+def register_partial(partial: Partial) -> Partial:
+    """Add a partial aggregate to the registry"""
+    if partial.name in PARTIALS:
+        raise ValueError(f"Partial '{partial.name}' is already registered")
+    PARTIALS[partial.name] = partial
+    return partial
+
+
+def metric(name: str, keys: Sequence[str], dims: Sequence[str] = (), partials: Sequence[str] = ()):
+    """
+    Decorator registering a metric function
+
+    Args:
+        name: Metric name, as used by evaluate() and ?metrics=
+        keys: Stats keys the function returns
+        dims: Columns of the joint count table the metric reads
+        partials: Names of other partials the metric reads
+    """
+    def register(function):
+        if name in METRICS:
+            raise ValueError(f"Metric '{name}' is already registered")
+        unknown = [partial for partial in partials if partial not in PARTIALS]
+        if unknown:
+            raise ValueError(f"Metric '{name}' needs unknown partials {unknown}")
+        METRICS[name] = Metric(name, function, keys, dims, partials)
+        return function
+    return register
+
+
+def resolve(names: Union[None, str, Iterable[str]] = None) -> List[Metric]:
+    """
+    Metrics for a list (or comma-separated string) of names, in registry order
+
+    Args:
+        names: Metric names; None or empty means every metric
+
+    Returns:
+        List of Metric
+
+    Raises:
+        ValueError: For unknown names
+    """
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(',')]
+    names = {name for name in names or () if name}
+    unknown = sorted(names - METRICS.keys())
+    if unknown:
+        raise ValueError(f"Unknown metric(s) {', '.join(unknown)}; expected some of {', '.join(METRICS)}")
+    return [metric for name, metric in METRICS.items() if not names or name in names]
+
+
+class Context:
+    """Lazily computed, memoized partials for one evaluation"""
+
+    def __init__(self, source, dims: Sequence[str]):
+        """
+        Args:
+            source: DataFrame or list of record dicts
+            dims: Columns of the joint count table
+        """
+        self.source = source
+        self.is_frame = not isinstance(source, list)
+        self.rows = len(source)
+        self.dims = tuple(dims)
+        self._partials = {}
+        self._is_error = None
+
+    @property
+    def is_error(self):
+        """Error flag as a bool ndarray (pandas engine)"""
+        if self._is_error is None:
+            self._is_error = self.source['is_error'].to_numpy(dtype=bool)
+        return self._is_error
+
+    def partial(self, name: str):
+        """Result of a partial, computed on first use"""
+        if name not in self._partials:
+            partial = PARTIALS[name]
+            if self.is_frame:
+                self._partials[name] = partial.frame(self.source, self)
+            else:
+                self._partials[name] = partial.records(self.source, self)
+        return self._partials[name]
+
+    def count(self, dim: Optional[str] = None, errors: bool = False):
+        """
+        Request counts from the joint table
+
+        Args:
+            dim: Break down by this dim (None for the total)
+            errors: Count error requests only
+
+        Returns:
+            int total, or a Tally per value of dim
+        """
+        joint = self.partial('joint')
+        if self.is_frame:
+            counts, values = joint
+            table = counts[..., 1] if errors else counts.sum(axis=-1)
+            if dim is None:
+                return int(table.sum())
+            axis = self.dims.index(dim)
+            return Tally(table.sum(axis=tuple(i for i in range(table.ndim) if i != axis)), values[axis])
+
+        axis = None if dim is None else self.dims.index(dim)
+        tally = Counter()
+        for key, count in joint.items():
+            if not errors or key[-1]:
+                tally[None if axis is None else key[axis]] += count
+        return tally[None] if dim is None else Tally(tally)
+
+
+class JointCounts(Partial):
+    """Requests counted by every requested dim and the error flag at once"""
+
+    name = 'joint'
+
+    def frame(self, df, context):
+        import numpy as np
+
+        # Pack (dim codes..., is_error) into one small integer key
+        key = np.zeros(len(df), dtype=np.int64)
+        shape, values = [], []
+        for dim in context.dims:
+            codes, uniques = _codes(df[dim])
+            size = max(len(uniques), 1)
+            key = key * size + codes
+            shape.append(size)
+            values.append(uniques)
+        key = key * 2 + context.is_error
+        counts = np.bincount(key, minlength=int(np.prod(shape, dtype=np.int64)) * 2)
+        return counts.reshape(*shape, 2), values
+
+    def records(self, records, context):
+        dims = context.dims
+        return Counter(tuple(record[dim] for dim in dims) + (bool(record['is_error']),)
+                       for record in records)
+
+
+class IpCounts(Partial):
+    """Distinct IPs and error requests per IP"""
+
+    name = 'ips'
+    columns = ('ip_address',)
+
+    def frame(self, df, context):
+        import numpy as np
+        import pandas as pd
+
+        ip_idx, ips = _codes(df['ip_address'])
+        errors = np.bincount(ip_idx, weights=context.is_error, minlength=len(ips)).astype(np.int64)
+        if isinstance(df['ip_address'].dtype, pd.CategoricalDtype):
+            # Intern tables may hold IPs this frame never uses
+            unique = Tally(np.bincount(ip_idx, minlength=len(ips)), ips).distinct()
+        else:
+            unique = len(ips) - (bool(ips) and ips[-1] is None)
+        return unique, Tally(errors, ips)
+
+    def records(self, records, context):
+        unique_ips = set()
+        errors = Counter()
+        for record in records:
+            unique_ips.add(record['ip_address'])
+            if record['is_error']:
+                errors[record['ip_address']] += 1
+        return len(unique_ips), Tally(errors)
+
+
+class GeoCounts(Partial):
+    """Error requests per country and per ASN (GeoIP-enriched records)"""
+
+    name = 'geo'
+    columns = ('country', 'asn')
+
+    def frame(self, df, context):
+        import numpy as np
+
+        tallies = {}
+        for column in self.columns:
+            idx, values = _codes(df[column])
+            counts = np.bincount(idx, weights=context.is_error, minlength=len(values)).astype(np.int64)
+            tallies[column] = Tally(counts, values)
+        return tallies
+
+    def records(self, records, context):
+        tallies = {column: Counter() for column in self.columns}
+        for record in records:
+            if record['is_error']:
+                for column, tally in tallies.items():
+                    tally[record[column]] += 1
+        return {column: Tally(tally) for column, tally in tallies.items()}
+
+
+register_partial(JointCounts())
+register_partial(IpCounts())
+register_partial(GeoCounts())
+
+
+@metric('summary', keys=('total_requests', 'error_requests', 'success_requests', 'error_percentage'))
+def summary(context: Context) -> Dict[str, Any]:
+    """Request totals and error rate"""
+    total_requests = context.rows
+    error_count = context.count(errors=True)
+    return {
+        'total_requests': total_requests,
+        'error_requests': error_count,
+        'success_requests': total_requests - error_count,
+        'error_percentage': (error_count / total_requests * 100) if total_requests > 0 else 0
+    }
+
+
+@metric('error_codes', keys=('error_code_distribution',), dims=('error_code',))
+def error_codes(context: Context) -> Dict[str, Any]:
+    """Error requests per status code"""
+    return {'error_code_distribution': context.count('error_code', errors=True).top()}
+
+
+@metric('top_ips', keys=('top_error_ips',), partials=('ips',))
+def top_ips(context: Context) -> Dict[str, Any]:
+    """IPs with the most error requests"""
+    return {'top_error_ips': context.partial('ips')[1].top(TOP_IP_COUNT)}
+
+
+@metric('request_types', keys=('request_type_distribution',), dims=('request_type',))
+def request_types(context: Context) -> Dict[str, Any]:
+    """Requests per HTTP method"""
+    return {'request_type_distribution': context.count('request_type').top()}
+
+
+@metric('error_by_request', keys=('error_by_request',), dims=('request_type',))
+def error_by_request(context: Context) -> Dict[str, Any]:
+    """Error requests per HTTP method"""
+    return {'error_by_request': context.count('request_type', errors=True).top()}
+
+
+@metric('unique_ips', keys=('unique_ips', 'unique_error_ips'), partials=('ips',))
+def unique_ips(context: Context) -> Dict[str, Any]:
+    """Distinct IPs, overall and among errors"""
+    unique, errors = context.partial('ips')
+    return {'unique_ips': unique, 'unique_error_ips': errors.distinct()}
+
+
+@metric('geo', keys=('errors_by_country', 'errors_by_asn'), partials=('geo',))
+def geo(context: Context) -> Dict[str, Any]:
+    """Error requests per country and ASN"""
+    tallies = context.partial('geo')
+    return {
+        'errors_by_country': tallies['country'].top(TOP_GEO_COUNT),
+        'errors_by_asn': tallies['asn'].top(TOP_GEO_COUNT)
+    }
+
+
+def evaluate(source, names: Union[None, str, Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Compute the requested metrics in one fused pass
+
+    Metrics whose columns are missing from the source (e.g. 'geo' without
+    GeoIP enrichment) are skipped.
+
+    Args:
+        source: DataFrame or non-empty list of parsed record dicts
+        names: Metric names (list or comma-separated); None for all
+
+    Returns:
+        Stats dictionary
+    """
+    columns = set(source[0]) if isinstance(source, list) else set(source.columns)
+    metrics = [metric for metric in resolve(names) if metric.columns <= columns]
+
+    dims = []
+    for metric in metrics:
+        dims.extend(dim for dim in metric.dims if dim not in dims)
+
+    context = Context(source, dims)
+    stats = {}
+    for metric in metrics:
+        stats.update(metric.function(context))
+    return stats
@@ -0,0 +1,297 @@
+"""
+Time-partitioned columnar storage for parsed logs
+
+Parsed entries are written once into a directory tree partitioned by day
+or hour, so later analyses of a time window read only the partitions that
+overlap it instead of re-reading text logs:
+
+    <root>/dt=2025-01-15/hour=02/part-<run>-<n>.npz   (granularity='hour')
+    <root>/dt=2025-01-15/part-<run>-<n>.npz           (granularity='day')
+
+Each part file holds one NumPy array per column (epoch seconds, uint32 IP,
+method code, uint32 status code). Every partition directory has a
+``_stats.json`` with per-file row counts and min/max timestamps. Reads
+prune first by partition directory name, then by those statistics, so
+whole files outside the window are never opened.
+
+NumPy is used instead of Parquet so the store needs nothing beyond what
+pandas already installs.
+"""
+
+import json
+import logging
+import uuid
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+
+try:
+    from .log_parser import ip_to_int, int_to_ip
+    from .pass_observer import PassObserver
+    from .log_index import to_epoch, parse_time
+except ImportError:
+    from log_parser import ip_to_int, int_to_ip
+    from pass_observer import PassObserver
+    from log_index import to_epoch, parse_time
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'HEAD', 'OPTIONS', 'PATCH', 'UNKNOWN')
+METHOD_CODES = {method: code for code, method in enumerate(METHODS)}
+GRANULARITIES = ('hour', 'day')
+STATS_FILE = '_stats.json'
+FLUSH_ROWS = 1_000_000  # Rows buffered per partition before a part file is written
+MAX_STATUS = 2 ** 32 - 1  # Largest status the uint32 column holds; larger ones are rejected
+
+
+def partition_key(timestamp: datetime, granularity: str) -> str:
+    """Relative partition directory for a timestamp"""
+    if granularity == 'hour':
+        return f"dt={timestamp:%Y-%m-%d}/hour={timestamp:%H}"
+    return f"dt={timestamp:%Y-%m-%d}"
+
+
+def partition_bounds(relative: Path) -> Optional[tuple]:
+    """
+    Time range [start, end) covered by a partition directory
+
+    Returns:
+        (start, end) datetimes, or None if the path is not a partition
+    """
+    fields = dict(part.split('=', 1) for part in relative.parts if '=' in part)
+    if 'dt' not in fields:
+        return None
+    start = datetime.strptime(fields['dt'], "%Y-%m-%d")
+    if 'hour' in fields:
+        start = start.replace(hour=int(fields['hour']))
+        return start, start + timedelta(hours=1)
+    return start, start + timedelta(days=1)
+
+
+class PartitionWriter(PassObserver):
+    """
+    Appends parsed entries to a partitioned dataset during the parse pass
+
+    Logs are time-sorted, so a partition's buffer is written out as soon as
+    an entry for a later partition arrives; memory stays bounded by one
+    partition (or FLUSH_ROWS rows).
+    """
+
+    def __init__(self, root: str, granularity: str = 'hour'):
+        """
+        Initialize PartitionWriter
+
+        Args:
+            root: Dataset root directory
+            granularity: 'hour' or 'day'
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity '{granularity}', expected one of {GRANULARITIES}")
+
+        self.root = Path(root)
+        self.granularity = granularity
+        self.run_id = uuid.uuid4().hex[:8]
+        self.files_written = 0
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self._buffers: Dict[str, Dict[str, array]] = {}
+
+    def _new_buffer(self) -> Dict[str, array]:
+        return {
+            'ts': array('q'),
+            'ip': array('I'),
+            'method': array('B'),
+            'status': array('I')
+        }
+
+    def observe(self, offset, length, line, parsed):
+        if not parsed or parsed['timestamp'] is None:
+            return
+        self.add(parsed)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Buffer one parsed record (counted in rows_rejected if its status does not fit)"""
+        if not 0 <= record['error_code'] <= MAX_STATUS:
+            self.rows_rejected += 1
+            return
+
+        key = partition_key(record['timestamp'], self.granularity)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            # A new partition started; earlier ones are complete
+            for done in list(self._buffers):
+                self._flush(done)
+            buffer = self._buffers[key] = self._new_buffer()
+
+        buffer['ts'].append(to_epoch(record['timestamp']))
+        buffer['ip'].append(ip_to_int(record['ip_address']))
+        buffer['method'].append(METHOD_CODES.get(record['request_type'], METHOD_CODES['UNKNOWN']))
+        buffer['status'].append(record['error_code'])
+
+        if len(buffer['ts']) >= FLUSH_ROWS:
+            self._flush(key)
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Append a list of parsed records and flush them"""
+        for record in records:
+            if record.get('timestamp') is not None:
+                self.add(record)
+        self.close()
+
+    def _flush(self, key: str) -> None:
+        """Write one partition's buffer as a part file and update its stats"""
+        buffer = self._buffers.pop(key)
+        if not buffer['ts']:
+            return
+
+        columns = {name: np.frombuffer(values, dtype=values.typecode) for name, values in buffer.items()}
+        partition_dir = self.root / key
+        partition_dir.mkdir(parents=True, exist_ok=True)
+
+        file_name = f"part-{self.run_id}-{self.files_written:05d}.npz"
+        np.savez(partition_dir / file_name, **columns)
+
+        stats_path = partition_dir / STATS_FILE
+        stats = json.loads(stats_path.read_text(encoding='utf-8')) if stats_path.exists() else {}
+        stats[file_name] = {
+            'rows': len(columns['ts']),
+            'min_ts': int(columns['ts'].min()),
+            'max_ts': int(columns['ts'].max())
+        }
+        # Replace rather than rewrite in place, so a crash mid-write never
+        # leaves a truncated _stats.json that hides the partition's parts
+        tmp_path = stats_path.with_name(STATS_FILE + '.tmp')
+        tmp_path.write_text(json.dumps(stats, indent=1), encoding='utf-8')
+        tmp_path.replace(stats_path)
+
+        self.files_written += 1
+        self.rows_written += len(columns['ts'])
+
+    def close(self) -> None:
+        """Flush every remaining buffer"""
+        for key in list(self._buffers):
+            self._flush(key)
+
+    def finalize(self, stats):
+        self.close()
+        print(f"✅ Wrote {self.rows_written:,} rows to {self.files_written} "
+              f"partition files under {self.root}")
+        if self.rows_rejected:
+            print(f"⚠️ Skipped {self.rows_rejected:,} rows with status codes above {MAX_STATUS:,}")
+
+
+class PartitionedDataset:
+    """Reads a time window from a partitioned dataset"""
+
+    def __init__(self, root: str):
+        """
+        Initialize PartitionedDataset
+
+        Args:
+            root: Dataset root directory
+        """
+        self.root = Path(root)
+        self.files_read = 0
+        self.files_skipped = 0
+        self.bytes_read = 0
+
+    def _partitions(self, start: Optional[datetime], end: Optional[datetime]):
+        """
+        Partition directories overlapping [start, end)
+
+        Pruning happens on directory names, day level first, so partitions
+        outside the window are never listed, let alone read.
+        """
+        def overlaps(directory):
+            bounds = partition_bounds(directory.relative_to(self.root))
+            if bounds is None:
+                return False
+            return (start is None or bounds[1] > start) and (end is None or bounds[0] < end)
+
+        for day_dir in sorted(self.root.glob('dt=*')):
+            if not overlaps(day_dir):
+                continue
+            for partition_dir in [day_dir] + sorted(day_dir.glob('hour=*')):
+                stats_path = partition_dir / STATS_FILE
+                if overlaps(partition_dir) and stats_path.exists():
+                    yield partition_dir, stats_path
+
+    def read(self, start=None, end=None) -> Dict[str, np.ndarray]:
+        """
+        Load the rows with start <= timestamp < end
+
+        Args:
+            start: Window start, inclusive (datetime or string, optional)
+            end: Window end, exclusive (datetime or string, optional)
+
+        Returns:
+            Dictionary of column arrays: ts, ip, method, status
+        """
+        start, end = parse_time(start), parse_time(end)
+        start_ts = to_epoch(start) if start is not None else None
+        end_ts = to_epoch(end) if end is not None else None
+
+        chunks = {'ts': [], 'ip': [], 'method': [], 'status': []}
+        for partition_dir, stats_path in self._partitions(start, end):
+            file_stats = json.loads(stats_path.read_text(encoding='utf-8'))
+            for file_name, info in sorted(file_stats.items()):
+                # Per-file min/max statistics skip files outside the window
+                if (start_ts is not None and info['max_ts'] < start_ts) or \
+                        (end_ts is not None and info['min_ts'] >= end_ts):
+                    self.files_skipped += 1
+                    continue
+
+                part_path = partition_dir / file_name
+                self.files_read += 1
+                self.bytes_read += part_path.stat().st_size
+                with np.load(part_path) as part:
+                    columns = {name: part[name] for name in chunks}
+
+                mask = None
+                if start_ts is not None and info['min_ts'] < start_ts:
+                    mask = columns['ts'] >= start_ts
+                if end_ts is not None and info['max_ts'] >= end_ts:
+                    upper = columns['ts'] < end_ts
+                    mask = upper if mask is None else mask & upper
+                for name, values in columns.items():
+                    chunks[name].append(values if mask is None else values[mask])
+
+        dtypes = {'ts': np.int64, 'ip': np.uint32, 'method': np.uint8, 'status': np.uint32}
+        return {
+            name: np.concatenate(parts) if parts else np.empty(0, dtype=dtypes[name])
+            for name, parts in chunks.items()
+        }
+
+    def read_dataframe(self, start=None, end=None):
+        """
+        Load a time window as a DataFrame with the same columns as
+        DataProcessor.create_dataframe
+
+        Returns:
+            pandas DataFrame
+        """
+        import pandas as pd
+
+        columns = self.read(start, end)
+        # Decode each distinct IP once; the column stays dictionary-encoded
+        ip_codes, unique_ips = pd.factorize(columns['ip'])
+        method_codes, unique_methods = pd.factorize(columns['method'])
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(columns['ts'], unit='s'),
+            'ip_address': pd.Categorical.from_codes(ip_codes, [int_to_ip(ip) for ip in unique_ips]),
+            'request_type': pd.Categorical.from_codes(method_codes, [METHODS[code] for code in unique_methods]),
+            # Statuses are stored unclamped, so this matches LogParser's is_error
+            'error_code': columns['status'].astype(np.int64),
+            'is_error': (columns['status'] >= 400) & (columns['status'] < 600)
+        })
+
+    def get_stats(self) -> dict:
+        """Get read statistics for the last read(s)"""
+        return {
+            'files_read': self.files_read,
+            'files_skipped': self.files_skipped,
+            'bytes_read': self.bytes_read
+        }
@@ -0,0 +1,41 @@
+"""
+Base class for features that piggyback on the single parse pass
+"""
+
+from typing import Dict, Any, Optional
+
+
+class PassObserver:
+    """
+    Watches every line of the read/parse loop
+
+    Subclasses see each non-empty line once, in file order, together with
+    its parsed record (None for malformed lines), so indexes and streaming
+    aggregates can be built without a second pass over the file.
+    """
+
+    def observe(self, offset: int, length: int, line: str,
+                parsed: Optional[Dict[str, Any]]) -> None:
+        """
+        Called for every non-empty line
+
+        Args:
+            offset: Byte offset of the line in the file
+            length: Length of the line in bytes, without its terminator
+            line: Stripped line text
+            parsed: Parsed record, or None if the line is malformed
+        """
+
+    def finalize(self, stats: Dict[str, Any]) -> None:
+        """
+        Called once after analysis, before the report is written
+
+        Args:
+            stats: Analysis statistics; observers may add their own sections
+        """
+
+    def close(self) -> None:
+        """
+        Called when the run ends, after finalize or instead of it if the
+        run failed; release files and discard unfinished output
+        """
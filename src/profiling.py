@@ -0,0 +1,338 @@
+"""
+Pipeline instrumentation: timing spans, CPU profiling and memory profiling
+
+    spans = Spans(memory=MemoryProfiler() if profile_memory else None)
+    with spans.span('read + parse'):
+        ...
+    spans.add('parse_line', seconds, calls=lines, parent='read + parse')
+    spans.print_table()
+
+Spans are always on: a span costs two perf_counter() calls, and hot
+per-line calls are summed by the caller and added once. The table lists
+each span's wall time, share of the run and time per call.
+
+CpuProfiler wraps cProfile for --profile. It dumps a .pstats file and a
+collapsed-stack file for flamegraph tools, and sums the time spent in
+known hotspots such as the regex match, strptime, DataFrame construction
+and savefig. The collapsed stacks come from cProfile's caller/callee
+graph, so time is split across call paths in proportion to edge times.
+
+MemoryProfiler records each stage's peak traced memory (tracemalloc)
+and the memory the stage retained, both relative to the traced memory
+at its start. The largest allocation sites come from a snapshot taken
+when the most memory was held. tracemalloc slows allocation down
+several times, so memory profiling is opt-in (--profile-memory) and
+timings from a traced run are not representative.
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+MB = 1024 * 1024
+
+# Hotspot label -> (filename suffix, function name) as keyed by pstats
+HOTSPOTS = {
+    'regex match': ('~', "<method 'match' of 're.Pattern' objects>"),
+    'strptime': ('~', '<built-in method strptime>'),
+    'DataFrame construction': ('pandas/core/frame.py', '__init__'),
+    'matplotlib savefig': ('matplotlib/figure.py', 'savefig'),
+}
+
+
+class Spans:
+    """Named wall-clock spans around pipeline stages"""
+
+    def __init__(self, memory: 'MemoryProfiler' = None):
+        """
+        Initialize Spans
+
+        Args:
+            memory: Started MemoryProfiler; every span is also traced as
+                a memory stage (optional)
+        """
+        self.memory = memory
+        self.spans: Dict[str, Dict[str, Any]] = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[str] = None):
+        """Time the enclosed block as ``name``"""
+        stage = self.memory.stage(name) if self.memory else nullcontext()
+        started = time.perf_counter()
+        try:
+            with stage:
+                yield
+        finally:
+            self.add(name, time.perf_counter() - started, parent=parent)
+
+    def add(self, name: str, seconds: float, calls: int = 1, parent: Optional[str] = None) -> None:
+        """Add time measured elsewhere (e.g. summed per-line calls) to span ``name``"""
+        entry = self.spans.get(name)
+        if entry is None:
+            entry = self.spans[name] = {'span': name, 'parent': parent, 'seconds': 0.0, 'calls': 0}
+        entry['seconds'] += seconds
+        entry['calls'] += calls
+
+    def get_stats(self, hotspots: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Timing breakdown
+
+        Args:
+            hotspots: CpuProfiler.hotspots() of the same run (optional)
+
+        Returns:
+            Dictionary with 'total_seconds', 'spans' (children listed after
+            their parent) and 'hotspots'
+        """
+        total = time.perf_counter() - self.started
+        ordered = []
+        for entry in self.spans.values():
+            if entry['parent'] is None:
+                ordered.append(entry)
+                ordered.extend(e for e in self.spans.values() if e['parent'] == entry['span'])
+        ordered.extend(e for e in self.spans.values() if e not in ordered)
+
+        rows = []
+        for entry in ordered:
+            rows.append(dict(entry,
+                             share=entry['seconds'] / total * 100 if total else 0,
+                             per_call_us=entry['seconds'] / entry['calls'] * 1e6 if entry['calls'] else 0))
+        return {'total_seconds': total, 'spans': rows, 'hotspots': hotspots or {}}
+
+    @staticmethod
+    def table_lines(timings: Dict[str, Any]) -> List[str]:
+        """Timing table as text lines, for the console and the report"""
+        lines = [f"{'Span':<24} {'Calls':>10} {'Seconds':>9} {'Share':>7} {'us/call':>9}"]
+        for row in timings['spans']:
+            name = ("  " + row['span']) if row['parent'] else row['span']
+            per_call = f"{row['per_call_us']:9.2f}" if row['calls'] > 1 else f"{'':9}"
+            lines.append(f"{name:<24} {row['calls']:>10,} {row['seconds']:>9.3f} {row['share']:>6.1f}% {per_call}".rstrip())
+        lines.append(f"{'Total':<24} {'':>10} {timings['total_seconds']:>9.3f} {100:>6.1f}%")
+
+        if timings['hotspots']:
+            lines.append("")
+            lines.append("Hotspots (cProfile, cumulative):")
+            for label, hotspot in sorted(timings['hotspots'].items(), key=lambda x: x[1]['seconds'], reverse=True):
+                lines.append(f"{label:<24} {hotspot['calls']:>10,} {hotspot['seconds']:>9.3f}")
+        return lines
+
+    def print_table(self, timings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Print the timing table; returns the timings printed
+
+        Args:
+            timings: get_stats() result to print, so the console and the
+                report show the same numbers; None computes it now
+        """
+        if timings is None:
+            timings = self.get_stats()
+        print(f"\n⏱️ TIMING BREAKDOWN:")
+        for line in self.table_lines(timings):
+            print(f"  {line}")
+        return timings
+
+
+def _label(func) -> str:
+    """'log_parser.py:parse_line' style name for a pstats function key"""
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f"{Path(filename).name}:{name}"
+
+
+class CpuProfiler:
+    """cProfile wrapper with pstats, collapsed-stack and hotspot output"""
+
+    def __init__(self):
+        import cProfile  # Here, not at module load: report_generator imports this module
+
+        self.profile = cProfile.Profile()
+        self._stats = None
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def stop(self) -> None:
+        """Stop profiling; safe to call again (e.g. from a finally block)"""
+        self.profile.disable()
+        if self._stats is None:
+            import pstats
+            self._stats = pstats.Stats(self.profile)
+
+    def hotspots(self) -> Dict[str, Dict[str, Any]]:
+        """Cumulative time and calls of each HOTSPOTS entry that was hit"""
+        found = {}
+        for func, (cc, nc, tt, ct, callers) in self._stats.stats.items():
+            for label, (suffix, name) in HOTSPOTS.items():
+                if func[2] == name and func[0].replace('\\', '/').endswith(suffix):
+                    hotspot = found.setdefault(label, {'seconds': 0.0, 'calls': 0})
+                    hotspot['seconds'] += ct
+                    hotspot['calls'] += nc
+        return found
+
+    def collapsed_stacks(self, min_seconds: float = 1e-5, max_depth: int = 64) -> List[str]:
+        """
+        Flamegraph 'a;b;c <microseconds>' lines from the call graph
+
+        Each function's own time is split over the call paths reaching it
+        in proportion to the time each caller spent in it.
+        """
+        stats = self._stats.stats
+        callees: Dict[Any, List] = {}
+        for func, (cc, nc, tt, ct, callers) in stats.items():
+            for caller, edge in callers.items():
+                callees.setdefault(caller, []).append((func, edge[3]))
+
+        totals: Dict[str, float] = {}
+
+        def visit(func, path, scale):
+            cc, nc, tt, ct, callers = stats[func]
+            path = path + (_label(func),)
+            if tt * scale >= min_seconds:
+                key = ";".join(path)
+                totals[key] = totals.get(key, 0.0) + tt * scale
+            if len(path) >= max_depth:
+                return
+            for callee, edge_ct in callees.get(func, ()):
+                callee_ct = stats[callee][3]
+                if callee_ct <= 0 or _label(callee) in path:
+                    continue
+                share = scale * min(edge_ct / callee_ct, 1.0)
+                if callee_ct * share >= min_seconds:
+                    visit(callee, path, share)
+
+        for func, (cc, nc, tt, ct, callers) in stats.items():
+            if not callers:
+                visit(func, (), 1.0)
+        return [f"{stack} {int(seconds * 1e6)}" for stack, seconds in totals.items() if seconds * 1e6 >= 1]
+
+    def dump(self, output_dir, name: str = 'profile') -> Dict[str, Path]:
+        """
+        Write <name>.pstats and <name>.collapsed to ``output_dir``
+
+        Returns:
+            Paths of the written files
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        pstats_path = output_dir / f"{name}.pstats"
+        collapsed_path = output_dir / f"{name}.collapsed"
+        self._stats.dump_stats(str(pstats_path))
+        collapsed_path.write_text("\n".join(self.collapsed_stacks()) + "\n", encoding='utf-8')
+        return {'pstats': pstats_path, 'collapsed': collapsed_path}
+
+    def print_top(self, limit: int = 15) -> None:
+        """Print the functions with the most cumulative time"""
+        print(f"\n🔬 TOP {limit} FUNCTIONS BY CUMULATIVE TIME (cProfile):")
+        self._stats.sort_stats('cumulative').print_stats(limit)
+
+
+class MemoryProfiler:
+    """Peak and retained traced memory per named pipeline stage"""
+
+    def __init__(self, top_sites: int = 10, frames: int = 1):
+        """
+        Initialize MemoryProfiler
+
+        Args:
+            top_sites: Allocation sites listed in the summary
+            frames: Frames kept per traceback (1 = just the allocating line)
+        """
+        self.top_sites = top_sites
+        self.frames = frames
+        self.stages: List[Dict[str, Any]] = []
+        self._snapshot = None
+        self._snapshot_bytes = -1
+        self._started_here = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_here = True
+
+    def stop(self) -> None:
+        if self._started_here:
+            tracemalloc.stop()
+            self._started_here = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Measure the enclosed block as stage ``name``"""
+        if not tracemalloc.is_tracing():
+            yield
+            return
+
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.stages.append({
+                'stage': name,
+                'start_bytes': before,
+                'peak_bytes': max(peak - before, 0),
+                'retained_bytes': current - before,
+                'end_bytes': current
+            })
+            if current > self._snapshot_bytes:
+                # Keep the snapshot of the most memory held so far; it is
+                # only grouped (slow, pure Python) when the summary asks
+                self._snapshot = tracemalloc.take_snapshot()
+                self._snapshot_bytes = current
+
+    def top_allocations(self) -> List[Dict[str, Any]]:
+        """Largest allocation sites (file:line) of the kept snapshot"""
+        if self._snapshot is None:
+            return []
+        sites = []
+        for stat in self._snapshot.statistics('lineno')[:self.top_sites]:
+            frame = stat.traceback[0]
+            sites.append({'site': f"{frame.filename}:{frame.lineno}", 'bytes': stat.size, 'blocks': stat.count})
+        return sites
+
+    def get_stats(self, parsed_lines: Optional[int] = None, parse_stage: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Collected measurements
+
+        Args:
+            parsed_lines: Parsed records held after parsing; gives bytes per line
+            parse_stage: Stage whose retained memory holds those records
+                (default: the first stage)
+
+        Returns:
+            Dictionary with 'stages', 'peak_bytes', 'bytes_per_parsed_line'
+            and 'top_allocations'
+        """
+        stats = {
+            'stages': self.stages,
+            'peak_bytes': max((s['start_bytes'] + s['peak_bytes'] for s in self.stages), default=0),
+            'bytes_per_parsed_line': None,
+            'top_allocations': self.top_allocations()
+        }
+        if parsed_lines and self.stages:
+            stage = next((s for s in self.stages if s['stage'] == parse_stage), self.stages[0])
+            stats['bytes_per_parsed_line'] = stage['retained_bytes'] / parsed_lines
+        return stats
+
+    def print_summary(self, parsed_lines: Optional[int] = None, parse_stage: Optional[str] = None) -> Dict[str, Any]:
+        """Print the per-stage table and top allocation sites; returns get_stats()"""
+        stats = self.get_stats(parsed_lines, parse_stage)
+
+        print(f"\n🧠 MEMORY PROFILE (tracemalloc):")
+        print(f"  {'Stage':<16} {'Peak MB':>10} {'Retained MB':>12} {'Held after MB':>14}")
+        for s in stats['stages']:
+            print(f"  {s['stage']:<16} {s['peak_bytes'] / MB:>10.1f} "
+                  f"{s['retained_bytes'] / MB:>12.1f} {s['end_bytes'] / MB:>14.1f}")
+        print(f"  Overall traced peak: {stats['peak_bytes'] / MB:.1f} MB")
+        if stats['bytes_per_parsed_line'] is not None:
+            print(f"  Bytes per parsed line: {stats['bytes_per_parsed_line']:,.0f}")
+
+        if stats['top_allocations']:
+            print(f"\n  Top {len(stats['top_allocations'])} allocation sites:")
+            for site in stats['top_allocations']:
+                print(f"    {site['bytes'] / MB:8.1f} MB  {site['blocks']:>10,} blocks  {site['site']}")
+        return stats
@@ -3,7 +3,7 @@ Module for generating text reports
 """
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime
 from pathlib import Path
 
@@ -14,6 +14,11 @@ except ImportError:
     # Fallback
     SUMMARY_REPORT_PATH = Path("output") / "summary_report.txt"
 
+try:
+    from .profiling import Spans
+except ImportError:
+    from profiling import Spans
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,7 +44,7 @@ class ReportGenerator:
                 parsing_stats: Dict[str, Any],
                 reading_stats: Dict[str, Any]) -> str:
         """
-        Generate text report
+        Generate text report and save it to the output path
         
         Args:
             stats: Analysis statistics
@@ -51,6 +56,30 @@ class ReportGenerator:
         """
         print("📋 Generating report...")
         
+        report_text = self.build_report(stats, parsing_stats, reading_stats)
+        
+        # Save to file
+        self.save_report(report_text)
+        
+        return report_text
+    
+    def build_report(self, stats: Dict[str, Any],
+                     parsing_stats: Dict[str, Any],
+                     reading_stats: Dict[str, Any],
+                     footer: bool = True) -> str:
+        """
+        Build the report text without writing anything
+        
+        Args:
+            stats: Analysis statistics
+            parsing_stats: Parsing statistics
+            reading_stats: Reading statistics
+            footer: End with the END OF REPORT footer; pass False to
+                append sections later with add_timings
+            
+        Returns:
+            Report as string
+        """
         lines = []
         
         # Header
@@ -100,6 +129,64 @@ class ReportGenerator:
                 lines.append(f"{ip}: {count} errors")
             lines.append("")
         
+        # Raw lines for the top IPs, fetched by byte offset
+        samples = stats.get('error_samples', {})
+        if any(samples.values()):
+            lines.append("SAMPLE ERROR LINES")
+            lines.append("-"*40)
+            for ip, sample in samples.items():
+                lines.append(f"{ip}:")
+                for line in sample:
+                    lines.append(f"  {line}")
+            lines.append("")
+        
+        # Alerts fired during the parse pass (added by --alert-rules)
+        alerts = stats.get('alerts')
+        if alerts is not None:
+            lines.append("ALERTS")
+            lines.append("-"*40)
+            lines.append(f"Alerts Fired: {alerts['count']}")
+            for alert in alerts['alerts']:
+                lines.append(f"[{alert['fired_at']}] {alert['message']}")
+            if alerts['count'] > len(alerts['alerts']):
+                lines.append(f"... see {alerts['output_path']} for all alerts")
+            lines.append("")
+        
+        # Watchlist matches (added by --watchlist)
+        watchlist = stats.get('watchlist_hits')
+        if watchlist is not None:
+            lines.append("WATCHLIST HITS")
+            lines.append("-"*40)
+            lines.append(f"Requests from Watchlisted IPs: {watchlist['requests']}")
+            lines.append(f"Error Requests: {watchlist['error_requests']}")
+            lines.append(f"Unique Watchlisted IPs: {watchlist['unique_ips']}")
+            for ip, count in watchlist['top_ips'].items():
+                lines.append(f"{ip}: {count} requests")
+            lines.append("")
+        
+        # GeoIP breakdown (added by --geoip)
+        for key, title in (('errors_by_country', 'ERRORS BY COUNTRY'), ('errors_by_asn', 'ERRORS BY ASN')):
+            breakdown = stats.get(key, {})
+            if breakdown:
+                lines.append(title)
+                lines.append("-"*40)
+                for name, count in breakdown.items():
+                    lines.append(f"{name}: {count} errors")
+                lines.append("")
+        
+        # Heavy-hitter subnets
+        subnets = stats.get('error_subnets', {})
+        if subnets.get('heavy_hitters'):
+            lines.append(f"ERROR SOURCE SUBNETS (>= {subnets['threshold']:g}% OF ERRORS)")
+            lines.append("-"*40)
+            for entry in subnets['heavy_hitters']:
+                indent = "  " * (int(entry['prefix'].rsplit('/', 1)[1]) // 8 - 1)
+                line = f"{indent}{entry['prefix']}: {entry['errors']} errors ({entry['share']:.1f}%)"
+                if entry['residual_errors'] != entry['errors']:
+                    line += f", {entry['residual_errors']} outside listed subnets"
+                lines.append(line)
+            lines.append("")
+        
         # Request Types
         req_dist = stats.get('request_type_distribution', {})
         if req_dist:
@@ -108,21 +195,91 @@ class ReportGenerator:
             for req_type, count in req_dist.items():
                 lines.append(f"{req_type}: {count} requests")
         
-        # Footer
-        lines.append("")
-        lines.append("="*60)
-        lines.append("END OF REPORT")
-        lines.append("="*60)
+        # Trends from historical rollups (added by --trends)
+        for trend in stats.get('trends', []):
+            lines.append("")
+            lines.extend(self.trend_lines(trend))
+        
+        # Per-stage timings (added by main_large.py)
+        timings = stats.get('timings')
+        if timings:
+            lines.extend(self.timing_lines(timings))
+        
+        if footer:
+            lines.extend(self.footer_lines())
         
         # Convert to string
-        report_text = "\n".join(lines)
+        return "\n".join(lines)
+    
+    @staticmethod
+    def timing_lines(timings: Dict[str, Any]) -> List[str]:
+        """Timing breakdown section, preceded by a blank line"""
+        return ["", "TIMING BREAKDOWN", "-"*40] + Spans.table_lines(timings)
+    
+    @staticmethod
+    def footer_lines() -> List[str]:
+        """END OF REPORT footer, preceded by a blank line"""
+        return ["", "="*60, "END OF REPORT", "="*60]
+    
+    def add_timings(self, report_text: str, timings: Dict[str, Any]) -> str:
+        """
+        Finish a report built with footer=False: timing section, then footer
         
-        # Save to file
-        self._save_report(report_text)
+        Lets the caller time building the report itself before adding
+        the table.
         
-        return report_text
+        Args:
+            report_text: Output of build_report(..., footer=False)
+            timings: Spans.get_stats() result
+            
+        Returns:
+            Complete report text
+        """
+        return "\n".join([report_text] + self.timing_lines(timings) + self.footer_lines())
+    
+    @staticmethod
+    def trend_lines(trend: Dict[str, Any]) -> List[str]:
+        """
+        Format a RollupStore.trend() result
+        
+        Args:
+            trend: Trend dictionary for one period type
+            
+        Returns:
+            Report lines
+        """
+        if not trend:
+            return ["No rollups stored yet"]
+        
+        label = 'DAY-OVER-DAY' if trend['period'] == 'day' else 'WEEK-OVER-WEEK'
+        current, previous = trend['current'], trend['previous']
+        lines = [f"{label} TREND", "-"*40]
+        
+        if previous is None:
+            lines.append(f"{current['period']}: {current['requests']} requests, "
+                         f"{current['errors']} errors ({current['error_percentage']:.2f}%)")
+            lines.append("No earlier period to compare with")
+            return lines
+        
+        def change(now, before):
+            if not before:
+                return "n/a"
+            return f"{(now - before) / before * 100:+.1f}%"
+        
+        lines.append(f"Period: {current['period']} vs {previous['period']}")
+        lines.append(f"Requests: {current['requests']} vs {previous['requests']} "
+                     f"({change(current['requests'], previous['requests'])})")
+        lines.append(f"Errors: {current['errors']} vs {previous['errors']} "
+                     f"({change(current['errors'], previous['errors'])})")
+        lines.append(f"Error Rate: {current['error_percentage']:.2f}% vs "
+                     f"{previous['error_percentage']:.2f}% "
+                     f"({current['error_percentage'] - previous['error_percentage']:+.2f} pts)")
+        for status, counts in trend['status_changes'].items():
+            lines.append(f"HTTP {status}: {counts['current']} vs {counts['previous']} "
+                         f"({change(counts['current'], counts['previous'])})")
+        return lines
     
-    def _save_report(self, report_text: str) -> None:
+    def save_report(self, report_text: str) -> None:
         """Save report to file"""
         try:
             with open(self.output_path, 'w', encoding='utf-8') as f:
@@ -0,0 +1,361 @@
+"""
+SQLite-backed historical rollups for cross-run trend reports
+
+Every analysis run adds pre-aggregated request counts per
+(hour bucket, status code, method, /24 subnet) to a local SQLite file.
+Day-over-day and week-over-week trends are then answered from the rollups
+alone, without rereading any logs.
+
+Each source log is recorded by a fingerprint of its first bytes together
+with how far it has been ingested. A rerun adds only the lines appended
+since (a grown log contributes just its new tail), and the same content
+under another path or in a copy is recognized and not counted again.
+
+Usage:
+    python src/rollup_store.py trends --period day
+    python src/rollup_store.py trends --period week
+"""
+
+import sys
+import hashlib
+import logging
+import sqlite3
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+try:
+    from .config import ROLLUP_DB_PATH
+    from .pass_observer import PassObserver
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from config import ROLLUP_DB_PATH
+    from pass_observer import PassObserver
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 10000  # Rows per executemany call
+FINGERPRINT_BYTES = 4096  # Leading bytes that identify a source log across paths and growth
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    bucket   TEXT    NOT NULL,  -- 'YYYY-MM-DD HH:00'
+    status   INTEGER NOT NULL,
+    method   TEXT    NOT NULL,
+    subnet   TEXT    NOT NULL,  -- 'a.b.c.0/24'
+    requests INTEGER NOT NULL,
+    PRIMARY KEY (bucket, status, method, subnet)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sources (
+    head_bytes     INTEGER NOT NULL,  -- min(file size, FINGERPRINT_BYTES) when last ingested
+    head_sha1      TEXT    NOT NULL,  -- SHA-1 of those leading bytes
+    ingested_bytes INTEGER NOT NULL,  -- End of the last ingested line
+    rows           INTEGER NOT NULL,
+    path           TEXT    NOT NULL,  -- Last path seen, for information only
+    ingested_at    TEXT    NOT NULL,
+    PRIMARY KEY (head_bytes, head_sha1)
+);
+"""
+
+UPSERT = """
+INSERT INTO rollups (bucket, status, method, subnet, requests) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (bucket, status, method, subnet) DO UPDATE SET requests = requests + excluded.requests
+"""
+
+# SQL expressions grouping an hour bucket into a trend period. Weeks are
+# labelled by their Monday, so a week spanning New Year stays one bucket.
+PERIODS = {
+    'day': "substr(bucket, 1, 10)",
+    'week': "date(substr(bucket, 1, 10), '-6 days', 'weekday 1')",
+}
+
+
+def rollup_key(record: Dict[str, Any]) -> tuple:
+    """(hour bucket, status, method, /24 subnet) for one parsed record"""
+    return (
+        record['timestamp'].strftime("%Y-%m-%d %H:00"),
+        record['error_code'],
+        record['request_type'],
+        record['ip_address'].rsplit('.', 1)[0] + '.0/24'
+    )
+
+
+class RollupAggregator(PassObserver):
+    """Counts rollup keys during the parse pass and stores them at the end"""
+
+    def __init__(self, source: Optional[str] = None, db_path: Optional[str] = None,
+                 trends=()):
+        """
+        Initialize RollupAggregator
+
+        Args:
+            source: Log file being analyzed; only lines past what earlier
+                runs ingested from it are counted. None stores nothing.
+            db_path: SQLite file (optional, defaults to config)
+            trends: Periods ('day', 'week') whose trends are added to
+                stats['trends'] for the report
+        """
+        self.source = source
+        self.db_path = db_path
+        self.trends = tuple(trends)
+        self.counts = Counter()
+        self.start_offset = 0
+        if source is not None:
+            store = RollupStore(db_path)
+            try:
+                self.start_offset = store.ingested_bytes(source)
+            finally:
+                store.close()
+        self.end_offset = self.start_offset
+
+    def observe(self, offset, length, line, parsed):
+        if offset < self.start_offset:
+            return  # Counted by an earlier run
+        self.end_offset = max(self.end_offset, offset + length)
+        if parsed and parsed['timestamp'] is not None:
+            # Valid lines start with 'YYYY-MM-DD HH', cheaper than strftime
+            self.counts[(
+                line[:13] + ':00',
+                parsed['error_code'],
+                parsed['request_type'],
+                parsed['ip_address'].rsplit('.', 1)[0] + '.0/24'
+            )] += 1
+
+    @classmethod
+    def from_records(cls, parsed_logs: List[Dict[str, Any]], **kwargs) -> 'RollupAggregator':
+        """Build rollups from an already parsed list of records"""
+        aggregator = cls(**kwargs)
+        for record in parsed_logs:
+            offset = record.get('offset')
+            if offset is not None:
+                if offset < aggregator.start_offset:
+                    continue
+                aggregator.end_offset = max(aggregator.end_offset, offset + record['length'])
+            if record['timestamp'] is not None:
+                aggregator.counts[rollup_key(record)] += 1
+        return aggregator
+
+    def finalize(self, stats):
+        """Upsert this run's rollups, then add the requested trends to stats"""
+        store = RollupStore(self.db_path)
+        try:
+            if self.source is not None:
+                store.upsert(self.counts, self.source, self.start_offset, self.end_offset)
+            if self.trends:
+                stats['trends'] = [store.trend(period) for period in self.trends]
+        finally:
+            store.close()
+
+
+class RollupStore:
+    """Local SQLite store of hourly rollups"""
+
+    def __init__(self, db_path: str = None):
+        """
+        Initialize RollupStore
+
+        Args:
+            db_path: SQLite file (optional, defaults to config)
+        """
+        self.db_path = Path(db_path) if db_path else ROLLUP_DB_PATH
+        self.db_path.parent.mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _find_source(self, source: str) -> Optional[tuple]:
+        """
+        Stored (head_bytes, head_sha1, ingested_bytes, rows) of a log whose
+        recorded leading bytes match this file's, preferring the longest
+        """
+        with open(source, 'rb') as f:
+            head = f.read(FINGERPRINT_BYTES)
+        lengths = [n for (n,) in self.conn.execute("SELECT DISTINCT head_bytes FROM sources")]
+        for n in sorted((n for n in lengths if 0 < n <= len(head)), reverse=True):
+            row = self.conn.execute(
+                "SELECT head_bytes, head_sha1, ingested_bytes, rows FROM sources "
+                "WHERE head_bytes = ? AND head_sha1 = ?",
+                (n, hashlib.sha1(head[:n]).hexdigest())).fetchone()
+            if row:
+                return row
+        return None
+
+    def ingested_bytes(self, source: str) -> int:
+        """Bytes of a log (or a copy of it) already added to the rollups"""
+        row = self._find_source(source)
+        return row[2] if row else 0
+
+    def upsert(self, counts: Counter, source: Optional[str] = None,
+               start_offset: int = 0, end_offset: Optional[int] = None) -> bool:
+        """
+        Add rollup counts in one batched transaction
+
+        Args:
+            counts: Counter keyed by (bucket, status, method, subnet)
+            source: Log file the counts came from (optional)
+            start_offset: Byte offset the counts start at; must equal what
+                is recorded as ingested for the source
+            end_offset: End of the last line the counts cover
+
+        Returns:
+            True if the counts were stored, False if skipped
+        """
+        rows = [key + (count,) for key, count in counts.items()]
+        with self.conn:  # Single transaction
+            if source is not None:
+                known = self._find_source(source)
+                if (known[2] if known else 0) != start_offset:
+                    print(f"⚠️ Rollups for {source} changed since this run started, skipping")
+                    return False
+                if end_offset is None or end_offset <= start_offset:
+                    print(f"ℹ️ No new lines in {source} since the last run")
+                    return False
+
+            for i in range(0, len(rows), BATCH_SIZE):
+                self.conn.executemany(UPSERT, rows[i:i + BATCH_SIZE])
+
+            if source is not None:
+                with open(source, 'rb') as f:
+                    head = f.read(FINGERPRINT_BYTES)
+                if known:
+                    self.conn.execute("DELETE FROM sources WHERE head_bytes = ? AND head_sha1 = ?", known[:2])
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?)",
+                    (len(head), hashlib.sha1(head).hexdigest(), end_offset,
+                     (known[3] if known else 0) + sum(counts.values()),
+                     str(Path(source).resolve()), datetime.now().isoformat(timespec='seconds')))
+
+        print(f"✅ Stored {len(rows):,} rollup rows in {self.db_path}")
+        return True
+
+    def _window_start(self, period: str) -> Optional[str]:
+        """
+        First bucket of the period before the latest one
+
+        Buckets are the primary key prefix, so trend queries filtered with
+        'bucket >= start' only touch the rows of the two periods compared.
+        """
+        latest = self.conn.execute("SELECT MAX(bucket) FROM rollups").fetchone()[0]
+        if latest is None:
+            return None
+
+        latest_day = datetime.strptime(latest[:10], "%Y-%m-%d")
+        if period == 'day':
+            start = latest_day - timedelta(days=1)
+        else:
+            start = latest_day - timedelta(days=latest_day.weekday() + 7)  # Previous Monday
+        return start.strftime("%Y-%m-%d 00:00")
+
+    def period_totals(self, period: str = 'day') -> List[Dict[str, Any]]:
+        """
+        Requests and errors for the latest period and the one before it,
+        most recent first
+
+        Args:
+            period: 'day' or 'week'
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period '{period}', expected one of {tuple(PERIODS)}")
+
+        since = self._window_start(period)
+        if since is None:
+            return []
+
+        rows = self.conn.execute(f"""
+            SELECT {PERIODS[period]} AS period,
+                   SUM(requests),
+                   SUM(CASE WHEN status BETWEEN 400 AND 599 THEN requests ELSE 0 END)
+            FROM rollups
+            WHERE bucket >= ?
+            GROUP BY period
+            ORDER BY period DESC
+            LIMIT 2
+        """, (since,)).fetchall()
+
+        return [
+            {
+                'period': label,
+                'requests': requests,
+                'errors': errors,
+                'error_percentage': (errors / requests * 100) if requests else 0
+            }
+            for label, requests, errors in rows
+        ]
+
+    def status_by_period(self, period: str) -> Dict[str, Dict[int, int]]:
+        """Error counts per status code for the latest two periods"""
+        since = self._window_start(period)
+        rows = self.conn.execute(f"""
+            SELECT {PERIODS[period]} AS period, status, SUM(requests)
+            FROM rollups
+            WHERE bucket >= ? AND status BETWEEN 400 AND 599
+            GROUP BY period, status
+        """, (since,)).fetchall()
+
+        result = {}
+        for label, status, count in rows:
+            result.setdefault(label, {})[status] = count
+        return result
+
+    def trend(self, period: str = 'day') -> Dict[str, Any]:
+        """
+        Compare the latest period with the one before it
+
+        Returns:
+            Dictionary with 'current', 'previous' (may be None) and the
+            per-status error changes
+        """
+        totals = self.period_totals(period)
+        if not totals:
+            return {}
+
+        current = totals[0]
+        previous = totals[1] if len(totals) > 1 else None
+        by_status = self.status_by_period(period)
+        current_status = by_status.get(current['period'], {})
+        previous_status = by_status.get(previous['period'], {}) if previous else {}
+
+        status_changes = {}
+        for status in sorted(set(current_status) | set(previous_status)):
+            status_changes[status] = {
+                'current': current_status.get(status, 0),
+                'previous': previous_status.get(status, 0) if previous else None
+            }
+
+        return {
+            'period': period,
+            'current': current,
+            'previous': previous,
+            'status_changes': status_changes
+        }
+
+
+def main():
+    """Main function with command line arguments"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Trend reports from stored rollups')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    trends = subparsers.add_parser('trends', help='Show day-over-day or week-over-week trends')
+    trends.add_argument('--period', choices=tuple(PERIODS), default='day')
+    trends.add_argument('--db', type=str, help=f'Rollup database (default: {ROLLUP_DB_PATH})')
+
+    args = parser.parse_args()
+
+    try:
+        from .report_generator import ReportGenerator
+    except ImportError:
+        from report_generator import ReportGenerator
+
+    store = RollupStore(args.db)
+    print("\n".join(ReportGenerator.trend_lines(store.trend(args.period))))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
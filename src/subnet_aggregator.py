@@ -0,0 +1,125 @@
+"""
+Hierarchical CIDR aggregation of error sources
+
+Errors are counted per /24 during the parse pass (memory grows with the
+number of active /24 prefixes, not with lines). At the end the /24
+counts become a sorted uint32 array and are rolled up to /16 and /8 by
+grouping adjacent prefixes.
+
+The result is a hierarchical heavy-hitters list: a prefix is reported
+when its errors, minus those of heavy-hitter prefixes below it, make up
+at least ``threshold`` percent of all errors. A /16 full of scattered
+failing clients is therefore reported even when no single /24 inside it
+stands out, and a /24 that explains most of its /16 does not make the
+/16 show up again.
+"""
+
+import logging
+from typing import Dict, Any, List
+
+try:
+    from .config import SUBNET_HHH_THRESHOLD
+    from .log_parser import ip_to_int, int_to_ip
+    from .pass_observer import PassObserver
+except ImportError:
+    from config import SUBNET_HHH_THRESHOLD
+    from log_parser import ip_to_int, int_to_ip
+    from pass_observer import PassObserver
+
+logger = logging.getLogger(__name__)
+
+PREFIX_LENGTHS = (24, 16, 8)
+
+
+class SubnetAggregator(PassObserver):
+    """Counts errors per /24 and finds heavy-hitter /8, /16 and /24 prefixes"""
+
+    def __init__(self, threshold: float = SUBNET_HHH_THRESHOLD):
+        """
+        Initialize SubnetAggregator
+
+        Args:
+            threshold: Minimum share of all errors, in percent, for a
+                prefix to be reported
+        """
+        self.threshold = threshold
+        self.counts: Dict[str, int] = {}  # 'a.b.c' -> errors in a.b.c.0/24
+
+    def observe(self, offset, length, line, parsed):
+        if parsed and parsed['is_error']:
+            self.add(parsed['ip_address'])
+
+    def add(self, ip_address: str, count: int = 1) -> None:
+        """Count errors from one address"""
+        key = ip_address.rsplit('.', 1)[0]
+        self.counts[key] = self.counts.get(key, 0) + count
+
+    @classmethod
+    def from_records(cls, parsed_logs: List[Dict[str, Any]], **kwargs) -> 'SubnetAggregator':
+        """Build the aggregation from an already parsed list of records"""
+        aggregator = cls(**kwargs)
+        for record in parsed_logs:
+            if record['is_error']:
+                aggregator.add(record['ip_address'])
+        return aggregator
+
+    def heavy_hitters(self) -> Dict[str, Any]:
+        """
+        Hierarchical heavy hitters over /24, /16 and /8
+
+        Returns:
+            Dictionary with 'threshold', 'total_errors' and 'heavy_hitters',
+            a list of {'prefix', 'errors', 'share', 'residual_errors',
+            'residual_share'} ordered so each prefix follows its parent
+        """
+        total = sum(self.counts.values())
+        result = {'threshold': self.threshold, 'total_errors': total, 'heavy_hitters': []}
+        if not total:
+            return result
+
+        import numpy as np  # Only at the end of the run; keeps entry point startup fast
+
+        # /24 prefixes as uint32 network numbers (top 24 bits), sorted
+        prefixes = np.fromiter((ip_to_int(key + '.0') >> 8 for key in self.counts),
+                               dtype=np.uint32, count=len(self.counts))
+        counts = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+        order = np.argsort(prefixes)
+        prefixes, counts = prefixes[order], counts[order]
+
+        cutoff = total * self.threshold / 100
+        residual = counts  # Errors not yet claimed by a heavy hitter below
+        found = []
+
+        for level, length in enumerate(PREFIX_LENGTHS):
+            if level:
+                # Parents of sorted prefixes are sorted: group adjacent runs
+                parents = prefixes >> np.uint32(8)
+                starts = np.flatnonzero(np.r_[True, parents[1:] != parents[:-1]])
+                prefixes = parents[starts]
+                counts = np.add.reduceat(counts, starts)
+                residual = np.add.reduceat(residual, starts)
+
+            heavy = residual >= cutoff
+            for prefix, count, left in zip(prefixes[heavy].tolist(), counts[heavy].tolist(),
+                                           residual[heavy].tolist()):
+                network = prefix << (32 - length)
+                found.append((network, length, {
+                    'prefix': f"{int_to_ip(network)}/{length}",
+                    'errors': count,
+                    'share': count / total * 100,
+                    'residual_errors': left,
+                    'residual_share': left / total * 100
+                }))
+            residual = np.where(heavy, 0, residual)
+
+        # Parents first, then their children in address order
+        found.sort(key=lambda item: (item[0], item[1]))
+        result['heavy_hitters'] = [entry for _, _, entry in found]
+        return result
+
+    def finalize(self, stats):
+        stats['error_subnets'] = self.heavy_hitters()
+
+    def get_stats(self) -> dict:
+        """Get aggregation statistics"""
+        return {'active_prefixes': len(self.counts), 'errors': sum(self.counts.values())}
@@ -1,12 +1,20 @@
 """
 Module for creating visualizations
+
+Charts are drawn on explicit ``Figure`` objects attached to their own Agg
+canvas instead of going through the global ``matplotlib.pyplot`` state
+machine, so several threads (or a render process pool) can draw at once
+without corrupting each other's figures.
 """
 
-import matplotlib.pyplot as plt
 import logging
-from typing import Dict, Any
+from concurrent.futures import Executor
+from typing import Dict, Any, Optional
 from pathlib import Path
 
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
 # Import config
 try:
     from .config import VISUALIZATION_PATH
@@ -16,14 +24,129 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+CHART_DPI = 150
+
+
+def _save_figure(fig: Figure, output_path: Path) -> None:
+    """Render a figure through its own Agg canvas and write it to disk"""
+    FigureCanvasAgg(fig)
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=CHART_DPI)
+
+
+def render_error_distribution(stats: Dict[str, Any], output_path) -> bool:
+    """
+    Render the error code bar chart to ``output_path``
+
+    Module-level so it can be submitted to a process pool.
+
+    Args:
+        stats: Analysis statistics
+        output_path: Where to save the chart
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        error_dist = stats.get('error_code_distribution', {})
+
+        if not error_dist:
+            print("⚠️ No error data to visualize")
+            return False
+
+        print("📊 Creating visualization...")
+
+        # Prepare data
+        error_codes = list(error_dist.keys())
+        counts = list(error_dist.values())
+
+        # Create figure
+        fig = Figure(figsize=(10, 6))
+        ax = fig.add_subplot()
+
+        # Create bar chart
+        bars = ax.bar(error_codes, counts, color='red', alpha=0.7)
+
+        # Add labels on bars
+        for bar, count in zip(bars, counts):
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2, height,
+                    f'{count}', ha='center', va='bottom')
+
+        # Customize chart
+        ax.set_title('HTTP Error Code Distribution', fontweight='bold')
+        ax.set_xlabel('HTTP Error Code')
+        ax.set_ylabel('Number of Errors')
+        ax.grid(axis='y', alpha=0.3)
+
+        # Save the figure
+        _save_figure(fig, Path(output_path))
+
+        print(f"✅ Chart saved to: {output_path}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating chart: {e}")
+        return False
+
+
+def render_top_ips(stats: Dict[str, Any], output_path) -> bool:
+    """
+    Render the top error IPs horizontal bar chart to ``output_path``
+
+    Module-level so it can be submitted to a process pool.
+
+    Args:
+        stats: Analysis statistics
+        output_path: Where to save the chart
+
+    Returns:
+        True if successful
+    """
+    try:
+        top_ips = stats.get('top_error_ips', {})
+
+        if not top_ips:
+            return False
+
+        # Prepare data
+        ips = list(top_ips.keys())
+        counts = list(top_ips.values())
+
+        # Create figure
+        fig = Figure(figsize=(10, 5))
+        ax = fig.add_subplot()
+
+        # Create horizontal bar chart
+        bars = ax.barh(ips, counts, color='orange', alpha=0.7)
+
+        # Add labels
+        for bar, count in zip(bars, counts):
+            ax.text(count, bar.get_y() + bar.get_height()/2,
+                    f' {count}', va='center')
+
+        # Customize
+        ax.set_title('Top IP Addresses with Errors', fontweight='bold')
+        ax.set_xlabel('Number of Errors')
+
+        # Save
+        _save_figure(fig, Path(output_path))
+
+        print(f"✅ IP chart saved to: {output_path}")
+        return True
+
+    except Exception as e:
+        print(f"⚠️ Could not create IP chart: {e}")
+        return False
+
 
 class Visualizer:
     """Creates charts from analysis data"""
-    
+
     def __init__(self, output_path: str = None):
         """
         Initialize Visualizer
-        
+
         Args:
             output_path: Where to save the chart (optional)
         """
@@ -31,112 +154,61 @@ class Visualizer:
             self.output_path = Path(output_path)
         else:
             self.output_path = VISUALIZATION_PATH
-        
+
         # Create output directory if it doesn't exist
         self.output_path.parent.mkdir(exist_ok=True)
-        
-    def plot_error_distribution(self, stats: Dict[str, Any]) -> bool:
+
+    @property
+    def ip_chart_path(self) -> Path:
+        """Default location of the top IPs chart"""
+        return self.output_path.parent / 'top_ips.png'
+
+    def plot_error_distribution(self, stats: Dict[str, Any],
+                                output_path: Optional[Path] = None) -> bool:
         """
         Create bar chart of error codes
-        
+
         Args:
             stats: Analysis statistics
-            
+            output_path: Override for this call only (optional)
+
         Returns:
             True if successful, False otherwise
         """
-        try:
-            error_dist = stats.get('error_code_distribution', {})
-            
-            if not error_dist:
-                print("⚠️ No error data to visualize")
-                return False
-            
-            print("📊 Creating visualization...")
-            
-            # Prepare data
-            error_codes = list(error_dist.keys())
-            counts = list(error_dist.values())
-            
-            # Create figure
-            plt.figure(figsize=(10, 6))
-            
-            # Create bar chart
-            bars = plt.bar(error_codes, counts, color='red', alpha=0.7)
-            
-            # Add labels on bars
-            for bar, count in zip(bars, counts):
-                height = bar.get_height()
-                plt.text(bar.get_x() + bar.get_width()/2, height,
-                        f'{count}', ha='center', va='bottom')
-            
-            # Customize chart
-            plt.title('HTTP Error Code Distribution', fontweight='bold')
-            plt.xlabel('HTTP Error Code')
-            plt.ylabel('Number of Errors')
-            plt.grid(axis='y', alpha=0.3)
-            
-            # Save the figure
-            plt.tight_layout()
-            plt.savefig(self.output_path, dpi=150)
-            plt.close()
-            
-            print(f"✅ Chart saved to: {self.output_path}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error creating chart: {e}")
-            return False
-    
-    def plot_top_ips(self, stats: Dict[str, Any]) -> bool:
+        return render_error_distribution(stats, output_path or self.output_path)
+
+    def plot_top_ips(self, stats: Dict[str, Any],
+                     output_path: Optional[Path] = None) -> bool:
         """
         Create horizontal bar chart for top IPs
-        
+
         Args:
             stats: Analysis statistics
-            
+            output_path: Override for this call only (optional)
+
         Returns:
             True if successful
         """
-        try:
-            top_ips = stats.get('top_error_ips', {})
-            
-            if not top_ips:
-                return False
-            
-            # Prepare data
-            ips = list(top_ips.keys())
-            counts = list(top_ips.values())
-            
-            # Create figure
-            plt.figure(figsize=(10, 5))
-            
-            # Create horizontal bar chart
-            bars = plt.barh(ips, counts, color='orange', alpha=0.7)
-            
-            # Add labels
-            for bar, count in zip(bars, counts):
-                plt.text(count, bar.get_y() + bar.get_height()/2,
-                        f' {count}', va='center')
-            
-            # Customize
-            plt.title('Top IP Addresses with Errors', fontweight='bold')
-            plt.xlabel('Number of Errors')
-            plt.tight_layout()
-            
-            # Save
-            ip_chart_path = self.output_path.parent / 'top_ips.png'
-            plt.savefig(ip_chart_path, dpi=150)
-            plt.close()
-            
-            print(f"✅ IP chart saved to: {ip_chart_path}")
-            return True
-            
-        except Exception as e:
-            print(f"⚠️ Could not create IP chart: {e}")
-            return False
-    
-    def create_all_charts(self, stats: Dict[str, Any]) -> None:
-        """Create all available charts"""
-        self.plot_error_distribution(stats)
-        self.plot_top_ips(stats)
\ No newline at end of file
+        return render_top_ips(stats, output_path or self.ip_chart_path)
+
+    def create_all_charts(self, stats: Dict[str, Any],
+                          executor: Optional[Executor] = None) -> None:
+        """
+        Create all available charts
+
+        Args:
+            stats: Analysis statistics
+            executor: Thread or process pool to render the charts in
+                parallel (optional, renders inline when omitted)
+        """
+        if executor is None:
+            self.plot_error_distribution(stats)
+            self.plot_top_ips(stats)
+            return
+
+        futures = [
+            executor.submit(render_error_distribution, stats, self.output_path),
+            executor.submit(render_top_ips, stats, self.ip_chart_path),
+        ]
+        for future in futures:
+            future.result()
@@ -0,0 +1,338 @@
+"""
+IP watchlist matching with a Bloom filter in front of an exact range check
+
+Watchlists are plain text files with one IPv4 address or CIDR block per
+line ('#' starts a comment). They are compiled into:
+
+- a Bloom filter over (network, prefix length) keys: a lookup probes the
+  IP masked to each prefix length that occurs in the lists, so most
+  non-listed IPs are rejected after a few bit tests
+- merged, sorted uint32 start/end arrays, binary searched to confirm
+  Bloom positives exactly (no false matches)
+
+Both are stored in a prebuilt binary file that loads with a couple of
+reads, so startup does not depend on the size of the source lists:
+
+    MAGIC | header | prefix lengths | Bloom bits | range starts | range ends
+
+Usage:
+    python src/watchlist.py build lists/*.txt -o data/watchlist.bin
+    python src/watchlist.py check data/watchlist.bin 203.0.113.7
+"""
+
+import sys
+import math
+import ipaddress
+import logging
+import struct
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Tuple
+
+import numpy as np
+
+try:
+    from .config import WATCHLIST_FP_RATE, WATCHLIST_CACHE_SIZE, TOP_IP_COUNT
+    from .log_parser import ip_to_int
+    from .pass_observer import PassObserver
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from config import WATCHLIST_FP_RATE, WATCHLIST_CACHE_SIZE, TOP_IP_COUNT
+    from log_parser import ip_to_int
+    from pass_observer import PassObserver
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'LAWATCH1'
+HEADER = struct.Struct('<QIQB')  # Bloom bits, hash count, ranges, prefix lengths
+MASK64 = (1 << 64) - 1
+
+
+def _mix(key: int) -> int:
+    """splitmix64 finalizer for one key (must match _mix_many)"""
+    key = (key + 0x9E3779B97F4A7C15) & MASK64
+    key = ((key ^ (key >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    key = ((key ^ (key >> 27)) * 0x94D049BB133111EB) & MASK64
+    return key ^ (key >> 31)
+
+
+def _mix_many(keys: np.ndarray) -> np.ndarray:
+    """Vectorized splitmix64 finalizer"""
+    with np.errstate(over='ignore'):
+        keys = keys.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        keys = (keys ^ (keys >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        keys = (keys ^ (keys >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return keys ^ (keys >> np.uint64(31))
+
+
+def _netmask(length: int) -> int:
+    return (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF
+
+
+def parse_entry(text: str) -> Tuple[int, int]:
+    """
+    Parse one watchlist entry
+
+    Returns:
+        (network as uint32, prefix length)
+
+    Raises:
+        ValueError: If the entry is not an IPv4 address or CIDR block
+    """
+    address, _, length = text.partition('/')
+    try:
+        length = int(length) if length else 32
+    except ValueError:
+        raise ValueError(f"Invalid prefix length in '{text}'") from None
+    if not 0 <= length <= 32:
+        raise ValueError(f"Invalid prefix length in '{text}'")
+    try:
+        # IPv4Address range-checks each octet; a bare shift-and-or would
+        # silently wrap '256.1.1.1' onto '1.1.1.1'
+        network = int(ipaddress.IPv4Address(address))
+    except ValueError:
+        raise ValueError(f"Invalid IPv4 address in '{text}'") from None
+    return network & _netmask(length), length
+
+
+def read_entries(paths: Iterable[str]) -> Iterable[str]:
+    """Non-empty, non-comment lines of the given watchlist files"""
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                entry = line.split('#', 1)[0].strip()
+                if entry:
+                    yield entry
+
+
+class Watchlist:
+    """Compiled watchlist: Bloom filter plus exact merged ranges"""
+
+    def __init__(self, bits: bytes, num_bits: int, num_hashes: int, lengths: List[int],
+                 starts: np.ndarray, ends: np.ndarray, cache_size: int = WATCHLIST_CACHE_SIZE):
+        self.bits = bits
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.lengths = lengths
+        self._probes = [(length, _netmask(length)) for length in lengths]
+        self.starts = starts
+        self.ends = ends
+        self.contains = lru_cache(maxsize=cache_size)(self._contains)
+
+    @classmethod
+    def build(cls, entries: Iterable[str], fp_rate: float = WATCHLIST_FP_RATE) -> 'Watchlist':
+        """
+        Compile IP / CIDR entries
+
+        Args:
+            entries: Entries such as '203.0.113.7' or '198.51.100.0/24'
+            fp_rate: Target Bloom false positive rate
+        """
+        parsed = [parse_entry(entry) for entry in entries]
+        networks = np.fromiter((network for network, _ in parsed), dtype=np.uint64, count=len(parsed))
+        lengths = np.fromiter((length for _, length in parsed), dtype=np.uint64, count=len(parsed))
+
+        # Bloom filter sized for the distinct prefix keys; a lookup probes
+        # once per prefix length, so each probe gets a share of fp_rate
+        keys = np.unique((networks << np.uint64(6)) | lengths)
+        n = max(len(keys), 1)
+        probe_rate = fp_rate / max(len(np.unique(lengths)), 1)
+        num_bits = max(64, int(math.ceil(-n * math.log(probe_rate) / math.log(2) ** 2)))
+        num_bits = (num_bits + 7) // 8 * 8
+        num_hashes = max(1, round(num_bits / n * math.log(2)))
+
+        bit_array = np.zeros(num_bits // 8, dtype=np.uint8)
+        mixed = _mix_many(keys)
+        h1 = mixed & np.uint64(0xFFFFFFFF)
+        h2 = (mixed >> np.uint64(32)) | np.uint64(1)
+        with np.errstate(over='ignore'):
+            for i in range(num_hashes):
+                positions = (h1 + np.uint64(i) * h2) % np.uint64(num_bits)
+                np.bitwise_or.at(bit_array, (positions >> np.uint64(3)).astype(np.int64),
+                                 (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)))
+
+        # Exact check: merge overlapping / adjacent ranges
+        starts = networks.astype(np.int64)
+        ends = starts + (np.int64(1) << (32 - lengths.astype(np.int64))) - 1
+        order = np.argsort(starts, kind='stable')
+        starts, ends = starts[order], ends[order]
+        if len(starts):
+            reach = np.maximum.accumulate(ends)
+            new_run = np.r_[True, starts[1:] > reach[:-1] + 1]
+            run_ids = np.cumsum(new_run) - 1
+            merged_ends = np.zeros(run_ids[-1] + 1, dtype=np.int64)
+            np.maximum.at(merged_ends, run_ids, ends)
+            starts, ends = starts[new_run], merged_ends
+
+        return cls(
+            bit_array.tobytes(), num_bits, num_hashes,
+            sorted({int(length) for length in lengths}, reverse=True),
+            starts.astype(np.uint32), ends.astype(np.uint32)
+        )
+
+    @classmethod
+    def from_files(cls, paths: Iterable[str], **kwargs) -> 'Watchlist':
+        """Compile text watchlist files"""
+        return cls.build(read_entries(paths), **kwargs)
+
+    def save(self, path) -> Path:
+        """Write the prebuilt binary format"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(HEADER.pack(self.num_bits, self.num_hashes, len(self.starts), len(self.lengths)))
+            f.write(bytes(self.lengths))
+            f.write(self.bits)
+            f.write(self.starts.astype('<u4').tobytes())
+            f.write(self.ends.astype('<u4').tobytes())
+        return path
+
+    @classmethod
+    def load(cls, path) -> 'Watchlist':
+        """
+        Load a watchlist: a prebuilt binary file, or text lists compiled now
+
+        Args:
+            path: Binary file from save(), or a text watchlist
+        """
+        path = Path(path)
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return cls.from_files([path])
+
+            num_bits, num_hashes, num_ranges, num_lengths = HEADER.unpack(f.read(HEADER.size))
+            lengths = list(f.read(num_lengths))
+            bits = f.read(num_bits // 8)
+            starts = np.frombuffer(f.read(4 * num_ranges), dtype='<u4').astype(np.uint32)
+            ends = np.frombuffer(f.read(4 * num_ranges), dtype='<u4').astype(np.uint32)
+        return cls(bits, num_bits, num_hashes, lengths, starts, ends)
+
+    def _maybe_listed(self, ip: int) -> bool:
+        """Bloom filter test for every prefix length in the lists"""
+        bits, num_bits = self.bits, self.num_bits
+        for length, netmask in self._probes:
+            mixed = _mix(((ip & netmask) << 6) | length)
+            h1, h2 = mixed & 0xFFFFFFFF, (mixed >> 32) | 1
+            for i in range(self.num_hashes):
+                position = (h1 + i * h2) % num_bits
+                if not bits[position >> 3] >> (position & 7) & 1:
+                    break
+            else:
+                return True
+        return False
+
+    def _listed(self, ip: int) -> bool:
+        """Exact range check"""
+        # A uint32 needle keeps searchsorted from casting the whole array
+        idx = int(self.starts.searchsorted(np.uint32(ip), side='right')) - 1
+        return idx >= 0 and ip <= int(self.ends[idx])
+
+    def _contains(self, ip_address: str) -> bool:
+        """Membership test; wrapped by the LRU cache as ``contains``"""
+        ip = ip_to_int(ip_address)
+        return self._maybe_listed(ip) and self._listed(ip)
+
+    def contains_many(self, ips: np.ndarray) -> np.ndarray:
+        """Exact vectorized membership for uint32 IPs"""
+        ips = np.asarray(ips, dtype=np.uint32)
+        idx = np.searchsorted(self.starts, ips, side='right') - 1
+        found = idx >= 0
+        found[found] &= ips[found] <= self.ends[idx[found]]
+        return found
+
+    def get_stats(self) -> dict:
+        """Get watchlist statistics"""
+        return {
+            'ranges': len(self.starts),
+            'prefix_lengths': self.lengths,
+            'bloom_bytes': len(self.bits),
+            'bloom_hashes': self.num_hashes
+        }
+
+
+class WatchlistMatcher(PassObserver):
+    """Counts requests from watchlisted IPs during the parse pass"""
+
+    def __init__(self, watchlist: Watchlist):
+        """
+        Initialize WatchlistMatcher
+
+        Args:
+            watchlist: Compiled or loaded Watchlist
+        """
+        self.watchlist = watchlist
+        self.hits = Counter()
+        self.error_hits = 0
+
+    def observe(self, offset, length, line, parsed):
+        if parsed:
+            self.add(parsed)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Check one parsed record"""
+        if self.watchlist.contains(record['ip_address']):
+            self.hits[record['ip_address']] += 1
+            if record['is_error']:
+                self.error_hits += 1
+
+    @classmethod
+    def from_records(cls, parsed_logs: List[Dict[str, Any]], watchlist: Watchlist) -> 'WatchlistMatcher':
+        """Match an already parsed list of records"""
+        matcher = cls(watchlist)
+        for record in parsed_logs:
+            matcher.add(record)
+        return matcher
+
+    def finalize(self, stats):
+        stats['watchlist_hits'] = {
+            'requests': sum(self.hits.values()),
+            'error_requests': self.error_hits,
+            'unique_ips': len(self.hits),
+            'top_ips': dict(self.hits.most_common(TOP_IP_COUNT))
+        }
+
+
+def main():
+    """Main function with command line arguments"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compile and query IP watchlists')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Compile text lists into the binary format')
+    build.add_argument('lists', nargs='+', help='Text files with one IP or CIDR per line')
+    build.add_argument('--output', '-o', required=True, help='Binary watchlist to write')
+    build.add_argument('--fp-rate', type=float, default=WATCHLIST_FP_RATE,
+                       help=f'Bloom false positive rate (default: {WATCHLIST_FP_RATE})')
+
+    check = subparsers.add_parser('check', help='Check IP addresses against a watchlist')
+    check.add_argument('watchlist', help='Binary or text watchlist')
+    check.add_argument('ips', nargs='+')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        try:
+            watchlist = Watchlist.from_files(args.lists, fp_rate=args.fp_rate)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        path = watchlist.save(args.output)
+        stats = watchlist.get_stats()
+        print(f"✅ Watchlist saved to: {path} ({stats['ranges']:,} ranges, "
+              f"{stats['bloom_bytes'] / 1024:.0f} KB Bloom filter)")
+        return 0
+
+    watchlist = Watchlist.load(args.watchlist)
+    listed = 0
+    for ip in args.ips:
+        hit = watchlist.contains(ip)
+        listed += hit
+        print(f"{ip}: {'LISTED' if hit else 'not listed'}")
+    return 0 if listed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())